@@ -0,0 +1,90 @@
+"""DebouncedEnqueuer のマイクロベンチマーク。
+
+起動時スキャン相当（N ファイルを一気に enqueue）で、旧実装（path ごとに
+threading.Timer）とヒープ + 1 スレッドの現行実装を比べる。
+
+    PYTHONPATH=src python benchmarks/debounce.py --files 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import queue
+import threading
+import time
+from pathlib import Path
+
+from usagi.watch import DebouncedEnqueuer, WatchJob
+
+
+class TimerDebouncer:
+    """比較用: 以前の実装（イベントごとに Timer スレッドを作り直す）。"""
+
+    def __init__(self, q: queue.Queue[WatchJob], debounce_seconds: float) -> None:
+        self.q = q
+        self.debounce_seconds = debounce_seconds
+        self._lock = threading.Lock()
+        self._timers: dict[str, threading.Timer] = {}
+
+    def enqueue(self, p: Path, reason: str = "update") -> None:
+        key = str(p)
+        with self._lock:
+            if key in self._timers:
+                self._timers[key].cancel()
+            t = threading.Timer(self.debounce_seconds, self._fire, args=(p,))
+            self._timers[key] = t
+            t.start()
+
+    def _fire(self, p: Path) -> None:
+        with self._lock:
+            self._timers.pop(str(p), None)
+        self.q.put(WatchJob(path=p))
+
+    def stop(self) -> None:
+        pass
+
+
+def _settle() -> None:
+    # cancel 済み Timer スレッドが消えるのを待つ（次の計測に混ざらないように）
+    deadline = time.monotonic() + 10
+    while threading.active_count() > 1 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def run(name: str, make, files: int, repeats: int, debounce: float) -> None:
+    q: queue.Queue[WatchJob] = queue.Queue()
+    d = make(q, debounce)
+    paths = [Path(f"inputs/spec-{i:05d}.md") for i in range(files)]
+    base_threads = threading.active_count()
+
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        for p in paths:
+            d.enqueue(p, reason="scan")
+    enqueue_s = time.perf_counter() - t0
+    peak_threads = threading.active_count() - base_threads
+
+    for _ in range(files):
+        q.get(timeout=30)
+    total_s = time.perf_counter() - t0
+    d.stop()
+    _settle()
+    print(
+        f"{name:<8} files={files} repeats={repeats} enqueue={enqueue_s * 1000:8.1f}ms "
+        f"drained={total_s * 1000:8.1f}ms extra_threads={peak_threads}"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=2000)
+    ap.add_argument("--repeats", type=int, default=3, help="同じ path を何回 enqueue するか")
+    ap.add_argument("--debounce", type=float, default=0.2)
+    args = ap.parse_args()
+
+    run("timer", TimerDebouncer, args.files, args.repeats, args.debounce)
+    run("heap", lambda q, s: DebouncedEnqueuer(q, s), args.files, args.repeats, args.debounce)
+
+
+if __name__ == "__main__":
+    main()
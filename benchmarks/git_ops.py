@@ -0,0 +1,134 @@
+"""worker job 1件あたりの git オーバーヘッドのマイクロベンチマーク。
+
+`_run_worker_step_worktree` が job ごとに行う git 操作（repo/user/初回 commit の確認、
+課ブランチの有無、worktree の貸し出しと reset、merge、commit、branch の更新）を
+N 回繰り返し、1 job あたりの時間と起動した git プロセス数を比べる。
+
+- legacy: 問い合わせごとに `git` を起動していた以前の GitRepo 相当
+- cached: 現行（facts キャッシュ + for-each-ref snapshot + 常駐 cat-file/update-ref）
+
+    PYTHONPATH=src python benchmarks/git_ops.py --jobs 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from usagi.git_ops import GitRepo, team_branch, worker_branch
+from usagi.worktree_pool import WorktreePool
+
+_spawned = 0
+_Popen = subprocess.Popen
+
+
+class _CountingPopen(_Popen):  # type: ignore[misc, type-arg]
+    def __init__(self, *args, **kwargs) -> None:
+        global _spawned
+        _spawned += 1
+        super().__init__(*args, **kwargs)
+
+
+def _git(cwd: Path, args: list[str], *, check: bool = True) -> str:
+    proc = subprocess.run(["git", *args], cwd=cwd, text=True, capture_output=True, check=False)
+    if check and proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or "git failed")
+    return proc.stdout.strip()
+
+
+def legacy_job(root: Path, wt: Path, i: int) -> None:
+    """以前の GitRepo / WorktreePool がやっていた順に、1回ずつ git を起動する。"""
+
+    repo = root / ".usagi" / "repo"
+    team, branch = team_branch("lead"), worker_branch("lead", "w1")
+    # ensure_repo / ensure_initial_commit（ensure_user は config を2〜4回）
+    if not (repo / ".git").exists():
+        _git(repo, ["init", "-b", "main"])
+    for key, value in (("user.email", "usagi@example.invalid"), ("user.name", "usagi")):
+        if not _git(repo, ["config", key], check=False):
+            _git(repo, ["config", key, value])
+    if not _git(repo, ["rev-parse", "--verify", "HEAD"], check=False):
+        _git(repo, ["commit", "--allow-empty", "-m", "init"])
+    # branch_exists(team) -> git branch
+    if not _git(repo, ["show-ref", "--verify", f"refs/heads/{team}"], check=False):
+        _git(repo, ["branch", team, "main"])
+    # pool.acquire: branch の先 / base の解決、前の job の残骸掃除
+    start = ""
+    if _git(repo, ["show-ref", "--verify", f"refs/heads/{branch}"], check=False):
+        start = _git(repo, ["rev-parse", f"refs/heads/{branch}"])
+    target = start or _git(repo, ["rev-parse", "--verify", f"{team}^{{commit}}"])
+    if not (wt / ".git").exists():
+        _git(repo, ["worktree", "prune"])
+        _git(repo, ["worktree", "add", "--detach", str(wt), target])
+    else:
+        _git(wt, ["merge", "--abort"], check=False)
+        _git(wt, ["rebase", "--abort"], check=False)
+        _git(wt, ["checkout", "--detach", "--force", target])
+        _git(wt, ["reset", "--hard", target])
+        _git(wt, ["clean", "-ffdx"])
+    _git(wt, ["merge", "--no-edit", team], check=False)
+    # 作業 + lease.commit
+    (wt / f"f{i}.txt").write_text(str(i), encoding="utf-8")
+    _git(wt, ["add", "-A"])
+    if _git(wt, ["status", "--porcelain"]):
+        _git(wt, ["commit", "-m", f"job {i}"])
+    head = _git(wt, ["rev-parse", "HEAD"])
+    _git(wt, ["update-ref", f"refs/heads/{branch}", head, start])
+
+
+def cached_job(root: Path, pool: WorktreePool, i: int) -> None:
+    """現行の GitRepo / WorktreePool を通す（_run_worker_step_worktree と同じ順）。"""
+
+    repo = GitRepo(root / ".usagi" / "repo")
+    team, branch = team_branch("lead"), worker_branch("lead", "w1")
+    repo.ensure_repo()
+    repo.ensure_initial_commit()
+    if not repo.branch_exists(team):
+        repo.create_branch(team, "main")
+    with pool.acquire(branch, base=team) as lease:
+        try:
+            lease.repo.run(["merge", "--no-edit", team])
+        except RuntimeError:
+            pass
+        (lease.path / f"f{i}.txt").write_text(str(i), encoding="utf-8")
+        lease.commit(f"job {i}")
+
+
+def run(name: str, job, jobs: int) -> None:
+    global _spawned
+    # 1件目（repo/worktree の作成）は除いて測る
+    job(0)
+    _spawned = 0
+    t0 = time.perf_counter()
+    for i in range(1, jobs + 1):
+        job(i)
+    dt = time.perf_counter() - t0
+    print(
+        f"{name:<7} jobs={jobs} per_job={dt / jobs * 1000:7.1f}ms "
+        f"git_processes_per_job={_spawned / jobs:5.1f}"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jobs", type=int, default=30)
+    args = ap.parse_args()
+
+    subprocess.Popen = _CountingPopen  # type: ignore[misc]
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d) / "legacy"
+        (root / ".usagi" / "repo").mkdir(parents=True)
+        wt = root / ".usagi" / "worktrees" / "pool" / "0"
+        run("legacy", lambda i: legacy_job(root, wt, i), args.jobs)
+
+        root = Path(d) / "cached"
+        (root / ".usagi" / "repo").mkdir(parents=True)
+        pool = WorktreePool(root, size=1, max_size=1)
+        run("cached", lambda i: cached_job(root, pool, i), args.jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,49 +7,65 @@ This is a first implementation to enforce command hierarchy:
 - Worker implements in worktree and sends result back.
 
 All handoffs are Markdown files via mailbox.
+
+Handlers are registered per (role, kind) with `usagi.agent_dispatch`, so every
+manager/lead/worker in org.toml runs the same chain; `manager_tick` / `lead_tick` /
+`worker_tick` remain as wrappers for the default org ids.
 """
 
 from __future__ import annotations
 
 import logging
-import time
+import re
 from pathlib import Path
 
 from usagi.agents import AgentMessage, CodexCLIBackend, OfflineBackend, UsagiAgent
+from usagi.agent_dispatch import (
+    TickContext,
+    dispatch_tick,
+    register_dead_letter_handler,
+    register_handler,
+)
 from usagi.agent_memory import append_memory, read_memory
 from usagi.artifacts import write_artifact
-from usagi.git_ops import GitRepo, team_branch
+from usagi.events import emit_event, events_path
+from usagi.fanout import (
+    assign_least_loaded,
+    batch_marker,
+    close_batch,
+    create_batch,
+    gather_branches,
+    open_load,
+    parse_batch_marker,
+    record_result,
+    split_subtasks,
+    workers_of,
+)
+from usagi.git_ops import GitRepo, team_branch, worker_branch
 from usagi.report_state import update_boss_report
 from usagi.mailbox_parse import MailMessage
-from usagi.mailbox import archive_message, deliver_markdown, list_inbox
-from usagi.mailbox_parse import parse_mail_markdown
-from usagi.org import Organization
+from usagi.mailbox import ClaimedMessage, deliver_markdown
+from usagi.org import ROLE_LEAD, ROLE_MANAGER, ROLE_WORKER, AgentDef, Organization
 from usagi.prompt_compact import compact_for_prompt
 from usagi.runtime import RuntimeMode
 from usagi.spec import UsagiSpec
-from usagi.state import AgentStatus, load_status, save_status
+from usagi.state import get_status_registry, set_agent_status
 
 log = logging.getLogger(__name__)
 
+_MARKER_LINE_RE = re.compile(r"^<!-- usagi-batch: .*? -->\n*", re.MULTILINE)
+
 
 def _event(root: Path, msg: str) -> None:
-    try:
-        p = root / ".usagi" / "events.log"
-        p.parent.mkdir(parents=True, exist_ok=True)
-        ts = time.strftime("%Y-%m-%d %H:%M:%S")
-        with p.open("a", encoding="utf-8") as f:
-            f.write(f"[{ts}] {msg}\n")
-    except Exception:
-        return
+    emit_event(events_path(root), msg)
 
 
 def _set(root: Path, status_path: Path | None, agent_id: str, name: str, state: str, task: str) -> None:
-    if status_path is not None:
-        st = load_status(status_path)
-        st.set(AgentStatus(agent_id=agent_id, name=name, state=state, task=task))
-        save_status(status_path, st)
+    set_agent_status(status_path, agent_id, name, state, task)
     # also log agent activity to events
-    _event(root, f"agent: {agent_id} state={state} task={task}")
+    emit_event(
+        events_path(root), f"agent: {agent_id} state={state} task={task}", agent=agent_id, kind="status"
+    )
 
 
 def boss_handle_spec(
@@ -70,8 +86,11 @@ def boss_handle_spec(
 
     backend = OfflineBackend() if offline else CodexCLIBackend()
 
-    assignment_manager = org.find("dev_mgr") or org.find(runtime.boss_id)
     boss = org.find(runtime.boss_id)
+    # 委任先: 社長直属の先頭の部長（いなければ社長自身の inbox）
+    assignment_manager = next(
+        (a for a in org.subordinates_of(runtime.boss_id) if a.role == ROLE_MANAGER), boss
+    )
     if boss is None or assignment_manager is None:
         raise RuntimeError("boss/manager not found")
 
@@ -101,309 +120,472 @@ def boss_handle_spec(
     _set(root, status_path, boss.id, boss.name or boss.id, "idle", "")
 
 
+def _ctx(
+    *,
+    root: Path,
+    status_path: Path | None,
+    org: Organization,
+    runtime: RuntimeMode,
+    model: str,
+    offline: bool,
+    outputs_dir: Path | None = None,
+    repo_root: Path | None = None,
+) -> TickContext:
+    return TickContext(
+        root=root,
+        status_path=status_path,
+        org=org,
+        runtime=runtime,
+        model=model,
+        offline=offline,
+        outputs_dir=outputs_dir,
+        repo_root=repo_root,
+    )
+
+
+def _pick_lead(org: Organization, mgr: AgentDef) -> AgentDef | None:
+    """部長の委任先課長: 配下の lead のうち worker を持つもの（無ければ先頭の lead）。"""
+
+    leads = [a for a in org.subordinates_of(mgr.id) if a.role == ROLE_LEAD]
+    for lead in leads:
+        if workers_of(org, lead.id):
+            return lead
+    return leads[0] if leads else None
+
+
+def _peers(org: Organization, agent: AgentDef) -> list[AgentDef]:
+    """同じ上長の下にいる同じ role の agent（自分以外）。"""
+
+    return [
+        a
+        for a in org.subordinates_of(agent.reports_to)
+        if a.role == agent.role and a.id != agent.id
+    ]
+
+
+# ---- manager ----
+
+
 def manager_tick(*, root: Path, outputs_dir: Path, status_path: Path | None, org: Organization, runtime: RuntimeMode, model: str, offline: bool, repo_root: Path) -> None:
-    """Manager inbox handler.
+    """Manager inbox handler（互換: dev_mgr の inbox だけ処理する）。
 
     Handles:
     - boss_plan -> impl_request (to lead) + manager_report (to boss)
     - review_result -> merge_decision/report (+ merge to main if MERGE_OK)
     """
 
-    mgr = org.find("dev_mgr")
-    if mgr is None:
+    ctx = _ctx(
+        root=root,
+        status_path=status_path,
+        org=org,
+        runtime=runtime,
+        model=model,
+        offline=offline,
+        outputs_dir=outputs_dir,
+        repo_root=repo_root,
+    )
+    dispatch_tick(ctx, "dev_mgr", kinds={"boss_plan", "review_result"})
+
+
+def _on_boss_plan(ctx: TickContext, mgr: AgentDef, msg: ClaimedMessage) -> None:
+    root, runtime = ctx.root, ctx.runtime
+    ctx.set_status(mgr, "working", "delegate")
+
+    lead = _pick_lead(ctx.org, mgr)
+    if lead is None:
         return
 
-    backend = OfflineBackend() if offline else CodexCLIBackend()
+    # digest using manager memory
+    ctx.set_status(mgr, "working", "digest")
+    mem = read_memory(root, mgr.id, max_chars=1800)
+    digest_agent = UsagiAgent(
+        name=mgr.name or mgr.id,
+        role="planner",
+        system_prompt=(
+            "あなたは部長です。社長からの委任を咀嚼し、課長へ具体的に指示してください。\n"
+            "出力は必ず短く。形式:\n"
+            "## 目的\n...\n\n## 指示\n- ...\n\n## 注意\n- ...\n"
+        ),
+    )
+    digest_prompt = (
+        "## 社長からの委任\n" + msg.body + "\n\n"
+        "## あなたのメモリ（過去の判断/方針）\n" + (mem or "(なし)") + "\n"
+    )
+    digest_msg = ctx.run_agent(mgr, digest_agent, digest_prompt)
+    append_memory(root, mgr.id, f"digest: {msg.title}", digest_msg.content)
 
-    for p in list_inbox(root=root, agent_id=mgr.id):
-        msg = parse_mail_markdown(p.read_text(encoding="utf-8"))
-
-        if msg.kind == "boss_plan":
-            _set(root, status_path, mgr.id, mgr.name or mgr.id, "working", "delegate")
-
-            lead = org.find("dev_impl_lead")
-            if lead is None:
-                archive_message(root=root, agent_id=mgr.id, message_path=p)
-                _set(root, status_path, mgr.id, mgr.name or mgr.id, "idle", "")
-                continue
-
-            # digest using manager memory
-            _set(root, status_path, mgr.id, mgr.name or mgr.id, "working", "digest")
-            mem = read_memory(root, mgr.id, max_chars=1800)
-            digest_agent = UsagiAgent(
-                name=mgr.name or mgr.id,
-                role="planner",
-                system_prompt=(
-                    "あなたは開発部長です。社長からの委任を咀嚼し、課長へ具体的に指示してください。\n"
-                    "出力は必ず短く。形式:\n"
-                    "## 目的\n...\n\n## 指示\n- ...\n\n## 注意\n- ...\n"
-                ),
-            )
-            digest_prompt = (
-                "## 社長からの委任\n" + msg.body + "\n\n"
-                "## あなたのメモリ（過去の判断/方針）\n" + (mem or "(なし)") + "\n"
-            )
-            digest_msg = digest_agent.run(user_prompt=digest_prompt, model=model, backend=backend)
-            append_memory(root, mgr.id, f"digest: {msg.title}", digest_msg.content)
-
-            _set(root, status_path, mgr.id, mgr.name or mgr.id, "working", "brief")
-            deliver_markdown(
-                root=root,
-                from_agent=mgr.id,
-                to_agent=lead.id,
-                kind="impl_request",
-                title=f"部長指示: {msg.title}",
-                body=digest_msg.content,
-            )
+    ctx.set_status(mgr, "working", "brief")
+    deliver_markdown(
+        root=root,
+        from_agent=mgr.id,
+        to_agent=lead.id,
+        kind="impl_request",
+        title=f"部長指示: {msg.title}",
+        body=digest_msg.content,
+    )
+
+    # report upward + cross-department share
+    deliver_markdown(
+        root=root,
+        from_agent=mgr.id,
+        to_agent=runtime.boss_id,
+        kind="manager_report",
+        title=f"部長報告: {msg.title}",
+        body=digest_msg.content,
+    )
+    for peer in _peers(ctx.org, mgr):
+        deliver_markdown(
+            root=root,
+            from_agent=mgr.id,
+            to_agent=peer.id,
+            kind="assist_request",
+            title=f"協力依頼: {msg.title}",
+            body=(
+                "あなたは同一階層の部長です。以下の依頼/方針を見て、\n"
+                "リスク/懸念/見落とし/追加で確認すべき点を短く返してください。\n\n"
+                + digest_msg.content
+            ),
+        )
 
-            # report upward + cross-department share
-            deliver_markdown(
-                root=root,
-                from_agent=mgr.id,
-                to_agent=runtime.boss_id,
-                kind="manager_report",
-                title=f"部長報告: {msg.title}",
-                body=digest_msg.content,
-            )
-            for peer in ["qa_mgr", "ops_mgr"]:
-                if org.find(peer) is not None:
-                    deliver_markdown(
-                        root=root,
-                        from_agent=mgr.id,
-                        to_agent=peer,
-                        kind="assist_request",
-                        title=f"協力依頼: {msg.title}",
-                        body=(
-                            "あなたは同一階層の部長です。以下の依頼/方針を見て、\n"
-                            "リスク/懸念/見落とし/追加で確認すべき点を短く返してください。\n\n"
-                            + digest_msg.content
-                        ),
-                    )
-
-            archive_message(root=root, agent_id=mgr.id, message_path=p)
-            _set(root, status_path, mgr.id, mgr.name or mgr.id, "idle", "")
-            continue
-
-        if msg.kind == "review_result":
-            _set(root, status_path, mgr.id, mgr.name or mgr.id, "working", "merge decision")
-
-            agent = UsagiAgent(
-                name=mgr.name or mgr.id,
-                role="planner",
-                system_prompt=(
-                    "あなたは部長(manager)です。\n"
-                    "課長のレビュー結果を踏まえ、課ブランチを main にマージしてよいか判断してください。\n"
-                    "判断は 'MERGE_OK' / 'NEED_MORE_REVIEW' / 'ESCALATE_TO_BOSS' のいずれかを必ず含めてください。"
-                ),
-            )
-            decision_msg = agent.run(user_prompt=msg.body, model=model, backend=backend)
-            decision_text = decision_msg.content.upper()
-
-            # apply merge if OK and lead approved
-            approved = "APPROVE" in msg.body.upper()
-            if approved and "MERGE_OK" in decision_text:
-                try:
-                    repo = GitRepo(repo_root / ".usagi" / "repo")
-                    repo.ensure_repo()
-                    repo.ensure_initial_commit()
-                    team = team_branch("dev_impl_lead")
-                    wt_dir = repo_root / ".usagi" / "worktrees" / team
-                    repo.merge_to_main_and_delete_branch(team)
-                    repo.worktree_remove(wt_dir)
-                except Exception as e:  # noqa: BLE001
-                    _event(root, f"merge failed: {type(e).__name__}: {e}")
-
-            body = (
-                "## 部長判断\n" + decision_msg.content.strip() + "\n\n" +
-                "(元のレビュー結果)\n" + compact_for_prompt(msg.body, stage="manager_review", max_chars=runtime.compress.max_chars_default, enabled=runtime.compress.enabled)
-            )
 
-            deliver_markdown(
-                root=root,
-                from_agent=mgr.id,
-                to_agent=runtime.boss_id,
-                kind="manager_report",
-                title=f"部長報告(レビュー結果): {msg.title}",
-                body=body,
+def _on_review_result(ctx: TickContext, mgr: AgentDef, msg: ClaimedMessage) -> None:
+    root, runtime = ctx.root, ctx.runtime
+    ctx.set_status(mgr, "working", "merge decision")
+
+    agent = UsagiAgent(
+        name=mgr.name or mgr.id,
+        role="planner",
+        system_prompt=(
+            "あなたは部長(manager)です。\n"
+            "課長のレビュー結果を踏まえ、課ブランチを main にマージしてよいか判断してください。\n"
+            "判断は 'MERGE_OK' / 'NEED_MORE_REVIEW' / 'ESCALATE_TO_BOSS' のいずれかを必ず含めてください。"
+        ),
+    )
+    decision_msg = ctx.run_agent(mgr, agent, msg.body)
+    decision_text = decision_msg.content.upper()
+
+    # apply merge if OK and lead approved（課ブランチは送ってきた課長のもの）
+    approved = "APPROVE" in msg.body.upper()
+    merge_note = ""
+    if approved and "MERGE_OK" in decision_text and ctx.repo_root and msg.from_agent:
+        team = team_branch(msg.from_agent)
+        try:
+            repo = GitRepo(ctx.repo_root / ".usagi" / "repo")
+            repo.ensure_repo()
+            repo.ensure_initial_commit()
+            # 旧方式の課 worktree が branch を checkout していると消せないので先に外す
+            repo.worktree_remove(ctx.repo_root / ".usagi" / "worktrees" / team)
+            res = repo.merge_to_main_and_delete_branch(team)
+            merge_note = (
+                f"main <= {team}: {res.status} (wait {res.wait_seconds:.2f}s, batch {res.batch})"
             )
+            _event(root, f"merge queue: {merge_note}")
+        except Exception as e:  # noqa: BLE001
+            merge_note = f"main <= {team}: failed ({e})"
+            _event(root, f"merge failed: {type(e).__name__}: {e}")
+
+    body = (
+        "## 部長判断\n" + decision_msg.content.strip() + "\n\n" +
+        (f"## マージ\n- {merge_note}\n\n" if merge_note else "") +
+        "(元のレビュー結果)\n" + compact_for_prompt(msg.body, stage="manager_review", max_chars=runtime.compress.max_chars_default, enabled=runtime.compress.enabled)
+    )
 
-            # update boss report directly as well (so boss can pick next)
-            try:
-                spec = UsagiSpec(project="usagi-project", objective=msg.title, tasks=[], constraints=[], context="")
-                update_boss_report(
-                    outputs_dir=outputs_dir,
-                    spec=spec,
-                    job_id=p.stem,
-                    workdir=repo_root,
-                    input_rel=msg.title,
-                    messages=[decision_msg],
-                    note="部長: レビュー結果を受けて判断しました。",
-                    boss_summary=decision_msg.content.splitlines()[0] if decision_msg.content else "",
-                    boss_decisions=[line.strip("- ") for line in decision_msg.content.splitlines() if line.strip().startswith("-")],
-                )
-            except Exception:
-                pass
-
-            archive_message(root=root, agent_id=mgr.id, message_path=p)
-            _set(root, status_path, mgr.id, mgr.name or mgr.id, "idle", "")
-            continue
-
-        # unknown kind
-        archive_message(root=root, agent_id=mgr.id, message_path=p)
-
-
-def lead_tick(*, root: Path, status_path: Path | None, org: Organization, runtime: RuntimeMode, model: str, offline: bool) -> None:
-    lead = org.find("dev_impl_lead")
-    mgr = org.find("dev_mgr")
-    if lead is None:
+    deliver_markdown(
+        root=root,
+        from_agent=mgr.id,
+        to_agent=runtime.boss_id,
+        kind="manager_report",
+        title=f"部長報告(レビュー結果): {msg.title}",
+        body=body,
+    )
+
+    # update boss report directly as well (so boss can pick next)
+    if ctx.outputs_dir is None:
         return
+    try:
+        spec = UsagiSpec(project="usagi-project", objective=msg.title, tasks=[], constraints=[], context="")
+        update_boss_report(
+            outputs_dir=ctx.outputs_dir,
+            spec=spec,
+            job_id=msg.stem,
+            workdir=ctx.repo_root or root,
+            input_rel=msg.title,
+            messages=[decision_msg],
+            note="部長: レビュー結果を受けて判断しました。",
+            boss_summary=decision_msg.content.splitlines()[0] if decision_msg.content else "",
+            boss_decisions=[line.strip("- ") for line in decision_msg.content.splitlines() if line.strip().startswith("-")],
+        )
+    except Exception:
+        pass
 
-    backend = OfflineBackend() if offline else CodexCLIBackend()
 
-    for p in list_inbox(root=root, agent_id=lead.id):
-        msg = parse_mail_markdown(p.read_text(encoding="utf-8"))
-
-        if msg.kind == "impl_request":
-            _set(root, status_path, lead.id, lead.name or lead.id, "working", "digest")
-            worker = org.find("dev_w1") or org.find("dev_w2")
-            if worker is None:
-                archive_message(root=root, agent_id=lead.id, message_path=p)
-                _set(root, status_path, lead.id, lead.name or lead.id, "idle", "")
-                continue
-
-            mem = read_memory(root, lead.id, max_chars=1800)
-            digest_agent = UsagiAgent(
-                name=lead.name or lead.id,
-                role="planner",
-                system_prompt=(
-                    "あなたは開発実装課長です。部長指示を咀嚼し、ワーカーへ実装指示を作ってください。\n"
-                    "出力は短く、実装に必要な情報だけ。形式:\n"
-                    "## 実装指示\n- ...\n\n## 受け入れ条件\n- ...\n\n## 注意\n- ...\n"
-                ),
-            )
-            digest_prompt = (
-                "## 部長指示\n" + msg.body + "\n\n"
-                "## あなたのメモリ（過去の判断/レビュー観点）\n" + (mem or "(なし)") + "\n"
-            )
-            brief_msg = digest_agent.run(user_prompt=digest_prompt, model=model, backend=backend)
-            append_memory(root, lead.id, f"brief: {msg.title}", brief_msg.content)
-
-            _set(root, status_path, lead.id, lead.name or lead.id, "working", "assign worker")
-            deliver_markdown(
-                root=root,
-                from_agent=lead.id,
-                to_agent=worker.id,
-                kind="worker_request",
-                title=f"課長指示: {msg.title}",
-                body=brief_msg.content,
-            )
+# ---- lead ----
 
-            archive_message(root=root, agent_id=lead.id, message_path=p)
-            _set(root, status_path, lead.id, lead.name or lead.id, "idle", "")
-            continue
 
-        if msg.kind == "impl_result":
-            _set(root, status_path, lead.id, lead.name or lead.id, "working", "assist request")
+def lead_tick(
+    *,
+    root: Path,
+    status_path: Path | None,
+    org: Organization,
+    runtime: RuntimeMode,
+    model: str,
+    offline: bool,
+    repo_root: Path | None = None,
+) -> None:
+    """Lead inbox handler（互換: dev_impl_lead の inbox だけ処理する）。
 
-            diff_compact = compact_for_prompt(
-                msg.body,
-                stage="lead_review_diff",
-                max_chars=runtime.compress.max_chars_default,
-                enabled=runtime.compress.enabled,
-            )
+    Handles:
+    - impl_request -> split into subtasks, fan out worker_request to the least-loaded workers
+    - impl_result -> gather results of a batch, then review_result (to manager)
+    """
 
-            # ask peer review lead for assistance (async). Proceed without blocking.
-            peer = org.find("dev_rev_lead")
-            if peer is not None:
-                deliver_markdown(
-                    root=root,
-                    from_agent=lead.id,
-                    to_agent=peer.id,
-                    kind="assist_request",
-                    title=f"レビュー協力依頼: {msg.title}",
-                    body=(
-                        "あなたはレビュー課長です。以下の差分(圧縮)を見て、\n"
-                        "重大な懸念点/見落とし/確認項目を短く箇条書きで返してください。\n\n"
-                        + diff_compact
-                    ),
-                )
-
-            _set(root, status_path, lead.id, lead.name or lead.id, "working", "review")
-
-            reviewer = UsagiAgent(
-                name=lead.name or lead.id,
-                role="reviewer",
-                system_prompt=(
-                    "あなたは課長(lead)でレビュー責任者です。\n"
-                    "ワーカーの差分をレビューし、承認する場合は必ず 'APPROVE' と書き、\n"
-                    "差戻しなら 'CHANGES_REQUESTED' と書いてください。"
-                ),
-            )
-            prompt = f"ワーカー差分(圧縮):\n\n{diff_compact}\n\n判断: APPROVE / CHANGES_REQUESTED\n"
-            review_msg = reviewer.run(user_prompt=prompt, model=model, backend=backend)
-
-            # send to manager
-            if mgr is not None:
-                deliver_markdown(
-                    root=root,
-                    from_agent=lead.id,
-                    to_agent=mgr.id,
-                    kind="review_result",
-                    title=f"レビュー結果: {msg.title}",
-                    body=review_msg.content + "\n\n" + diff_compact,
-                )
-
-            archive_message(root=root, agent_id=lead.id, message_path=p)
-            _set(root, status_path, lead.id, lead.name or lead.id, "idle", "")
-            continue
-
-        archive_message(root=root, agent_id=lead.id, message_path=p)
-
-
-def worker_tick(*, root: Path, status_path: Path | None, org: Organization, runtime: RuntimeMode, model: str, offline: bool, repo_root: Path) -> None:
-    worker = org.find("dev_w1")
-    lead = org.find("dev_impl_lead")
-    if worker is None or lead is None:
+    ctx = _ctx(
+        root=root,
+        status_path=status_path,
+        org=org,
+        runtime=runtime,
+        model=model,
+        offline=offline,
+        repo_root=repo_root,
+    )
+    dispatch_tick(ctx, "dev_impl_lead", kinds={"impl_request", "impl_result", "impl_failed"})
+
+
+def _on_impl_request(ctx: TickContext, lead: AgentDef, msg: ClaimedMessage) -> None:
+    root = ctx.root
+    ctx.set_status(lead, "working", "digest")
+    workers = workers_of(ctx.org, lead.id)
+    if not workers:
         return
 
-    from usagi.approval_pipeline import _run_worker_step_worktree
+    mem = read_memory(root, lead.id, max_chars=1800)
+    digest_agent = UsagiAgent(
+        name=lead.name or lead.id,
+        role="planner",
+        system_prompt=(
+            "あなたは課長です。部長指示を咀嚼し、ワーカーへ実装指示を作ってください。\n"
+            "出力は短く、実装に必要な情報だけ。形式:\n"
+            "## 実装指示\n- ...\n\n## 受け入れ条件\n- ...\n\n## 注意\n- ...\n\n"
+            "## サブタスク\n"
+            f"- （互いに独立して並行に実装できる単位。1行1件、最大{len(workers)}件）\n"
+        ),
+    )
+    digest_prompt = (
+        "## 部長指示\n" + msg.body + "\n\n"
+        "## あなたのメモリ（過去の判断/レビュー観点）\n" + (mem or "(なし)") + "\n"
+    )
+    brief_msg = ctx.run_agent(lead, digest_agent, digest_prompt)
+    append_memory(root, lead.id, f"brief: {msg.title}", brief_msg.content)
+
+    ctx.set_status(lead, "working", "assign worker")
+    subtasks = split_subtasks(brief_msg.content, max_parts=len(workers))
+    live = get_status_registry(ctx.status_path).snapshot().agents if ctx.status_path else {}
+    plan = assign_least_loaded(subtasks, workers, load=open_load(root), status=live)
+    batch = create_batch(
+        root, lead=lead.id, title=msg.title, assignments=[(t, w.id) for t, w in plan]
+    )
+    for sub, (task, worker) in zip(batch.subtasks, plan, strict=True):
+        body = batch_marker(batch.id, sub.index) + "\n\n" + brief_msg.content
+        title = f"課長指示: {msg.title}"
+        if len(plan) > 1:
+            body += "\n\n## 担当サブタスク\n- " + task
+            title += f" [{sub.index + 1}/{len(plan)}]"
+        deliver_markdown(
+            root=root,
+            from_agent=lead.id,
+            to_agent=worker.id,
+            kind="worker_request",
+            title=title,
+            body=body,
+        )
+    _event(
+        root,
+        f"fanout: {batch.id} {len(plan)} subtasks -> "
+        + ", ".join(w.id for _t, w in plan),
+    )
 
-    backend = OfflineBackend() if offline else CodexCLIBackend()
 
-    for p in list_inbox(root=root, agent_id=worker.id):
-        msg = parse_mail_markdown(p.read_text(encoding="utf-8"))
-        if msg.kind != "worker_request":
-            archive_message(root=root, agent_id=worker.id, message_path=p)
-            continue
+def _on_impl_failed(ctx: TickContext, lead: AgentDef, msg: ClaimedMessage) -> None:
+    """worker の依頼が dead-letter になった（サブタスクを failed として数える）。"""
 
-        _set(root, status_path, worker.id, worker.name or worker.id, "working", "implement")
+    _on_impl_result(ctx, lead, msg, failed=True)
 
-        # Minimal fake spec
-        spec = UsagiSpec(project="usagi-project", objective=msg.title, tasks=[], constraints=[], context="")
-        workdir = repo_root / "jobs" / "worker" / p.stem
-        workdir.mkdir(parents=True, exist_ok=True)
 
-        impl = _run_worker_step_worktree(
-            worker=worker,
-            lead=lead,
-            plan=AgentMessage(agent_name="boss", role="planner", content=msg.body),
-            spec=spec,
-            workdir=workdir,
-            repo_root=repo_root,
-            model=model,
-            backend=backend,
-            runtime=runtime,
-            offline=offline,
+def _on_impl_result(
+    ctx: TickContext, lead: AgentDef, msg: ClaimedMessage, *, failed: bool = False
+) -> None:
+    root, runtime = ctx.root, ctx.runtime
+    result_body = msg.body
+    ref = parse_batch_marker(msg.body)
+    batch = record_result(root, ref[0], ref[1], msg.body, failed=failed) if ref else None
+    if batch is not None:
+        if not batch.complete:
+            # 他の worker の結果待ち
+            _event(root, f"fanout: {batch.id} {batch.done_count()}/{len(batch.subtasks)} done")
+            return
+        ctx.set_status(lead, "working", "gather")
+        notes: list[str] = []
+        if ctx.repo_root is not None and not ctx.offline:
+            try:
+                notes = gather_branches(ctx.repo_root, lead.id, [s.worker for s in batch.subtasks])
+            except Exception as e:  # noqa: BLE001
+                notes = [f"gather failed: {type(e).__name__}: {e}"]
+        result_body = "\n\n".join(
+            f"## {s.worker}: {s.title or batch.title}"
+            + (" (failed)" if s.status == "failed" else "")
+            + "\n\n"
+            + _MARKER_LINE_RE.sub("", s.result).strip()
+            for s in batch.subtasks
         )
+        if notes:
+            result_body += "\n\n## merge\n" + "\n".join(f"- {n}" for n in notes)
+
+    ctx.set_status(lead, "working", "assist request")
+
+    diff_compact = compact_for_prompt(
+        result_body,
+        stage="lead_review_diff",
+        max_chars=runtime.compress.max_chars_default,
+        enabled=runtime.compress.enabled,
+    )
+
+    # ask peer leads for review assistance (async). Proceed without blocking.
+    for peer in _peers(ctx.org, lead):
+        deliver_markdown(
+            root=root,
+            from_agent=lead.id,
+            to_agent=peer.id,
+            kind="assist_request",
+            title=f"レビュー協力依頼: {msg.title}",
+            body=(
+                "あなたは同じ部の課長です。以下の差分(圧縮)を見て、\n"
+                "重大な懸念点/見落とし/確認項目を短く箇条書きで返してください。\n\n"
+                + diff_compact
+            ),
+        )
+
+    ctx.set_status(lead, "working", "review")
 
+    reviewer = UsagiAgent(
+        name=lead.name or lead.id,
+        role="reviewer",
+        system_prompt=(
+            "あなたは課長(lead)でレビュー責任者です。\n"
+            "ワーカーの差分をレビューし、承認する場合は必ず 'APPROVE' と書き、\n"
+            "差戻しなら 'CHANGES_REQUESTED' と書いてください。"
+        ),
+    )
+    prompt = f"ワーカー差分(圧縮):\n\n{diff_compact}\n\n判断: APPROVE / CHANGES_REQUESTED\n"
+    review_msg = ctx.run_agent(lead, reviewer, prompt)
+
+    # send to manager
+    mgr = ctx.org.find(lead.reports_to) if lead.reports_to else None
+    if mgr is not None:
         deliver_markdown(
             root=root,
-            from_agent=worker.id,
-            to_agent=lead.id,
-            kind="impl_result",
-            title=f"実装結果: {msg.title}",
-            body=impl.content,
+            from_agent=lead.id,
+            to_agent=mgr.id,
+            kind="review_result",
+            title=f"レビュー結果: {msg.title}",
+            body=review_msg.content + "\n\n" + diff_compact,
         )
+    # レビュー結果を送れてから閉じる（途中で失敗して再配送されたら batch 全体をやり直す）
+    if batch is not None:
+        close_batch(root, batch.id)
+
+
+# ---- worker ----
+
+
+def worker_tick(
+    *,
+    root: Path,
+    status_path: Path | None,
+    org: Organization,
+    runtime: RuntimeMode,
+    model: str,
+    offline: bool,
+    repo_root: Path,
+    worker_id: str = "dev_w1",
+) -> None:
+    """Worker inbox handler (one per worker; each works in its own worktree/branch)."""
+
+    ctx = _ctx(
+        root=root,
+        status_path=status_path,
+        org=org,
+        runtime=runtime,
+        model=model,
+        offline=offline,
+        repo_root=repo_root,
+    )
+    dispatch_tick(ctx, worker_id, kinds={"worker_request"})
+
+
+def _on_worker_request(ctx: TickContext, worker: AgentDef, msg: ClaimedMessage) -> None:
+    lead = ctx.org.find(worker.reports_to) if worker.reports_to else None
+    if lead is None or lead.role != ROLE_LEAD or ctx.repo_root is None:
+        return
+    repo_root = ctx.repo_root
+
+    from usagi.approval_pipeline import _run_worker_step_worktree
+
+    ctx.set_status(worker, "working", "implement")
+
+    # Minimal fake spec
+    spec = UsagiSpec(project="usagi-project", objective=msg.title, tasks=[], constraints=[], context="")
+    workdir = repo_root / "jobs" / "worker" / msg.stem
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    impl = _run_worker_step_worktree(
+        worker=worker,
+        lead=lead,
+        plan=AgentMessage(agent_name="boss", role="planner", content=msg.body),
+        spec=spec,
+        workdir=workdir,
+        repo_root=repo_root,
+        model=ctx.model,
+        backend=ctx.backend(),
+        runtime=ctx.runtime,
+        offline=ctx.offline,
+        branch=worker_branch(lead.id, worker.id),
+    )
+
+    ref = parse_batch_marker(msg.body)
+    deliver_markdown(
+        root=ctx.root,
+        from_agent=worker.id,
+        to_agent=lead.id,
+        kind="impl_result",
+        title=f"実装結果: {msg.title}",
+        body=(batch_marker(*ref) + "\n\n" if ref else "") + impl.content,
+    )
+
+
+def _on_worker_request_dead(
+    ctx: TickContext, worker: AgentDef, msg: ClaimedMessage, error: str
+) -> None:
+    """worker_request を諦めたら課長に知らせる（fan-out の batch を閉じられるように）。"""
+
+    lead = ctx.org.find(worker.reports_to) if worker.reports_to else None
+    if lead is None:
+        return
+    ref = parse_batch_marker(msg.body)
+    deliver_markdown(
+        root=ctx.root,
+        from_agent=worker.id,
+        to_agent=lead.id,
+        kind="impl_failed",
+        title=f"実装失敗: {msg.title}",
+        body=(batch_marker(*ref) + "\n\n" if ref else "")
+        + f"## 失敗\n- {worker.id}: 再試行の上限に達しました ({error})\n",
+    )
+
 
-        archive_message(root=root, agent_id=worker.id, message_path=p)
-        _set(root, status_path, worker.id, worker.name or worker.id, "idle", "")
+register_handler(ROLE_MANAGER, "boss_plan", _on_boss_plan)
+register_handler(ROLE_MANAGER, "review_result", _on_review_result)
+register_handler(ROLE_LEAD, "impl_request", _on_impl_request)
+register_handler(ROLE_LEAD, "impl_result", _on_impl_result)
+register_handler(ROLE_LEAD, "impl_failed", _on_impl_failed)
+register_handler(ROLE_WORKER, "worker_request", _on_worker_request)
+register_dead_letter_handler(ROLE_WORKER, "worker_request", _on_worker_request_dead)
@@ -0,0 +1,231 @@
+"""role x message kind のハンドラ登録と、agent ごとの inbox dispatcher。
+
+以前は watch が `dev_mgr` / `dev_impl_lead` / `dev_w1` / `qa_mgr` ... と agent id を
+決め打ちして tick を呼んでいたので、org.toml の他の部署は動かなかった。
+
+ここでは「role がこの kind を受け取ったら何をするか」だけを登録し、
+org の全 agent に同じ dispatcher を1つずつ割り当てる（watch では agent ごとの lane で並行）。
+
+- `register_handler(role, kind, handler)`: handler(ctx, agent, msg) を登録
+- `dispatch_tick(ctx, agent_id)`: その agent の inbox を claim して handler に渡し、ack する
+- `dispatch_agents(org)`: dispatcher を割り当てる agent（handler のある role のみ）
+
+handler は1通分の処理だけ書けばよい（claim/ack と idle への戻しは dispatcher がやる）。
+handler が例外を投げたら dispatcher が log して nack する（すぐ再配達、回数切れなら
+dead-letter）。同じ tick の残りの message はそのまま処理を続ける。
+dead-letter になったときの後始末（依頼元への失敗通知など）は
+`register_dead_letter_handler(role, kind, handler)` で登録する。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Collection
+from dataclasses import dataclass
+from pathlib import Path
+
+from usagi.agents import AgentMessage, CodexCLIBackend, LLMBackend, OfflineBackend, UsagiAgent
+from usagi.events import emit_event, events_path
+from usagi.mailbox import ClaimedMessage, ack_message, claim_messages, nack_message
+from usagi.org import ROLE_LEAD, ROLE_WORKER, AgentDef, Organization
+from usagi.runtime import RuntimeMode
+from usagi.state import set_agent_status
+
+log = logging.getLogger(__name__)
+
+# LLM の応答を受信中の進捗を events.log に書く間隔
+_PROGRESS_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class TickContext:
+    """handler に渡す共通の実行環境（watch の1ループ分）。"""
+
+    root: Path
+    status_path: Path | None
+    org: Organization
+    runtime: RuntimeMode
+    model: str
+    offline: bool
+    outputs_dir: Path | None = None
+    repo_root: Path | None = None
+    # assist_request の「あなたは〜です」（空なら agent 名）
+    role_hint: str = ""
+
+    def backend(self) -> LLMBackend:
+        return OfflineBackend() if self.offline else CodexCLIBackend()
+
+    def run_agent(self, agent: AgentDef, llm_agent: UsagiAgent, prompt: str) -> AgentMessage:
+        """llm_agent をストリーミングで呼び、受信中の進捗を events.log に流す（TUI 表示用）。"""
+
+        ev = events_path(self.root)
+        started = time.monotonic()
+        last = started
+        received = 0
+
+        def on_chunk(chunk: str) -> None:
+            nonlocal last, received
+            received += len(chunk)
+            now = time.monotonic()
+            if now - last >= _PROGRESS_SECONDS:
+                last = now
+                emit_event(
+                    ev,
+                    f"llm: {agent.id} receiving ({received} chars)",
+                    agent=agent.id,
+                    kind="progress",
+                )
+
+        msg = llm_agent.run_stream(
+            user_prompt=prompt, model=self.model, backend=self.backend(), on_chunk=on_chunk
+        )
+        emit_event(
+            ev,
+            f"llm: {agent.id} done ({received} chars)",
+            agent=agent.id,
+            kind="progress",
+            duration=time.monotonic() - started,
+        )
+        return msg
+
+    def set_status(self, agent: AgentDef, state: str, task: str = "") -> None:
+        set_agent_status(self.status_path, agent.id, agent.name or agent.id, state, task)
+        emit_event(
+            events_path(self.root),
+            f"agent: {agent.id} state={state} task={task}",
+            agent=agent.id,
+            kind="status",
+        )
+
+
+Handler = Callable[[TickContext, AgentDef, ClaimedMessage], None]
+# (ctx, agent, msg, error)
+DeadLetterHandler = Callable[[TickContext, AgentDef, ClaimedMessage, str], None]
+
+_handlers: dict[str, dict[str, Handler]] = {}
+_dead_letter_handlers: dict[str, dict[str, DeadLetterHandler]] = {}
+_handlers_lock = threading.Lock()
+_builtin_lock = threading.Lock()
+_builtin_loaded = False
+
+
+def register_handler(role: str, kind: str, handler: Handler) -> None:
+    """role の agent が kind の message を受け取ったときの処理を登録する（後勝ち）。"""
+
+    with _handlers_lock:
+        _handlers.setdefault(role, {})[kind] = handler
+
+
+def register_dead_letter_handler(role: str, kind: str, handler: DeadLetterHandler) -> None:
+    """role の kind の message が handler の失敗で dead-letter になったときの処理を登録する。"""
+
+    with _handlers_lock:
+        _dead_letter_handlers.setdefault(role, {})[kind] = handler
+
+
+def unregister_handler(role: str, kind: str) -> None:
+    with _handlers_lock:
+        kinds = _handlers.get(role, {})
+        kinds.pop(kind, None)
+        if not kinds:
+            _handlers.pop(role, None)
+        _dead_letter_handlers.get(role, {}).pop(kind, None)
+
+
+def get_handler(role: str, kind: str) -> Handler | None:
+    _ensure_builtin()
+    with _handlers_lock:
+        return _handlers.get(role, {}).get(kind)
+
+
+def handled_kinds(role: str) -> frozenset[str]:
+    _ensure_builtin()
+    with _handlers_lock:
+        return frozenset(_handlers.get(role, {}))
+
+
+def dispatch_agents(org: Organization) -> list[AgentDef]:
+    """dispatcher を割り当てる agent。
+
+    worker は lead 配下のものだけ（boss 直属の秘書等は inbox を別の経路で読む）。
+    """
+
+    out: list[AgentDef] = []
+    for a in org.agents:
+        if not handled_kinds(a.role):
+            continue
+        if a.role == ROLE_WORKER:
+            lead = org.find(a.reports_to) if a.reports_to else None
+            if lead is None or lead.role != ROLE_LEAD:
+                continue
+        out.append(a)
+    return out
+
+
+def dispatch_tick(
+    ctx: TickContext, agent_id: str, *, kinds: Collection[str] | None = None
+) -> int:
+    """agent_id の inbox を処理する。処理した件数を返す。
+
+    kinds を渡すとその kind だけ扱う（残りは claim_messages の規約どおり archive）。
+    """
+
+    agent = ctx.org.find(agent_id)
+    if agent is None:
+        return 0
+    handled = handled_kinds(agent.role)
+    if kinds is not None:
+        handled = handled & frozenset(kinds)
+    if not handled:
+        return 0
+
+    n = 0
+    for msg in claim_messages(root=ctx.root, agent_id=agent.id, kinds=handled):
+        handler = get_handler(agent.role, msg.kind)
+        try:
+            if handler is not None:
+                handler(ctx, agent, msg)
+                n += 1
+        except Exception as e:  # noqa: BLE001
+            log.exception("dispatch: %s failed on %s (%s)", agent.id, msg.name, msg.kind)
+            emit_event(
+                events_path(ctx.root),
+                f"dispatch: {agent.id} failed kind={msg.kind} {msg.name}: {type(e).__name__}: {e}",
+                agent=agent.id,
+            )
+            error = f"{type(e).__name__}: {e}"
+            if nack_message(root=ctx.root, message=msg, error=error):
+                _on_dead_letter(ctx, agent, msg, error)
+        else:
+            ack_message(root=ctx.root, message=msg)
+        finally:
+            ctx.set_status(agent, "idle")
+    return n
+
+
+def _on_dead_letter(ctx: TickContext, agent: AgentDef, msg: ClaimedMessage, error: str) -> None:
+    with _handlers_lock:
+        handler = _dead_letter_handlers.get(agent.role, {}).get(msg.kind)
+    if handler is None:
+        return
+    try:
+        handler(ctx, agent, msg, error)
+    except Exception:  # noqa: BLE001
+        log.exception("dispatch: dead-letter handler for %s (%s) failed", msg.name, msg.kind)
+
+
+def _ensure_builtin() -> None:
+    """組み込み handler（agent_chain / peer_assist）を登録する。"""
+
+    global _builtin_loaded
+    if _builtin_loaded:
+        return
+    with _builtin_lock:
+        if _builtin_loaded:
+            return
+        import usagi.agent_chain  # noqa: F401
+        import usagi.peer_assist  # noqa: F401
+
+        _builtin_loaded = True
@@ -6,10 +6,14 @@ OpenAI API（またはオフラインダミー）で応答を生成する。
 
 from __future__ import annotations
 
+import logging
+import time
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass
 from typing import Protocol
 
-from openai import OpenAI
+from usagi.llm_backend import openai_generate, openai_generate_stream
+from usagi.llm_cache import LLMCache, get_llm_cache
 
 
 class LLMBackend(Protocol):
@@ -18,15 +22,46 @@ class LLMBackend(Protocol):
     def generate(self, prompt: str, model: str) -> str: ...
 
 
+log = logging.getLogger(__name__)
+
+
+def cache_identity(backend: LLMBackend) -> str:
+    """応答キャッシュの key に使う backend の識別子。
+
+    `cache_identity()` を持つ backend はそれ（provider + 接続先）、無ければクラスの完全名。
+    """
+
+    ident = getattr(backend, "cache_identity", None)
+    if ident is not None:
+        return str(ident())
+    return f"{type(backend).__module__}.{type(backend).__qualname__}"
+
+
+def generate_stream(backend: LLMBackend, prompt: str, model: str) -> Iterator[str]:
+    """backend が generate_stream を持っていれば使い、無ければ一括応答を1チャンクで返す。"""
+
+    stream = getattr(backend, "generate_stream", None)
+    if stream is None:
+        yield backend.generate(prompt, model=model)
+        return
+    yield from stream(prompt, model=model)
+
+
 class OpenAIBackend:
     """OpenAI Responses API を使う本番バックエンド。"""
 
-    def __init__(self) -> None:
-        self._client = OpenAI()
+    # client は llm_backend の registry で共有し、APIキーは TokenPool から借りる
 
     def generate(self, prompt: str, model: str) -> str:
-        resp = self._client.responses.create(model=model, input=prompt)
-        return resp.output_text or ""
+        return openai_generate(prompt, model=model)
+
+    def cache_identity(self) -> str:
+        from usagi.llm_backend import LLM, LLMConfig
+
+        return LLM(LLMConfig(backend="openai")).cache_identity()
+
+    def generate_stream(self, prompt: str, model: str) -> Iterator[str]:
+        return openai_generate_stream(prompt, model=model)
 
 
 class CodexCLIBackend:
@@ -41,6 +76,17 @@ class CodexCLIBackend:
         llm = LLM(LLMConfig(backend="codex_cli", model=model))
         return llm.generate(prompt)
 
+    def cache_identity(self) -> str:
+        from usagi.llm_backend import LLM, LLMConfig
+
+        return LLM(LLMConfig(backend="codex_cli")).cache_identity()
+
+    def generate_stream(self, prompt: str, model: str) -> Iterator[str]:
+        from usagi.llm_backend import LLM, LLMConfig
+
+        llm = LLM(LLMConfig(backend="codex_cli", model=model))
+        return llm.generate_stream(prompt)
+
 
 class OfflineBackend:
     """APIを呼ばずにダミー応答を返すバックエンド。"""
@@ -48,6 +94,12 @@ class OfflineBackend:
     def generate(self, prompt: str, model: str) -> str:
         return f"(offline: model={model}, prompt_length={len(prompt)})"
 
+    def cache_identity(self) -> str:
+        return "offline"
+
+    def generate_stream(self, prompt: str, model: str) -> Iterator[str]:
+        yield self.generate(prompt, model=model)
+
 
 @dataclass
 class AgentMessage:
@@ -64,9 +116,75 @@ class UsagiAgent:
     role: str  # planner | coder | reviewer
     system_prompt: str
 
-    def run(self, *, user_prompt: str, model: str, backend: LLMBackend) -> AgentMessage:
+    def run(
+        self,
+        *,
+        user_prompt: str,
+        model: str,
+        backend: LLMBackend,
+        cache: LLMCache | None = None,
+    ) -> AgentMessage:
+        full_prompt = f"{self.system_prompt}\n\n{user_prompt}"
+
+        # 応答キャッシュ（runtime で有効化された場合のみ）
+        cache = cache or get_llm_cache()
+        if cache is None:
+            content = backend.generate(full_prompt, model=model)
+            return AgentMessage(agent_name=self.name, role=self.role, content=content)
+
+        key = cache.key(cache_identity(backend), model, full_prompt)
+        content = cache.get(key)
+        if content is None:
+            content = backend.generate(full_prompt, model=model)
+            # 空応答は失敗の可能性が高いので残さない
+            if content.strip():
+                cache.put(key, content)
+        return AgentMessage(agent_name=self.name, role=self.role, content=content)
+
+    def run_stream(
+        self,
+        *,
+        user_prompt: str,
+        model: str,
+        backend: LLMBackend,
+        on_chunk: Callable[[str], None] | None = None,
+        cache: LLMCache | None = None,
+    ) -> AgentMessage:
+        """run() のストリーミング版。
+
+        チャンクが届くたびに on_chunk を呼ぶ（TUI/events/Discord の進捗表示用）。
+        最初のチャンクまでの時間(TTFT)と全体時間は logging に残す。
+        応答キャッシュは run() と同じ（ヒットしたら1チャンクで返す）。
+        """
+
         full_prompt = f"{self.system_prompt}\n\n{user_prompt}"
-        content = backend.generate(full_prompt, model=model)
+        cache = cache or get_llm_cache()
+        key = cache.key(cache_identity(backend), model, full_prompt) if cache else ""
+        if cache is not None and (hit := cache.get(key)) is not None:
+            if on_chunk is not None:
+                on_chunk(hit)
+            return AgentMessage(agent_name=self.name, role=self.role, content=hit)
+
+        started = time.monotonic()
+        ttft: float | None = None
+        chunks: list[str] = []
+        for chunk in generate_stream(backend, full_prompt, model):
+            if ttft is None:
+                ttft = time.monotonic() - started
+            chunks.append(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
+
+        log.info(
+            "llm stream: agent=%s backend=%s ttft=%.2fs total=%.2fs",
+            self.name,
+            type(backend).__name__,
+            ttft if ttft is not None else -1.0,
+            time.monotonic() - started,
+        )
+        content = "".join(chunks)
+        if cache is not None and content.strip():
+            cache.put(key, content)
         return AgentMessage(agent_name=self.name, role=self.role, content=content)
 
 
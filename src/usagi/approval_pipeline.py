@@ -17,6 +17,9 @@
 
 from __future__ import annotations
 
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from pathlib import Path
@@ -24,6 +27,7 @@ from pathlib import Path
 from usagi.agents import AgentMessage, CodexCLIBackend, LLMBackend, OfflineBackend, UsagiAgent
 from usagi.approval import Assignment, assign_default
 from usagi.artifacts import write_artifact
+from usagi.events import emit_event, events_path
 from usagi.prompt_compact import compact_for_prompt
 from usagi.git_ops import team_branch
 from usagi.org import AgentDef, Organization
@@ -32,8 +36,9 @@ from usagi.report_state import update_boss_report
 from usagi.runtime import RuntimeMode
 from usagi.secretary import place_input_for_boss
 from usagi.spec import UsagiSpec
-from usagi.state import AgentStatus, load_status, save_status
+from usagi.state import set_agent_status
 from usagi.mailbox import deliver_markdown
+from usagi.worktree_pool import get_worktree_pool
 from usagi.vote import Vote, decide_2of3, parse_decision
 
 
@@ -79,19 +84,14 @@ def run_approval_pipeline(
     actions: list[str] = []
 
     def _set(agent_id: str, name: str, state: str, task: str) -> None:
-        if status_path is not None:
-            st = load_status(status_path)
-            st.set(AgentStatus(agent_id=agent_id, name=name, state=state, task=task))
-            save_status(status_path, st)
+        set_agent_status(status_path, agent_id, name, state, task)
         # also record to events
-        try:
-            ev = root / ".usagi" / "events.log"
-            ev.parent.mkdir(parents=True, exist_ok=True)
-            ts = datetime.now(tz=UTC).strftime("%Y-%m-%d %H:%M:%S")
-            with ev.open("a", encoding="utf-8") as f:
-                f.write(f"[{ts}] agent: {agent_id} state={state} task={task}\n")
-        except Exception:
-            pass
+        emit_event(
+            events_path(root),
+            f"agent: {agent_id} state={state} task={task}",
+            agent=agent_id,
+            kind="status",
+        )
 
     # artifacts
     write_artifact(
@@ -288,9 +288,12 @@ def run_approval_pipeline(
             base_repo = (repo_root or workdir) / ".usagi" / "repo"
             wt_dir = (repo_root or workdir) / ".usagi" / "worktrees" / team_branch(lead.id)
             repo = GitRepo(base_repo)
-            repo.merge_to_main_and_delete_branch(team_branch(lead.id))
             repo.worktree_remove(wt_dir)
-            actions.append(f"git merge main <= {team_branch(lead.id)}")
+            res = repo.merge_to_main_and_delete_branch(team_branch(lead.id))
+            actions.append(
+                f"merge queue: main <= {team_branch(lead.id)} "
+                f"({res.status}, wait {res.wait_seconds:.2f}s, batch {res.batch})"
+            )
             actions.append(f"git branch delete {team_branch(lead.id)}")
         except Exception as e:  # noqa: BLE001
             actions.append(f"merge/delete failed: {type(e).__name__}: {e}")
@@ -370,11 +373,15 @@ def _run_worker_step_worktree(
     backend: LLMBackend,
     runtime: RuntimeMode,
     offline: bool,
+    branch: str | None = None,
 ) -> AgentMessage:
     """ワーカーの実装ステップ（worktree方式）。
 
     - DoD/DooD を避け、git worktree + codex CLI で作業する
     - 成果物は unified diff として返す
+    - worktree は WorktreePool から1 job に1つ借りる（同じ課の job が並行しても踏み合わない）
+    - 変更は branch（既定は課ブランチ、worker_branch を渡すと worker 個別）に commit する
+      （worker ブランチの集約は lead が課ブランチへ merge する）
     """
 
     import logging
@@ -385,74 +392,93 @@ def _run_worker_step_worktree(
     log = logging.getLogger(__name__)
 
     team = team_branch(lead.id)
+    branch = branch or team
 
-    # base repo: repo_root 配下に repo を作り、worktree はその横に切る
+    # base repo: repo_root 配下に repo を作り、worktree はプールから借りる
     # layout:
     # - <repo_root>/.usagi/repo/  (bareではない通常repo)
-    # - <repo_root>/.usagi/worktrees/<team>/ (worktree)
-    base_repo = repo_root / ".usagi" / "repo"
-    wt_dir = repo_root / ".usagi" / "worktrees" / team
-
-    repo = GitRepo(base_repo)
-    base_repo.mkdir(parents=True, exist_ok=True)
-    repo.ensure_repo()
-    repo.ensure_initial_commit()
+    # - <repo_root>/.usagi/worktrees/pool/<n>/ (貸し出し式の worktree。detached HEAD)
+    pool = get_worktree_pool(repo_root, runtime.worktree_pool)
+    if branch != team:
+        repo = GitRepo(repo_root / ".usagi" / "repo")
+        repo.ensure_repo()
+        repo.ensure_initial_commit()
+        if not repo.branch_exists(team):
+            repo.create_branch(team, "main")
+
+    # 1 job = 1 worktree（同じ課の job が並行しても踏み合わない）
+    with pool.acquire(branch, base=team if branch != team else "main") as lease:
+        wt_dir = lease.path
+        if branch != team:
+            # 他の worker の成果（課ブランチに集約済み）を取り込んでから始める
+            try:
+                lease.repo.run(["merge", "--no-edit", team])
+            except RuntimeError:
+                try:
+                    lease.repo.run(["merge", "--abort"])
+                except RuntimeError:
+                    pass
+
+        # worker prompt
+        plan_compact = compact_for_prompt(
+            plan.content,
+            stage="worker_plan",
+            max_chars=runtime.compress.max_chars_default,
+            enabled=runtime.compress.enabled,
+        )
+        prompt = (
+            f"社長の方針/計画(圧縮):\n\n{plan_compact}\n\n"
+            f"プロジェクト名: {spec.project}\n"
+            f"課ブランチ: {team}\n\n"
+            "作業はこの作業ディレクトリ上で行ってください。\n"
+            "最終的に `git diff` 相当の Unified diff 形式で出力してください。\n"
+        )
 
-    # worktree を作成（既にあれば使う）
-    repo.worktree_add(wt_dir, team)
+        if offline:
+            # backend は offline のダミーだが、作業場だけは用意
+            content = backend.generate(prompt, model=model)
+            return AgentMessage(agent_name=worker.name or worker.id, role="coder", content=content)
 
-    # worker prompt
-    plan_compact = compact_for_prompt(
-        plan.content,
-        stage="worker_plan",
-        max_chars=runtime.compress.max_chars_default,
-        enabled=runtime.compress.enabled,
-    )
-    prompt = (
-        f"社長の方針/計画(圧縮):\n\n{plan_compact}\n\n"
-        f"プロジェクト名: {spec.project}\n"
-        f"課ブランチ: {team}\n\n"
-        "作業はこの作業ディレクトリ上で行ってください。\n"
-        "最終的に `git diff` 相当の Unified diff 形式で出力してください。\n"
-    )
+        # codex exec はカレントディレクトリのファイルに対して編集する想定
+        cmd = ["codex", "exec", prompt]
+        log.info("worker(worktree) cmd: %s", " ".join(cmd))
+        r = subprocess.run(cmd, cwd=wt_dir, text=True, capture_output=True, check=False)
+        if r.returncode != 0:
+            log.error("worker(worktree) failed: code=%d", r.returncode)
+            stderr_tail = "\n".join((r.stderr or "").splitlines()[-50:])
+            if stderr_tail:
+                log.error("worker(worktree) stderr tail:\n%s", stderr_tail)
+            return AgentMessage(
+                agent_name=worker.name or worker.id,
+                role="coder",
+                content=(
+                    f"(worker worktree failed with code {r.returncode})\n"
+                    "See `.usagi/logs/usagi.log` for stderr tail.\n"
+                ),
+            )
 
-    if offline:
-        # backend は offline のダミーだが、作業場だけは用意
-        content = backend.generate(prompt, model=model)
-        return AgentMessage(agent_name=worker.name or worker.id, role="coder", content=content)
-
-    # codex exec はカレントディレクトリのファイルに対して編集する想定
-    cmd = ["codex", "exec", prompt]
-    log.info("worker(worktree) cmd: %s", " ".join(cmd))
-    r = subprocess.run(cmd, cwd=wt_dir, text=True, capture_output=True, check=False)
-    if r.returncode != 0:
-        log.error("worker(worktree) failed: code=%d", r.returncode)
-        stderr_tail = "\n".join((r.stderr or "").splitlines()[-50:])
-        if stderr_tail:
-            log.error("worker(worktree) stderr tail:\n%s", stderr_tail)
-        return AgentMessage(
-            agent_name=worker.name or worker.id,
-            role="coder",
-            content=(
-                f"(worker worktree failed with code {r.returncode})\n"
-                "See `.usagi/logs/usagi.log` for stderr tail.\n"
-            ),
-        )
+        content = (r.stdout or "").strip()
+        if not content:
+            # safety: if codex didn't output diff, fall back to actual git diff
+            try:
+                diff = subprocess.run(
+                    ["git", "diff"],
+                    cwd=wt_dir,
+                    text=True,
+                    capture_output=True,
+                    check=False,
+                ).stdout
+                content = diff.strip()
+            except Exception:
+                content = ""
 
-    content = (r.stdout or "").strip()
-    if not content:
-        # safety: if codex didn't output diff, fall back to actual git diff
+        # worktree は返却後に reset されるので、成果は branch に commit して残す
+        # （worker ブランチなら lead が課ブランチへ merge する）
         try:
-            diff = subprocess.run(
-                ["git", "diff"],
-                cwd=wt_dir,
-                text=True,
-                capture_output=True,
-                check=False,
-            ).stdout
-            content = diff.strip()
-        except Exception:
-            content = ""
+            if not lease.commit(f"{worker.id}: {spec.objective[:60]}"):
+                log.error("worker(worktree) could not update %s", branch)
+        except RuntimeError as e:
+            log.error("worker(worktree) commit failed: %s", e)
 
     return AgentMessage(agent_name=worker.name or worker.id, role="coder", content=content)
 
@@ -568,33 +594,40 @@ def _run_3persona_vote(
     status_path: Path | None = None,
     root: Path | None = None,
 ) -> list[Vote]:
-    votes: list[Vote] = []
+    """3人格に並行で投票させる。
+
+    - 3人に同時に問い合わせる（直列だと LLM 3往復ぶん待つ）
+    - 2票そろって decide_2of3 が確定したら残りは待たない（abstain 扱い）
+    - 人格ごとに timeout（runtime.vote.voter_timeout_seconds）を超えたら abstain 扱い
+    """
+
     voter_ids = list(runtime.vote.voters)
     if len(voter_ids) < 3:
         # 最低3人格が前提
         voter_ids = (voter_ids + [runtime.boss_id, "ghost_boss", "secretary"])[:3]
+    voter_ids = voter_ids[:3]
 
-    for vid in voter_ids[:3]:
+    names = {}
+    for vid in voter_ids:
         a = org.find(vid)
-        name = a.name if a else vid
-
-        # status + events
-        if status_path is not None:
-            st = load_status(status_path)
-            st.set(AgentStatus(agent_id=vid, name=name, state="working", task="vote"))
-            save_status(status_path, st)
-        if root is not None:
-            try:
-                ev = root / ".usagi" / "events.log"
-                ev.parent.mkdir(parents=True, exist_ok=True)
-                ts = datetime.now(tz=UTC).strftime("%Y-%m-%d %H:%M:%S")
-                with ev.open("a", encoding="utf-8") as f:
-                    f.write(f"[{ts}] agent: {vid} state=working task=vote\n")
-            except Exception:
-                pass
+        names[vid] = a.name if a else vid
+
+    status_lock = threading.Lock()
+
+    def _mark(vid: str, state: str, task: str) -> None:
+        with status_lock:
+            set_agent_status(status_path, vid, names[vid], state, task)
+            if root is not None:
+                emit_event(
+                    events_path(root),
+                    f"agent: {vid} state={state} task={task}",
+                    agent=vid,
+                    kind="vote",
+                )
 
+    def _ask(vid: str) -> Vote:
         agent = UsagiAgent(
-            name=name,
+            name=names[vid],
             role="vote",
             system_prompt=(
                 "あなたは社長の人格の一つです。\n"
@@ -602,24 +635,52 @@ def _run_3persona_vote(
                 "出力に必ず decision: approve|block|abstain を含めてください。"
             ),
         )
-        resp = agent.run(user_prompt=context, model=model, backend=backend)
-        decision = parse_decision(resp.content)
-        votes.append(Vote(voter_id=vid, decision=decision, reason=resp.content.strip()))
-
-        if status_path is not None:
-            st = load_status(status_path)
-            st.set(AgentStatus(agent_id=vid, name=name, state="idle", task=""))
-            save_status(status_path, st)
-        if root is not None:
-            try:
-                ev = root / ".usagi" / "events.log"
-                ts = datetime.now(tz=UTC).strftime("%Y-%m-%d %H:%M:%S")
-                with ev.open("a", encoding="utf-8") as f:
-                    f.write(f"[{ts}] agent: {vid} state=idle task=\n")
-            except Exception:
-                pass
+        try:
+            resp = agent.run(user_prompt=context, model=model, backend=backend)
+        finally:
+            _mark(vid, "idle", "")
+        return Vote(
+            voter_id=vid,
+            decision=parse_decision(resp.content),
+            reason=resp.content.strip(),
+        )
+
+    for vid in voter_ids:
+        _mark(vid, "working", "vote")
 
-    return votes
+    votes: dict[str, Vote] = {}
+    timeout = runtime.vote.voter_timeout_seconds
+    pool = ThreadPoolExecutor(max_workers=len(voter_ids), thread_name_prefix="usagi-vote")
+    try:
+        futures = {pool.submit(_ask, vid): vid for vid in voter_ids}
+        try:
+            for fut in as_completed(futures, timeout=timeout):
+                vid = futures[fut]
+                try:
+                    votes[vid] = fut.result()
+                except Exception as e:  # noqa: BLE001
+                    votes[vid] = Vote(
+                        voter_id=vid, decision="abstain", reason=f"(error: {type(e).__name__}: {e})"
+                    )
+                if decide_2of3(list(votes.values())) != "tie":
+                    # 2票で確定。残りの人格は待たない
+                    break
+        except FuturesTimeout:
+            pass
+    finally:
+        # 実行中の LLM 呼び出しは止められないので、待たずに手放す
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    decided = decide_2of3(list(votes.values())) != "tie"
+    out: list[Vote] = []
+    for vid in voter_ids:
+        if vid in votes:
+            out.append(votes[vid])
+            continue
+        reason = "(skipped: decided by 2 votes)" if decided else f"(timeout: {timeout}s)"
+        out.append(Vote(voter_id=vid, decision="abstain", reason=reason))
+        _mark(vid, "idle", "")
+    return out
 
 
 def _build_questions_for_human(
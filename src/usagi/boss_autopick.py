@@ -10,9 +10,9 @@ This is intentionally simple; can be upgraded later.
 
 from __future__ import annotations
 
-import time
 from pathlib import Path
 
+from usagi.events import emit_event, events_path
 from usagi.mailbox import deliver_markdown
 from usagi.org import Organization
 from usagi.report_sections import parse_section
@@ -20,14 +20,7 @@ from usagi.runtime import RuntimeMode
 
 
 def _event(root: Path, msg: str) -> None:
-    try:
-        p = root / ".usagi" / "events.log"
-        p.parent.mkdir(parents=True, exist_ok=True)
-        ts = time.strftime("%Y-%m-%d %H:%M:%S")
-        with p.open("a", encoding="utf-8") as f:
-            f.write(f"[{ts}] {msg}\n")
-    except Exception:
-        return
+    emit_event(events_path(root), msg)
 
 
 def boss_autopick(*, root: Path, outputs_dir: Path, org: Organization, runtime: RuntimeMode) -> None:
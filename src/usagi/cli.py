@@ -132,7 +132,6 @@ def watch(
         recursive=recursive,
         org_path=Path("examples/org.toml"),
         runtime_path=Path("usagi.runtime.toml"),
-        worker_pool_size=5,
         stop_file=Path(".usagi/STOP"),
         status_path=Path(".usagi/status.json"),
         event_log_path=Path(".usagi/events.log"),
@@ -165,7 +164,6 @@ def autopilot_start(
         recursive=True,
         org_path=Path("examples/org.toml"),
         runtime_path=Path("usagi.runtime.toml"),
-        worker_pool_size=5,
         stop_file=Path(".usagi/STOP"),
         status_path=Path(".usagi/status.json"),
         event_log_path=Path(".usagi/events.log"),
@@ -273,6 +271,23 @@ def retrain_decide(
     console.print(result)
 
 
+@app.command("mailbox-export")
+def mailbox_export(
+    runtime_path: Path = typer.Option(Path("usagi.runtime.toml"), "--runtime", help="runtime toml"),
+    root: Path = typer.Option(Path("."), "--root", help="project root"),
+    out: Path = typer.Option(None, "--out", help="出力先（既定: .usagi/mailbox-export）"),
+) -> None:
+    """mailbox（sqlite backend）を人が読める Markdown に書き出す。"""
+
+    from usagi.mailbox import configure_mailbox, export_markdown
+    from usagi.runtime import load_runtime
+
+    root = root.resolve()
+    configure_mailbox(root, load_runtime(runtime_path).mailbox)
+    n = export_markdown(root, out)
+    console.print(f"exported: {n} messages", style="green")
+
+
 @app.command()
 def mcp() -> None:
     """stdin MCP wrapper を起動（簡易）。"""
@@ -7,7 +7,10 @@
 from __future__ import annotations
 
 import subprocess
+import threading
+from collections.abc import Iterator
 from dataclasses import dataclass
+from typing import IO
 
 
 @dataclass
@@ -41,3 +44,79 @@ class CLIBackend:
             msg = proc.stderr.strip() or f"CLI failed: {self.command}"
             raise RuntimeError(msg)
         return proc.stdout
+
+    def run_stream(
+        self,
+        prompt: str,
+        *,
+        env: dict[str, str] | None = None,
+        args: list[str] | None = None,
+        use_stdin: bool = True,
+    ) -> Iterator[str]:
+        """run() のストリーミング版。stdout を行単位で逐次返す。
+
+        - timeout_seconds を超えたらプロセスを kill して RuntimeError
+        - stdin への書き込みと stderr の読み出しはパイプ詰まり防止のため別スレッドで行う
+          （CLI が stdin を読み切る前に stdout へ書き始めても詰まらない）
+        """
+
+        cmd = self.command + (args or [])
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if use_stdin else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+                env=env,
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError(f"CLI not found: {self.command[0]}") from e
+
+        stderr_chunks: list[str] = []
+        err_reader = threading.Thread(
+            target=lambda: stderr_chunks.append(proc.stderr.read() if proc.stderr else ""),
+            daemon=True,
+        )
+        err_reader.start()
+        writer: threading.Thread | None = None
+        if use_stdin and proc.stdin is not None:
+            writer = threading.Thread(target=_feed, args=(proc.stdin, prompt), daemon=True)
+            writer.start()
+        timed_out = threading.Event()
+
+        def _kill() -> None:
+            timed_out.set()
+            proc.kill()
+
+        killer = threading.Timer(self.timeout_seconds, _kill)
+        killer.start()
+        try:
+            assert proc.stdout is not None
+            yield from proc.stdout
+            proc.wait()
+        finally:
+            killer.cancel()
+            if proc.poll() is None:
+                # 呼び出し側が途中で読むのをやめた
+                proc.kill()
+                proc.wait()
+            err_reader.join(timeout=1.0)
+            if writer is not None:
+                writer.join(timeout=1.0)
+
+        if timed_out.is_set():
+            raise RuntimeError(f"CLI timed out after {self.timeout_seconds}s: {self.command}")
+        if proc.returncode != 0:
+            msg = "".join(stderr_chunks).strip() or f"CLI failed: {self.command}"
+            raise RuntimeError(msg)
+
+
+def _feed(stdin: IO[str], prompt: str) -> None:
+    try:
+        stdin.write(prompt)
+        stdin.close()
+    except (BrokenPipeError, OSError, ValueError):
+        # CLI が stdin を読まずに終了した / kill された
+        pass
@@ -0,0 +1,236 @@
+"""events.log の共有 writer。
+
+`.usagi/events.log` は人間向けのイベントログ（TUI が表示する）。
+各モジュールは `emit_event()` を呼ぶだけにして、書き込みはここに集約する。
+
+- watch 中は `start_event_sink()` でバックグラウンド writer を起動し、
+  呼び出し側はキューに積むだけ（ファイルを開かない）
+- writer はまとめて書いて flush_seconds ごとに fsync する
+- サイズ上限を超えたら events.log.1, .2 ... にローテート
+- 任意で `events.jsonl`（ts/agent/kind/duration 付き）を併記する
+
+writer 未起動のパスは従来どおりその場で追記する（CLI/テスト用）。
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from usagi.runtime import EventLogConfig
+
+
+def events_path(root: Path) -> Path:
+    return root / ".usagi" / "events.log"
+
+
+class EventSink:
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int = 5_000_000,
+        backups: int = 3,
+        flush_seconds: float = 0.5,
+        jsonl: bool = False,
+    ) -> None:
+        self.path = path
+        self.jsonl_path = path.with_suffix(".jsonl")
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_seconds = flush_seconds
+        self.jsonl = jsonl
+        self._q: queue.SimpleQueue[tuple[str, dict] | threading.Event | None] = queue.SimpleQueue()
+        self._write_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def emit(
+        self,
+        msg: str,
+        *,
+        agent: str = "",
+        kind: str = "",
+        duration: float | None = None,
+    ) -> None:
+        now = time.time()
+        line = f"[{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))}] {msg}\n"
+        rec: dict = {}
+        if self.jsonl:
+            rec = {"ts": round(now, 3), "msg": msg, "agent": agent, "kind": kind}
+            if duration is not None:
+                rec["duration"] = round(duration, 3)
+        if self._thread is not None:
+            self._q.put((line, rec))
+            return
+        self._write([(line, rec)], fsync=False)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        t = threading.Thread(target=self._run, name="usagi-events", daemon=True)
+        self._thread = t
+        t.start()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """キュー済みのイベントが書かれるまで待つ。"""
+
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._q.put(done)
+        done.wait(timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        t = self._thread
+        if t is None:
+            return
+        self._q.put(None)
+        t.join(timeout)
+        self._thread = None
+
+    # ---- internal ----
+
+    def _run(self) -> None:
+        last_sync = time.monotonic()
+        unsynced = False
+        while True:
+            try:
+                item = self._q.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                if unsynced:
+                    self._sync()
+                    unsynced = False
+                    last_sync = time.monotonic()
+                continue
+            batch: list[tuple[str, dict]] = []
+            waiters: list[threading.Event] = []
+            stop = False
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                try:
+                    item = self._q.get_nowait()
+                except queue.Empty:
+                    break
+
+            now = time.monotonic()
+            fsync = stop or bool(waiters) or now - last_sync >= self.flush_seconds
+            if batch:
+                self._write(batch, fsync=fsync)
+                unsynced = not fsync
+            if fsync:
+                last_sync = now
+            for w in waiters:
+                w.set()
+            if stop:
+                return
+
+    def _write(self, batch: list[tuple[str, dict]], *, fsync: bool) -> None:
+        try:
+            with self._write_lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                text = "".join(line for line, _rec in batch)
+                self._rotate_if_needed(len(text.encode("utf-8")))
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write(text)
+                    f.flush()
+                    if fsync:
+                        os.fsync(f.fileno())
+                if self.jsonl:
+                    with self.jsonl_path.open("a", encoding="utf-8") as f:
+                        for _line, rec in batch:
+                            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        except Exception:
+            # best-effort: イベントログの失敗で本処理を止めない
+            return
+
+    def _sync(self) -> None:
+        try:
+            with self._write_lock, self.path.open("a", encoding="utf-8") as f:
+                os.fsync(f.fileno())
+        except Exception:
+            return
+
+    def _rotate_if_needed(self, incoming: int) -> None:
+        if self.max_bytes <= 0:
+            return
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size == 0 or size + incoming <= self.max_bytes:
+            return
+        for p in (self.path, self.jsonl_path):
+            if self.backups <= 0:
+                p.unlink(missing_ok=True)
+                continue
+            for i in range(self.backups - 1, 0, -1):
+                src = p.with_name(f"{p.name}.{i}")
+                if src.exists():
+                    os.replace(src, p.with_name(f"{p.name}.{i + 1}"))
+            if p.exists():
+                os.replace(p, p.with_name(f"{p.name}.1"))
+
+
+_sinks: dict[Path, EventSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_event_sink(path: Path) -> EventSink:
+    key = path.resolve()
+    with _sinks_lock:
+        sink = _sinks.get(key)
+        if sink is None:
+            sink = _sinks[key] = EventSink(path)
+        return sink
+
+
+def start_event_sink(path: Path, cfg: EventLogConfig) -> EventSink:
+    """設定を反映してバックグラウンド writer を起動する（watch 用）。"""
+
+    sink = get_event_sink(path)
+    sink.max_bytes = int(cfg.max_mb * 1024 * 1024)
+    sink.backups = cfg.backups
+    sink.flush_seconds = cfg.flush_seconds
+    sink.jsonl = cfg.jsonl
+    sink.start()
+    return sink
+
+
+def emit_event(
+    path: Path | None,
+    msg: str,
+    *,
+    agent: str = "",
+    kind: str = "",
+    duration: float | None = None,
+) -> None:
+    """events.log に1行書く（path が None なら何もしない）。"""
+
+    if path is None:
+        return
+    try:
+        get_event_sink(path).emit(msg, agent=agent, kind=kind, duration=duration)
+    except Exception:
+        return
+
+
+@atexit.register
+def stop_event_sinks() -> None:
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+    for sink in sinks:
+        sink.stop()
@@ -0,0 +1,254 @@
+"""lead -> worker の並列割り振り（fan-out / gather）。
+
+- `split_subtasks`: 課長の実装指示から `## サブタスク` の箇条書きを取り出す
+- `assign_least_loaded`: 配下 worker のうち、未完了の割り当て + 稼働中 の少ない順に配る
+- batch: 1つの impl_request から出したサブタスク群を `.usagi/batches/<id>.json` で追跡し、
+  全 worker の結果が揃ったら lead がまとめてレビューする。worker が失敗して依頼が
+  dead-letter になったサブタスクは failed として数える（batch が閉じなくならないように）
+- batch は lead のレビュー結果を部長に送ってから閉じる（archive/ に移す）。閉じた後に
+  同じ impl_result が再配送されたら、archive/ の batch をそのまま返して全体をレビューし直す
+- `open_load` は BATCH_TTL_SECONDS より古い batch を数えない（取り残された batch で
+  割り振りが偏らないように）
+
+worker_request / impl_result の本文先頭に `<!-- usagi-batch: <id>#<index> -->` を入れて
+どの batch のどのサブタスクかを運ぶ（mailbox の frontmatter は増やさない）。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from usagi.git_ops import GitRepo, team_branch, worker_branch
+from usagi.org import ROLE_WORKER, AgentDef, Organization
+from usagi.state import AgentStatus
+from usagi.worktree_pool import get_worktree_pool
+
+_MARKER_RE = re.compile(r"<!-- usagi-batch: (?P<id>[\w.-]+)#(?P<index>\d+) -->")
+_SUBTASK_HEADINGS = ("サブタスク", "Subtasks")
+
+BATCH_TTL_SECONDS = 6 * 3600.0
+
+
+@dataclass
+class Subtask:
+    index: int
+    worker: str
+    title: str
+    status: str = "pending"  # pending | done | failed
+    result: str = ""
+
+
+@dataclass
+class Batch:
+    id: str
+    lead: str
+    title: str
+    created: float = field(default_factory=time.time)
+    subtasks: list[Subtask] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return all(s.status != "pending" for s in self.subtasks)
+
+    def done_count(self) -> int:
+        """結果が返ってきた（done/failed）サブタスク数。"""
+
+        return sum(1 for s in self.subtasks if s.status != "pending")
+
+
+def batches_dir(root: Path) -> Path:
+    return root / ".usagi" / "batches"
+
+
+def workers_of(org: Organization, lead_id: str) -> list[AgentDef]:
+    return [a for a in org.subordinates_of(lead_id) if a.role == ROLE_WORKER]
+
+
+def split_subtasks(brief: str, *, max_parts: int) -> list[str]:
+    """`## サブタスク` 直下のトップレベル箇条書き。無ければ brief 全体で1件。"""
+
+    items: list[str] = []
+    in_section = False
+    for line in brief.splitlines():
+        if line.startswith("#"):
+            in_section = line.lstrip("#").strip() in _SUBTASK_HEADINGS
+            continue
+        if in_section and line.startswith(("- ", "* ")):
+            text = line[2:].strip()
+            if text:
+                items.append(text)
+    if not items:
+        return [""]
+    if max_parts > 0 and len(items) > max_parts:
+        # worker 数より多ければ後ろをまとめる（割り当ては worker 数まで）
+        head, tail = items[: max_parts - 1], items[max_parts - 1 :]
+        items = [*head, " / ".join(tail)]
+    return items
+
+
+def assign_least_loaded(
+    subtasks: list[str],
+    workers: list[AgentDef],
+    *,
+    load: dict[str, int],
+    status: dict[str, AgentStatus] | None = None,
+) -> list[tuple[str, AgentDef]]:
+    """負荷（未完了の割り当て数 + 稼働中なら 1）の小さい worker から順に配る。"""
+
+    if not workers:
+        return []
+    cur = {w.id: load.get(w.id, 0) for w in workers}
+    for w in workers:
+        st = (status or {}).get(w.id)
+        if st is not None and st.state != "idle":
+            cur[w.id] += 1
+    order = {w.id: i for i, w in enumerate(workers)}
+    by_id = {w.id: w for w in workers}
+    out: list[tuple[str, AgentDef]] = []
+    for task in subtasks:
+        wid = min(cur, key=lambda k: (cur[k], order[k]))
+        cur[wid] += 1
+        out.append((task, by_id[wid]))
+    return out
+
+
+def open_load(root: Path, *, ttl_seconds: float = BATCH_TTL_SECONDS) -> dict[str, int]:
+    """未完了 batch の worker ごとの未完了サブタスク数（ttl_seconds より古い batch は除く）。"""
+
+    load: dict[str, int] = {}
+    cutoff = time.time() - ttl_seconds
+    for b in _iter_batches(root):
+        if b.created < cutoff:
+            continue
+        for s in b.subtasks:
+            if s.status == "pending":
+                load[s.worker] = load.get(s.worker, 0) + 1
+    return load
+
+
+def create_batch(root: Path, *, lead: str, title: str, assignments: list[tuple[str, str]]) -> Batch:
+    """assignments: [(subtask title, worker id)]"""
+
+    batch_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{lead}-{uuid.uuid4().hex[:6]}"
+    b = Batch(
+        id=batch_id,
+        lead=lead,
+        title=title,
+        subtasks=[Subtask(index=i, worker=w, title=t) for i, (t, w) in enumerate(assignments)],
+    )
+    save_batch(root, b)
+    return b
+
+
+def record_result(
+    root: Path, batch_id: str, index: int, result: str, *, failed: bool = False
+) -> Batch | None:
+    b = load_batch(root, batch_id)
+    if b is None:
+        # 閉じた後の再配送: 閉じた時点の batch を返す（書き換えない）
+        return load_batch(root, batch_id, archived=True)
+    for s in b.subtasks:
+        if s.index == index:
+            s.status = "failed" if failed else "done"
+            s.result = result
+    save_batch(root, b)
+    return b
+
+
+def close_batch(root: Path, batch_id: str) -> None:
+    """完了した batch を片付ける（archive/ に移す）。"""
+
+    src = batches_dir(root) / f"{batch_id}.json"
+    dst = _archive_dir(root) / src.name
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        src.replace(dst)
+    except FileNotFoundError:
+        pass
+
+
+def gather_branches(repo_root: Path, lead_id: str, worker_ids: list[str]) -> list[str]:
+    """worker ブランチを課ブランチに merge する。衝突したものは abort してメモを返す。"""
+
+    repo = GitRepo(repo_root / ".usagi" / "repo")
+    team = team_branch(lead_id)
+    notes: list[str] = []
+    with get_worktree_pool(repo_root).acquire(team) as lease:
+        wt = lease.repo
+        for wid in dict.fromkeys(worker_ids):
+            branch = worker_branch(lead_id, wid)
+            if not repo.branch_exists(branch):
+                continue
+            try:
+                wt.run(["merge", "--no-edit", branch])
+                notes.append(f"merged {branch} -> {team}")
+            except RuntimeError as e:
+                try:
+                    wt.run(["merge", "--abort"])
+                except RuntimeError:
+                    pass
+                notes.append(f"merge conflict {branch} -> {team}: {e}")
+        if not lease.commit(f"gather: {team}"):
+            notes.append(f"could not update {team}")
+    return notes
+
+
+def load_batch(root: Path, batch_id: str, *, archived: bool = False) -> Batch | None:
+    p = (_archive_dir(root) if archived else batches_dir(root)) / f"{batch_id}.json"
+    try:
+        return _from_json(json.loads(p.read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+
+
+def save_batch(root: Path, b: Batch) -> None:
+    d = batches_dir(root)
+    d.mkdir(parents=True, exist_ok=True)
+    p = d / f"{b.id}.json"
+    tmp = p.with_name(p.name + ".tmp")
+    tmp.write_text(json.dumps(asdict(b), ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, p)
+
+
+def batch_marker(batch_id: str, index: int) -> str:
+    return f"<!-- usagi-batch: {batch_id}#{index} -->"
+
+
+def parse_batch_marker(text: str) -> tuple[str, int] | None:
+    m = _MARKER_RE.search(text or "")
+    if m is None:
+        return None
+    return m.group("id"), int(m.group("index"))
+
+
+def _archive_dir(root: Path) -> Path:
+    return batches_dir(root) / "archive"
+
+
+def _iter_batches(root: Path) -> list[Batch]:
+    out: list[Batch] = []
+    try:
+        paths = sorted(batches_dir(root).glob("*.json"))
+    except OSError:
+        return out
+    for p in paths:
+        b = load_batch(root, p.stem)
+        if b is not None:
+            out.append(b)
+    return out
+
+
+def _from_json(data: dict) -> Batch:
+    return Batch(
+        id=str(data["id"]),
+        lead=str(data.get("lead", "")),
+        title=str(data.get("title", "")),
+        created=float(data.get("created", 0.0)),
+        subtasks=[Subtask(**s) for s in data.get("subtasks", [])],
+    )
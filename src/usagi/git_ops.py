@@ -11,26 +11,293 @@ GitHub操作は gh_enabled が true のときだけ別モジュールで扱う
 
 from __future__ import annotations
 
+import atexit
+import os
 import subprocess
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from usagi.merge_queue import MergeResult
+
+ZERO_OID = "0" * 40
+
+# refs を動かさない subcommand（これ以外を run したら refs の snapshot を捨てる）
+_READ_ONLY = frozenset(
+    {
+        "add",
+        "cat-file",
+        "commit-tree",
+        "config",
+        "diff",
+        "for-each-ref",
+        "log",
+        "ls-files",
+        "ls-tree",
+        "merge-base",
+        "merge-tree",
+        "rev-list",
+        "rev-parse",
+        "show",
+        "show-ref",
+        "status",
+    }
+)
+# これより新しい mtime の refs ディレクトリは、同じ時刻刻みの中で
+# さらに書き換えられても気づけないので snapshot を信用しない（racy git と同じ考え方）
+_RACY_NS = 50_000_000
+
+
+class _RepoFacts:
+    """1つの repo（worktree も含めて common dir 単位）について覚えておくこと。
+
+    - user.name/email が設定済みか、最初の commit があるか（一度 true になれば戻らない）
+    - refs/heads の snapshot（`git for-each-ref` 1回分）。packed-refs と refs/heads 以下の
+      ディレクトリの mtime が変わったら取り直す（他プロセスの commit/branch も拾う）
+    - 常駐の `git cat-file --batch-check`（rev -> oid）と `git update-ref --stdin`
+    """
+
+    def __init__(self, common_dir: Path) -> None:
+        self.common_dir = common_dir
+        # worktree は消されることがあるので、常駐プロセスは git dir 自体で動かす
+        self.cwd = common_dir
+        self.lock = threading.RLock()
+        self.user_ok = False
+        self.has_commit = False
+        self._refs: dict[str, str] | None = None
+        self._refs_key: tuple | None = None
+        self._cat: subprocess.Popen[str] | None = None
+        self._upd: subprocess.Popen[str] | None = None
+
+    # ---- refs snapshot ----
+
+    def refs(self) -> dict[str, str]:
+        """refs/heads/<name> -> oid"""
+
+        with self.lock:
+            key = self._fingerprint()
+            if self._refs is None or key is None or key != self._refs_key:
+                out = _git(
+                    self.cwd, ["for-each-ref", "--format=%(objectname) %(refname)", "refs/heads"]
+                )
+                refs: dict[str, str] = {}
+                for line in out.splitlines():
+                    oid, _, ref = line.partition(" ")
+                    refs[ref] = oid
+                self._refs = refs
+                self._refs_key = key
+            return self._refs
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self._refs = None
+            self._refs_key = None
+
+    def _fingerprint(self) -> tuple | None:
+        parts: list[tuple[str, int, int]] = []
+        now = time.time_ns()
+        try:
+            st = (self.common_dir / "packed-refs").stat()
+            parts.append(("packed-refs", st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return None
+        stack = [str(self.common_dir / "refs" / "heads")]
+        while stack:
+            d = stack.pop()
+            try:
+                st = os.stat(d)
+                with os.scandir(d) as it:
+                    stack.extend(e.path for e in it if e.is_dir(follow_symlinks=False))
+            except OSError:
+                return None
+            parts.append((d, st.st_mtime_ns, 0))
+        if any(now - mtime < _RACY_NS for _name, mtime, _size in parts):
+            return None
+        return tuple(sorted(parts))
+
+    # ---- cat-file --batch-check ----
+
+    def resolve(self, rev: str) -> str | None:
+        if "\n" in rev:
+            raise ValueError(f"bad revision: {rev!r}")
+        with self.lock:
+            for _ in range(2):
+                p = self._cat
+                if p is None or p.poll() is not None:
+                    p = self._cat = _popen(self.cwd, ["cat-file", "--batch-check"])
+                assert p.stdin is not None and p.stdout is not None
+                try:
+                    p.stdin.write(rev + "\n")
+                    p.stdin.flush()
+                    line = p.stdout.readline()
+                except (BrokenPipeError, OSError):
+                    line = ""
+                if line:
+                    parts = line.split()
+                    # "<oid> <type> <size>" / "<rev> missing" / "<rev> ambiguous"
+                    return parts[0] if len(parts) == 3 and parts[1] != "missing" else None
+                self._cat = None
+            raise RuntimeError(f"git cat-file died while resolving {rev}")
+
+    # ---- update-ref --stdin ----
+
+    def update_refs(self, updates: list[tuple[str, str, str | None]]) -> None:
+        """[(ref, new, old)] を1トランザクションで更新する。
+
+        old が None なら確認しない、"" なら「まだ無いこと」を要求する。
+        new が ZERO_OID なら削除。失敗したら RuntimeError（何も更新されない）。
+        """
+
+        lines = ["start"]
+        for ref, new, old in updates:
+            exp = "" if old is None else " " + (old or ZERO_OID)
+            if new == ZERO_OID:
+                lines.append(f"delete {ref}{exp}")
+            else:
+                lines.append(f"update {ref} {new}{exp}")
+        lines.append("commit")
+
+        with self.lock:
+            p = self._upd
+            if p is None or p.poll() is not None:
+                p = self._upd = _popen(self.cwd, ["update-ref", "--stdin"], stderr=True)
+            assert p.stdin is not None and p.stdout is not None
+            try:
+                p.stdin.write("\n".join(lines) + "\n")
+                p.stdin.flush()
+                ok = p.stdout.readline().strip() == "start: ok"
+                ok = ok and p.stdout.readline().strip() == "commit: ok"
+            except (BrokenPipeError, OSError):
+                ok = False
+            self.invalidate()
+            if ok:
+                return
+            # 失敗すると update-ref は終了する。次回は起動し直す
+            self._upd = None
+            err = ""
+            try:
+                p.stdin.close()
+                p.wait(timeout=5)
+                err = (p.stderr.read() if p.stderr else "").strip()
+            except (OSError, subprocess.TimeoutExpired):
+                p.kill()
+            raise RuntimeError(err or "git update-ref failed")
+
+    def close(self) -> None:
+        with self.lock:
+            for p in (self._cat, self._upd):
+                if p is None:
+                    continue
+                try:
+                    if p.stdin:
+                        p.stdin.close()
+                    p.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    p.kill()
+            self._cat = self._upd = None
+
+
+_facts: dict[Path, _RepoFacts] = {}
+_facts_by_path: dict[str, _RepoFacts] = {}
+_facts_lock = threading.Lock()
+
+
+def _facts_for(path: Path) -> _RepoFacts | None:
+    key = str(path)
+    with _facts_lock:
+        f = _facts_by_path.get(key)
+    if f is not None:
+        return f
+    common = _common_dir(path)
+    if common is None:
+        # まだ repo ではない（ensure_repo 前）。覚えない
+        return None
+    with _facts_lock:
+        f = _facts.get(common)
+        if f is None:
+            f = _facts[common] = _RepoFacts(common)
+        _facts_by_path[key] = f
+        return f
+
+
+def _common_dir(path: Path) -> Path | None:
+    """`git rev-parse --git-common-dir` 相当を、プロセスを起こさずに求める。"""
+
+    dotgit = path / ".git"
+    try:
+        if dotgit.is_dir():
+            return dotgit.resolve()
+        # worktree: ".git" は "gitdir: <main>/.git/worktrees/<name>" と書かれたファイル
+        text = dotgit.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not text.startswith("gitdir:"):
+        return None
+    gitdir = (path / text.removeprefix("gitdir:").strip()).resolve()
+    try:
+        common = (gitdir / "commondir").read_text(encoding="utf-8").strip()
+    except OSError:
+        return gitdir
+    return (gitdir / common).resolve()
+
+
+def _git(cwd: Path, args: list[str]) -> str:
+    proc = subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        text=True,
+        capture_output=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or "git failed")
+    return proc.stdout.strip()
+
+
+def _popen(cwd: Path, args: list[str], *, stderr: bool = False) -> subprocess.Popen[str]:
+    return subprocess.Popen(
+        ["git", *args],
+        cwd=cwd,
+        text=True,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE if stderr else subprocess.DEVNULL,
+        bufsize=1,
+    )
+
+
+@atexit.register
+def _close_all() -> None:
+    with _facts_lock:
+        facts = list(_facts.values())
+    for f in facts:
+        f.close()
 
 
 @dataclass
 class GitRepo:
+    """ローカル git 操作。
+
+    問い合わせ（user 設定済みか、最初の commit があるか、branch の有無/先）は
+    repo ごとの `_RepoFacts` から答えるので、job ごとに git を何度も起動しない。
+    refs を書き換える subcommand を `run` したら refs の snapshot は取り直す。
+    """
+
     path: Path
 
     def run(self, args: list[str]) -> str:
-        proc = subprocess.run(
-            ["git", *args],
-            cwd=self.path,
-            text=True,
-            capture_output=True,
-            check=False,
-        )
-        if proc.returncode != 0:
-            raise RuntimeError(proc.stderr.strip() or "git failed")
-        return proc.stdout.strip()
+        try:
+            return _git(self.path, args)
+        finally:
+            if args and args[0] not in _READ_ONLY:
+                f = _facts_for(self.path)
+                if f is not None:
+                    f.invalidate()
 
     def ensure_repo(self) -> None:
         if (self.path / ".git").exists():
@@ -40,36 +307,43 @@ class GitRepo:
 
     def ensure_user(self) -> None:
         # 署名不要。ローカル専用。
+        f = _facts_for(self.path)
+        if f is not None and f.user_ok:
+            return
         try:
-            self.run(["config", "user.email"])
-        except Exception:
+            out = self.run(["config", "--get-regexp", r"^user\.(name|email)$"])
+        except RuntimeError:
+            out = ""
+        have = {line.split(" ", 1)[0] for line in out.splitlines()}
+        if "user.email" not in have:
             self.run(["config", "user.email", "usagi@example.invalid"])
-        try:
-            self.run(["config", "user.name"])
-        except Exception:
+        if "user.name" not in have:
             self.run(["config", "user.name", "usagi"])
+        if f is not None:
+            f.user_ok = True
 
     def ensure_initial_commit(self) -> None:
         """ブランチ作成/merge のため最低1コミットを保証する。"""
 
         self.ensure_user()
-        proc = subprocess.run(
-            ["git", "rev-parse", "--verify", "HEAD"],
-            cwd=self.path,
-            text=True,
-            capture_output=True,
-        )
-        if proc.returncode == 0:
+        f = _facts_for(self.path)
+        if f is not None and f.has_commit:
+            return
+        if self.head():
+            if f is not None:
+                f.has_commit = True
             return
         self.run(["commit", "--allow-empty", "-m", "init"])
+        if f is not None:
+            f.has_commit = True
 
-    def worktree_add(self, worktree_path: Path, branch: str) -> None:
+    def worktree_add(self, worktree_path: Path, branch: str, base: str = "main") -> None:
         worktree_path.parent.mkdir(parents=True, exist_ok=True)
         if worktree_path.exists():
             return
-        # branch が無いなら main から作る
+        # branch が無いなら base（既定 main）から作る
         if not self.branch_exists(branch):
-            self.run(["branch", branch, "main"])
+            self.create_branch(branch, base)
         self.run(["worktree", "add", str(worktree_path), branch])
 
     def worktree_remove(self, worktree_path: Path) -> None:
@@ -77,13 +351,19 @@ class GitRepo:
             return
         self.run(["worktree", "remove", "--force", str(worktree_path)])
 
-    def merge_to_main_and_delete_branch(self, branch: str) -> None:
-        """main に merge し、作業ブランチを削除する。"""
+    def merge_to_main_and_delete_branch(self, branch: str) -> MergeResult:
+        """main に merge し、作業ブランチを削除する（merge queue 経由で直列化）。
 
-        self.ensure_user()
-        self.checkout("main")
-        self.run(["merge", "--no-edit", branch])
-        self.run(["branch", "-D", branch])
+        衝突する/見つからない場合は RuntimeError（main もブランチもそのまま）。
+        """
+
+        from usagi.merge_queue import get_merge_queue
+
+        res = get_merge_queue(self.path).submit(branch)
+        if not res.ok:
+            why = ", ".join(res.conflicts) or res.detail
+            raise RuntimeError(f"merge {branch} -> main: {res.status} {why}".rstrip())
+        return res
 
     def current_branch(self) -> str:
         return self.run(["rev-parse", "--abbrev-ref", "HEAD"])
@@ -94,15 +374,126 @@ class GitRepo:
         else:
             self.run(["checkout", branch])
 
+    def branches(self) -> dict[str, str]:
+        """branch 名 -> commit（for-each-ref の snapshot から）。"""
+
+        f = _facts_for(self.path)
+        if f is None:
+            return {}
+        return {ref.removeprefix("refs/heads/"): oid for ref, oid in f.refs().items()}
+
     def branch_exists(self, branch: str) -> bool:
+        f = _facts_for(self.path)
+        if f is None:
+            return False
+        return f"refs/heads/{branch}" in f.refs()
+
+    def resolve(self, rev: str) -> str | None:
+        """rev（branch 名、`main^{commit}` 等）の oid。無ければ None。"""
+
+        f = _facts_for(self.path)
+        if f is None:
+            return None
+        oid = f.refs().get(f"refs/heads/{rev}")
+        if oid is not None:
+            return oid
+        if rev == "HEAD":
+            return self.head() or None
+        return f.resolve(rev)
+
+    def head(self) -> str:
+        """この worktree の HEAD の commit（まだ commit が無ければ ""）。"""
+
+        gitdir = self.git_dir
+        if gitdir is None:
+            return ""
+        try:
+            text = (gitdir / "HEAD").read_text(encoding="utf-8").strip()
+        except OSError:
+            return ""
+        if not text.startswith("ref:"):
+            return text
+        f = _facts_for(self.path)
+        ref = text.removeprefix("ref:").strip()
+        return (f.refs().get(ref, "") if f is not None else "") or ""
+
+    @property
+    def git_dir(self) -> Path | None:
+        """この worktree 固有の git dir（HEAD, MERGE_HEAD, index の置き場）。"""
+
+        dotgit = self.path / ".git"
+        if dotgit.is_dir():
+            return dotgit
+        try:
+            text = dotgit.read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        if not text.startswith("gitdir:"):
+            return None
+        return (self.path / text.removeprefix("gitdir:").strip()).resolve()
+
+    def create_branch(self, branch: str, start: str = "main") -> None:
+        """`git branch <branch> <start>` 相当（常駐の update-ref で作る）。"""
+
+        oid = self.resolve(start)
+        if oid is None:
+            raise RuntimeError(f"not a valid object name: '{start}'")
+        self.update_refs([(f"refs/heads/{branch}", oid, "")])
+
+    def update_ref(self, ref: str, new: str, old: str | None = None) -> bool:
+        """ref を new にする。old を渡すと今の値が old のときだけ（"" は未作成のときだけ）。"""
+
+        try:
+            self.update_refs([(ref, new, old)])
+        except RuntimeError:
+            return False
+        return True
+
+    def update_refs(self, updates: list[tuple[str, str, str | None]]) -> None:
+        f = _facts_for(self.path)
+        if f is None:
+            raise RuntimeError(f"not a git repository: {self.path}")
+        f.update_refs(updates)
+
+    def is_ancestor(self, ancestor: str, rev: str) -> bool:
         proc = subprocess.run(
-            ["git", "show-ref", "--verify", f"refs/heads/{branch}"],
+            ["git", "merge-base", "--is-ancestor", ancestor, rev],
             cwd=self.path,
             text=True,
             capture_output=True,
+            check=False,
         )
+        if proc.returncode > 1:
+            raise RuntimeError(proc.stderr.strip() or "git merge-base failed")
         return proc.returncode == 0
 
+    def merge_tree(self, ours: str, theirs: str) -> tuple[str, list[str]]:
+        """作業ツリーに触れずに merge を試す（`git merge-tree --write-tree`）。
+
+        (merge 結果の tree, 衝突したパス) を返す。衝突が無ければパスは空。
+        """
+
+        proc = subprocess.run(
+            ["git", "merge-tree", "--write-tree", "--name-only", "--no-messages", ours, theirs],
+            cwd=self.path,
+            text=True,
+            capture_output=True,
+            check=False,
+        )
+        if proc.returncode not in (0, 1) or not proc.stdout.strip():
+            raise RuntimeError(proc.stderr.strip() or "git merge-tree failed")
+        tree, *paths = proc.stdout.strip().splitlines()
+        if proc.returncode == 0:
+            return tree, []
+        return tree, [p for p in paths if p] or ["(unknown)"]
+
+    def commit_tree(self, tree: str, parents: list[str], message: str) -> str:
+        self.ensure_user()
+        args = ["commit-tree", tree]
+        for parent in parents:
+            args += ["-p", parent]
+        return self.run([*args, "-m", message])
+
     def add_all(self) -> None:
         self.run(["add", "-A"])
 
@@ -127,3 +518,18 @@ def team_branch(lead_id: str) -> str:
     if not lead_id:
         raise ValueError("lead_id is required")
     return f"team-{lead_id}"
+
+
+def worker_branch(lead_id: str, worker_id: str) -> str:
+    """worker 個別のブランチ（課ブランチから派生）。
+
+    例: lead_id="dev_lead", worker_id="w1" -> "team-dev_lead-w1"
+
+    同じ課の worker が並行に作業できるよう worktree もブランチごとに分ける。
+    成果は lead が課ブランチに merge して集約する。
+    """
+
+    worker_id = worker_id.strip()
+    if not worker_id:
+        raise ValueError("worker_id is required")
+    return f"{team_branch(lead_id)}-{worker_id}"
@@ -0,0 +1,89 @@
+"""watch 起動時の inputs/ スキャン。
+
+以前は inputs/ 配下の全 .md を enqueue し、debounce → queue → stat → state 参照を
+経てから WatchWorker が「処理済み」と判定して捨てていた。大きな inputs/ だと
+再起動のたびにこれが数分かかる。
+
+ここでは os.scandir で1回だけ歩き（サブディレクトリごとに並列）、
+DirEntry の stat を StateStore の (mtime_ns, size) と突き合わせて、
+新規/変更ファイルだけを返す。
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from usagi.state_store import StateStore
+
+
+@dataclass
+class ScanResult:
+    changed: list[Path] = field(default_factory=list)
+    total: int = 0
+
+
+def is_changed(entry: dict | None, mtime_ns: int, size: int) -> bool:
+    """state のエントリと比べて処理が必要か。"""
+
+    if entry is None:
+        return True
+    if mtime_ns > int(entry.get("mtime_ns", 0)):
+        return True
+    # size は後から記録するようになったので、無ければ mtime だけで判断する
+    prev_size = entry.get("size")
+    return prev_size is not None and int(prev_size) != size
+
+
+def scan_changed(inputs_dir: Path, state: StateStore, *, workers: int = 8) -> ScanResult:
+    """inputs_dir 配下の .md のうち未処理/変更ありのものを返す。"""
+
+    known = state.snapshot()
+    top_files, subdirs = _scan_dir(str(inputs_dir))
+
+    stats = list(top_files)
+    if subdirs:
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(workers, len(subdirs))), thread_name_prefix="usagi-scan"
+        ) as ex:
+            for found in ex.map(_walk, subdirs):
+                stats.extend(found)
+
+    res = ScanResult(total=len(stats))
+    for path, mtime_ns, size in sorted(stats):
+        if is_changed(known.get(path), mtime_ns, size):
+            res.changed.append(Path(path))
+    return res
+
+
+def _scan_dir(d: str) -> tuple[list[tuple[str, int, int]], list[str]]:
+    files: list[tuple[str, int, int]] = []
+    dirs: list[str] = []
+    try:
+        it = os.scandir(d)
+    except OSError:
+        return files, dirs
+    with it:
+        for e in it:
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    dirs.append(e.path)
+                elif e.name.lower().endswith(".md") and e.is_file():
+                    st = e.stat()
+                    files.append((e.path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                # スキャン中に消えた等
+                continue
+    return files, dirs
+
+
+def _walk(root: str) -> list[tuple[str, int, int]]:
+    out: list[tuple[str, int, int]] = []
+    stack = [root]
+    while stack:
+        files, dirs = _scan_dir(stack.pop())
+        out.extend(files)
+        stack.extend(dirs)
+    return out
@@ -0,0 +1,296 @@
+"""watch のジョブキューと WatchWorker プール。
+
+- `JobQueue`: 上限付きキュー。バースト時の振る舞い（backpressure）を policy で選ぶ
+  - coalesce: 同じ path が未処理で積まれていれば新しい方は捨てる。満杯なら待つ
+  - block: 重複もそのまま積む。満杯なら積む側（scanner/debouncer）を待たせる
+  - drop: 重複は捨て、満杯なら新しいジョブを捨てる（次の更新イベントで拾い直す）
+  - 取り出し順は優先度 + project ごとの重み付き公平キューイング（+ aging）
+- `WatchPool`: worker 数を runtime の worker_pool_size とキュー滞留で増減する
+
+WatchWorker は queue.Queue と同じ get/task_done で読むので、テスト等では
+素の queue.Queue もそのまま使える。
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Protocol
+
+from usagi.runtime import SchedulerConfig
+from usagi.spec import PRIORITY_MAX, PRIORITY_NORMAL, parse_priority, read_frontmatter
+
+QUEUE_POLICIES = ("coalesce", "block", "drop")
+_FRONTMATTER_BYTES = 4096
+
+
+@dataclass
+class WatchJob:
+    path: Path
+    enqueued_at: float = field(default_factory=time.monotonic)
+    # None のときは JobQueue.put で frontmatter/置き場所から決める
+    priority: int | None = None
+    project: str | None = None
+
+
+def classify_job(job: WatchJob, cfg: SchedulerConfig) -> None:
+    """priority / project を埋める（frontmatter は先頭だけ読む）。"""
+
+    front: dict = {}
+    if job.priority is None or job.project is None:
+        try:
+            with job.path.open(encoding="utf-8", errors="replace") as f:
+                front = read_frontmatter(f.read(_FRONTMATTER_BYTES))
+        except OSError:
+            front = {}
+    if job.project is None:
+        job.project = str(front.get("project", "") or "")
+    if job.priority is None:
+        prio = parse_priority(front.get("priority"))
+        if prio is None:
+            prio = _source_priority(job.path, cfg)
+        job.priority = max(0, min(int(prio), PRIORITY_MAX))
+
+
+def _source_priority(path: Path, cfg: SchedulerConfig) -> int:
+    # inputs/secretary/<project>/x.md のように深い所に置かれるので、近い親から探す
+    for part in reversed(path.parent.parts):
+        if part in cfg.source_priority:
+            return int(cfg.source_priority[part])
+    return PRIORITY_NORMAL
+
+
+class JobQueue:
+    """優先度 + project ごとの重み付き公平キュー。
+
+    - 実効優先度 = priority + 待ち時間 / aging_seconds（上限 PRIORITY_MAX）
+    - 同じ実効優先度の中では project ごとの virtual finish time が小さい順
+      （重み付き公平キューイング: 大量投入された project が他を飢えさせない）
+    - 同じ project 内は FIFO
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 200,
+        *,
+        policy: str = "coalesce",
+        scheduler: SchedulerConfig | None = None,
+    ) -> None:
+        self._cond = threading.Condition()
+        # (priority, project) -> FIFO of (finish tag, job)
+        self._lanes: dict[tuple[int, str], deque[tuple[float, WatchJob]]] = {}
+        self._size = 0
+        self._vtime = 0.0
+        self._last_tag: dict[str, float] = {}
+        self._queued: dict[str, int] = {}
+        self._busy = 0
+        self._dropped = 0
+        self._coalesced = 0
+        self._waits: deque[float] = deque(maxlen=100)
+        self.maxsize = 1
+        self.policy = "coalesce"
+        self.scheduler = scheduler or SchedulerConfig()
+        self.configure(maxsize=maxsize, policy=policy)
+
+    def configure(
+        self, *, maxsize: int, policy: str, scheduler: SchedulerConfig | None = None
+    ) -> None:
+        """上限と policy を変える（未知の policy は coalesce 扱い）。"""
+
+        with self._cond:
+            self.maxsize = max(1, maxsize)
+            self.policy = policy if policy in QUEUE_POLICIES else "coalesce"
+            if scheduler is not None:
+                self.scheduler = scheduler
+            # 上限が広がったら待っている producer を起こす
+            self._cond.notify_all()
+
+    def put(self, job: WatchJob, *, timeout: float | None = None) -> bool:
+        """ジョブを積む。捨てた（coalesce/drop）ときは False。"""
+
+        classify_job(job, self.scheduler)
+        key = str(job.path)
+        with self._cond:
+            if self.policy != "block" and self._queued.get(key):
+                # まだ誰も取っていない同じ path がある。処理時に最新内容を読むので1件で足りる
+                self._coalesced += 1
+                return False
+            if self._size >= self.maxsize:
+                if self.policy == "drop":
+                    self._dropped += 1
+                    return False
+                if not self._cond.wait_for(lambda: self._size < self.maxsize, timeout):
+                    self._dropped += 1
+                    return False
+
+            project = job.project or ""
+            weight = max(self.scheduler.project_weights.get(project, 1.0), 1e-6)
+            tag = max(self._vtime, self._last_tag.get(project, 0.0)) + 1.0 / weight
+            self._last_tag[project] = tag
+            lane = (int(job.priority or 0), project)
+            self._lanes.setdefault(lane, deque()).append((tag, job))
+            self._size += 1
+            self._queued[key] = self._queued.get(key, 0) + 1
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: float | None = None) -> WatchJob:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._size > 0, timeout):
+                raise queue.Empty
+            now = time.monotonic()
+            lane = self._pick(now)
+            tag, job = self._lanes[lane].popleft()
+            if not self._lanes[lane]:
+                del self._lanes[lane]
+            self._size -= 1
+            self._vtime = max(self._vtime, tag)
+            if not self._size:
+                # 空になったら tag をリセット（数値が際限なく育たないように）
+                self._vtime = 0.0
+                self._last_tag.clear()
+
+            key = str(job.path)
+            n = self._queued.get(key, 0) - 1
+            if n > 0:
+                self._queued[key] = n
+            else:
+                self._queued.pop(key, None)
+            self._busy += 1
+            self._waits.append(now - job.enqueued_at)
+            self._cond.notify_all()
+            return job
+
+    def task_done(self) -> None:
+        with self._cond:
+            self._busy = max(0, self._busy - 1)
+
+    def qsize(self) -> int:
+        with self._cond:
+            return self._size
+
+    def metrics(self) -> dict[str, float]:
+        with self._cond:
+            waits = sorted(self._waits)
+            by_priority: dict[int, int] = {}
+            for (prio, _project), items in self._lanes.items():
+                by_priority[prio] = by_priority.get(prio, 0) + len(items)
+            return {
+                "depth": self._size,
+                "busy": self._busy,
+                "dropped": self._dropped,
+                "coalesced": self._coalesced,
+                "wait_avg_seconds": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "wait_p95_seconds": round(waits[int((len(waits) - 1) * 0.95)], 3) if waits else 0.0,
+                "wait_max_seconds": round(waits[-1], 3) if waits else 0.0,
+                "depth_by_priority": {str(k): v for k, v in sorted(by_priority.items())},
+            }
+
+    def _pick(self, now: float) -> tuple[int, str]:
+        aging = self.scheduler.aging_seconds
+        best: tuple[int, str] | None = None
+        best_key: tuple[int, float] | None = None
+        for lane, items in self._lanes.items():
+            tag, job = items[0]
+            prio = lane[0]
+            if aging > 0:
+                prio = min(PRIORITY_MAX, prio + int((now - job.enqueued_at) / aging))
+            # 実効優先度が高い順、同じなら finish tag が小さい順
+            k = (-prio, tag)
+            if best_key is None or k < best_key:
+                best, best_key = lane, k
+        assert best is not None
+        return best
+
+
+class _Worker(Protocol):
+    def run_forever(self) -> None: ...
+
+    def stop(self) -> None: ...
+
+
+class WatchPool:
+    """WatchWorker の可変サイズプール。
+
+    - `resize(n)`: 基本サイズ（runtime の worker_pool_size）を変える
+    - `autoscale()`: キューが滞留していて全員 busy なら max_size まで1つずつ増やし、
+      暇になって idle_seconds 経ったら基本サイズまで1つずつ戻す
+    縮めるときは worker.stop() するだけなので、処理中のジョブは最後まで走る。
+    """
+
+    MAX_SIZE = 20
+
+    def __init__(
+        self,
+        q: JobQueue,
+        factory: Callable[[], _Worker],
+        *,
+        size: int,
+        max_size: int = 0,
+        idle_seconds: float = 30.0,
+    ) -> None:
+        self.q = q
+        self.factory = factory
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._workers: list[_Worker] = []
+        self._base = 1
+        self._max = 1
+        self._idle_since: float | None = None
+        self.configure(size=size, max_size=max_size)
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return len(self._workers)
+
+    def configure(self, *, size: int, max_size: int = 0) -> None:
+        """基本サイズと上限を設定する（max_size <= size なら自動増減しない）。"""
+
+        base = max(1, min(size, self.MAX_SIZE))
+        with self._lock:
+            self._base = base
+            self._max = max(base, min(max_size, self.MAX_SIZE))
+            # 増えている分は上限内なら残す
+            self._resize_locked(min(max(len(self._workers), base), self._max))
+
+    def autoscale(self) -> int:
+        m = self.q.metrics()
+        now = time.monotonic()
+        with self._lock:
+            size = len(self._workers)
+            if m["depth"] > 0 and m["busy"] >= size and size < self._max:
+                self._resize_locked(size + 1)
+                self._idle_since = None
+            elif m["depth"] == 0 and m["busy"] < size and size > self._base:
+                if self._idle_since is None:
+                    self._idle_since = now
+                elif now - self._idle_since >= self.idle_seconds:
+                    self._resize_locked(size - 1)
+                    self._idle_since = now
+            else:
+                self._idle_since = None
+            return len(self._workers)
+
+    def metrics(self) -> dict[str, float]:
+        m = self.q.metrics()
+        with self._lock:
+            m.update({"workers": len(self._workers), "base": self._base, "max": self._max})
+        return m
+
+    def stop(self) -> None:
+        with self._lock:
+            self._resize_locked(0)
+
+    def _resize_locked(self, size: int) -> None:
+        while len(self._workers) < size:
+            w = self.factory()
+            self._workers.append(w)
+            threading.Thread(target=w.run_forever, daemon=True, name="usagi-watch").start()
+        while len(self._workers) > size:
+            self._workers.pop().stop()
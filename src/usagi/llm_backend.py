@@ -3,17 +3,32 @@
 - OpenAI API
 - Ollama (HTTP)
 - codex/claude は外部CLIをstdin/stdoutで呼び出す（Docker前提）
+
+HTTP系(OpenAI/Ollama)のクライアントはプロセス内で使い回す（接続/TLSを再利用）。
+watch の worker pool から並行に呼ばれるため、registry はスレッドセーフにしている。
+OpenAI の APIキーは TokenPool（usagi.tokens）から借りる。
 """
 
 from __future__ import annotations
 
+import json
 import os
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 
 import requests
 from openai import OpenAI
+from requests.adapters import HTTPAdapter
 
 from usagi.cli_backend import CLIBackend
+from usagi.tokens import TokenLease, get_token_pool
+
+try:
+    import httpx
+except ModuleNotFoundError:  # openai の依存として通常は入っている
+    httpx = None  # type: ignore[assignment]
 
 
 @dataclass
@@ -24,11 +39,87 @@ class LLMConfig:
     # ollama
     ollama_url: str = "http://localhost:11434"
 
+    # http (openai/ollama)
+    openai_base_url: str | None = None
+    # None: backend の既定（OpenAI SDK は 600s、Ollama は 60s）
+    timeout_seconds: float | None = None
+    pool_size: int = 10  # base URL ごとの keep-alive 接続数
+
     # cli
     cli_command: list[str] | None = None
     home_dir: str | None = None  # プロファイル切替用途（~/.codex 等がHOME配下にある想定）
 
 
+_OLLAMA_TIMEOUT_SECONDS = 60.0
+
+_registry_lock = threading.Lock()
+_openai_clients: dict[tuple[str | None, str | None, float | None, int], OpenAI] = {}
+_http_sessions: dict[tuple[str, int], requests.Session] = {}
+
+
+def openai_client(
+    *,
+    api_key: str | None = None,
+    base_url: str | None = None,
+    timeout_seconds: float | None = None,
+    pool_size: int = 10,
+) -> OpenAI:
+    """OpenAI client を (api_key, base_url, timeout, pool) ごとに1つだけ作って使い回す。
+
+    timeout_seconds が None なら SDK の既定（600s）のまま。
+    """
+
+    timeout = None if timeout_seconds is None else float(timeout_seconds)
+    key = (api_key, base_url, timeout, int(pool_size))
+    with _registry_lock:
+        client = _openai_clients.get(key)
+        if client is None:
+            kwargs: dict = {"api_key": api_key, "base_url": base_url}
+            if timeout is not None:
+                kwargs["timeout"] = timeout
+            if httpx is not None:
+                from openai import DefaultHttpxClient
+
+                http_kwargs: dict = {
+                    "limits": httpx.Limits(
+                        max_connections=pool_size, max_keepalive_connections=pool_size
+                    )
+                }
+                if timeout is not None:
+                    http_kwargs["timeout"] = timeout
+                kwargs["http_client"] = DefaultHttpxClient(**http_kwargs)
+            client = OpenAI(**kwargs)
+            _openai_clients[key] = client
+        return client
+
+
+def http_session(base_url: str, *, pool_size: int = 10) -> requests.Session:
+    """base URL ごとの keep-alive Session を返す。"""
+
+    key = (base_url.rstrip("/"), int(pool_size))
+    with _registry_lock:
+        session = _http_sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _http_sessions[key] = session
+        return session
+
+
+def close_backends() -> None:
+    """registry 内の接続を閉じる（終了時/テスト用）。"""
+
+    with _registry_lock:
+        for session in _http_sessions.values():
+            session.close()
+        for client in _openai_clients.values():
+            client.close()
+        _http_sessions.clear()
+        _openai_clients.clear()
+
+
 class LLM:
     def __init__(self, cfg: LLMConfig) -> None:
         self.cfg = cfg
@@ -40,24 +131,87 @@ class LLM:
             return self._cli(prompt)
         return self._openai(prompt)
 
+    def cache_identity(self) -> str:
+        """応答キャッシュの key に入れる接続先（同じ model 名でも provider/URL ごとに分ける）。"""
+
+        b = self.cfg.backend
+        if b == "ollama":
+            return f"ollama:{self.cfg.ollama_url.rstrip('/')}"
+        if b in {"codex_cli", "claude_cli"}:
+            cmd = self.cfg.cli_command or (["codex"] if b == "codex_cli" else ["claude"])
+            return f"{b}:{' '.join(cmd)}:{self.cfg.home_dir or ''}"
+        base = self.cfg.openai_base_url or os.environ.get("OPENAI_BASE_URL", "")
+        return f"openai:{base.rstrip('/')}"
+
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """generate() のストリーミング版。届いた分から順に返す。"""
+
+        if self.cfg.backend == "ollama":
+            return self._ollama_stream(prompt)
+        if self.cfg.backend in {"codex_cli", "claude_cli"}:
+            return self._cli_stream(prompt)
+        return self._openai_stream(prompt)
+
     def _openai(self, prompt: str) -> str:
-        # OpenAI client reads OPENAI_API_KEY env
-        client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-        resp = client.responses.create(model=self.cfg.model, input=prompt)
-        return resp.output_text or ""
+        return openai_generate(
+            prompt,
+            model=self.cfg.model,
+            base_url=self.cfg.openai_base_url,
+            timeout_seconds=self.cfg.timeout_seconds,
+            pool_size=self.cfg.pool_size,
+        )
+
+    def _openai_stream(self, prompt: str) -> Iterator[str]:
+        return openai_generate_stream(
+            prompt,
+            model=self.cfg.model,
+            base_url=self.cfg.openai_base_url,
+            timeout_seconds=self.cfg.timeout_seconds,
+            pool_size=self.cfg.pool_size,
+        )
 
     def _ollama(self, prompt: str) -> str:
-        url = self.cfg.ollama_url.rstrip("/") + "/api/generate"
-        r = requests.post(
-            url,
+        base = self.cfg.ollama_url.rstrip("/")
+        session = http_session(base, pool_size=self.cfg.pool_size)
+        r = session.post(
+            base + "/api/generate",
             json={"model": self.cfg.model, "prompt": prompt, "stream": False},
-            timeout=60,
+            timeout=self.cfg.timeout_seconds or _OLLAMA_TIMEOUT_SECONDS,
         )
         r.raise_for_status()
         data = r.json()
         return str(data.get("response", ""))
 
+    def _ollama_stream(self, prompt: str) -> Iterator[str]:
+        base = self.cfg.ollama_url.rstrip("/")
+        session = http_session(base, pool_size=self.cfg.pool_size)
+        with session.post(
+            base + "/api/generate",
+            json={"model": self.cfg.model, "prompt": prompt, "stream": True},
+            timeout=self.cfg.timeout_seconds or _OLLAMA_TIMEOUT_SECONDS,
+            stream=True,
+        ) as r:
+            r.raise_for_status()
+            # NDJSON: 1行1チャンク、最後に done=true
+            for line in r.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                chunk = str(data.get("response", ""))
+                if chunk:
+                    yield chunk
+                if data.get("done"):
+                    break
+
+    def _cli_stream(self, prompt: str) -> Iterator[str]:
+        backend, kwargs = self._cli_call(prompt)
+        return backend.run_stream(**kwargs)
+
     def _cli(self, prompt: str) -> str:
+        backend, kwargs = self._cli_call(prompt)
+        return backend.run(**kwargs).strip()
+
+    def _cli_call(self, prompt: str) -> tuple[CLIBackend, dict]:
         cmd = self.cfg.cli_command
         backend = self.cfg.backend
 
@@ -74,17 +228,112 @@ class LLM:
 
         # Codex: official docs mention `codex exec "..."` for non-interactive automation.
         if backend == "codex_cli":
-            return (
-                CLIBackend(cmd)
-                .run(
-                    "",
-                    env=env,
-                    args=["exec", full_prompt],
-                    use_stdin=False,
-                )
-                .strip()
-            )
+            return CLIBackend(cmd), {
+                "prompt": "",
+                "env": env,
+                "args": ["exec", full_prompt],
+                "use_stdin": False,
+            }
 
         # Claude: CLI behavior varies; default to stdin-based prompt.
-        return CLIBackend(cmd).run(full_prompt, env=env, use_stdin=True).strip()
+        return CLIBackend(cmd), {"prompt": full_prompt, "env": env, "use_stdin": True}
+
+
+@contextmanager
+def _openai_with_key(
+    prompt: str,
+    *,
+    base_url: str | None,
+    timeout_seconds: float | None,
+    pool_size: int,
+) -> Iterator[tuple[OpenAI, TokenLease | None]]:
+    """TokenPool からキーを借りて client を渡す。失敗時は status を pool に報告する。"""
+
+    pool = get_token_pool()
+    if not pool.available:
+        # キー未設定: OpenAI client 側の既定（OPENAI_API_KEY）に任せる
+        yield openai_client(
+            base_url=base_url, timeout_seconds=timeout_seconds, pool_size=pool_size
+        ), None
+        return
+
+    # 見積もり: 入力は約4文字/token
+    with pool.lease(est_tokens=len(prompt) // 4) as lease:
+        client = openai_client(
+            api_key=lease.key,
+            base_url=base_url,
+            timeout_seconds=timeout_seconds,
+            pool_size=pool_size,
+        )
+        try:
+            yield client, lease
+        except Exception as e:
+            retry_after = None
+            headers = getattr(getattr(e, "response", None), "headers", None) or {}
+            try:
+                retry_after = float(headers.get("retry-after", "") or 0) or None
+            except ValueError:
+                retry_after = None
+            lease.report(status_code=getattr(e, "status_code", None), retry_after=retry_after)
+            raise
+
+
+def _usage_tokens(resp: object) -> int:
+    usage = getattr(resp, "usage", None)
+    return int(getattr(usage, "total_tokens", 0) or 0)
+
+
+def openai_generate(
+    prompt: str,
+    *,
+    model: str,
+    base_url: str | None = None,
+    timeout_seconds: float | None = None,
+    pool_size: int = 10,
+) -> str:
+    with _openai_with_key(
+        prompt, base_url=base_url, timeout_seconds=timeout_seconds, pool_size=pool_size
+    ) as (client, lease):
+        resp = client.responses.create(model=model, input=prompt)
+        if lease is not None:
+            lease.report(tokens_used=_usage_tokens(resp))
+        return resp.output_text or ""
+
+
+def openai_generate_stream(
+    prompt: str,
+    *,
+    model: str,
+    base_url: str | None = None,
+    timeout_seconds: float | None = None,
+    pool_size: int = 10,
+) -> Iterator[str]:
+    with _openai_with_key(
+        prompt, base_url=base_url, timeout_seconds=timeout_seconds, pool_size=pool_size
+    ) as (client, lease):
+        on_usage = None if lease is None else (lambda n: lease.report(tokens_used=n))
+        yield from stream_openai_text(client, model=model, prompt=prompt, on_usage=on_usage)
+
+
+def stream_openai_text(
+    client: OpenAI,
+    *,
+    model: str,
+    prompt: str,
+    on_usage: Callable[[int], None] | None = None,
+) -> Iterator[str]:
+    """Responses API の stream から text delta だけを取り出す。
+
+    最後の `response.completed` に載る usage は on_usage に渡す（TokenPool への報告用）。
+    """
+
+    stream = client.responses.create(model=model, input=prompt, stream=True)
+    for event in stream:
+        kind = getattr(event, "type", "")
+        if kind == "response.output_text.delta":
+            delta = getattr(event, "delta", "")
+            if delta:
+                yield delta
+        elif kind == "response.completed" and on_usage is not None:
+            on_usage(_usage_tokens(getattr(event, "response", None)))
 
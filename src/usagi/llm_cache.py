@@ -0,0 +1,161 @@
+"""LLM 応答キャッシュ（opt-in / ディスク永続）。
+
+同じ system prompt + user prompt を同じ backend/model に投げた場合、
+前回の応答を返して LLM 呼び出し（トークン/時間）を省く。
+
+- key: sha256(backend の識別子（provider + 接続先）, model, full prompt)
+- 保存先: `<root>/.usagi/cache/llm/<key[:2]>/<key>.json`
+- TTL を過ぎたエントリは使わずに消す
+- 合計サイズが上限を超えたら、最終利用(mtime)が古い順に消す（LRU）
+- hit/miss カウンタを持つ（watch が events.log と .usagi/watch_pool.json に出す）
+
+有効化は runtime.toml の `[system.llm_cache] enabled = true`。
+watch 起動時に `configure_llm_cache()` でプロセス全体のキャッシュを設定する。
+
+NOTE:
+- キャッシュにはプロンプト本文を保存しない（key はハッシュのみ）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from usagi.runtime import LLMCacheConfig
+
+
+def cache_dir(root: Path) -> Path:
+    return root / ".usagi" / "cache" / "llm"
+
+
+class LLMCache:
+    def __init__(self, path: Path, *, ttl_seconds: float, max_bytes: int) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+
+    @staticmethod
+    def key(backend: str, model: str, prompt: str) -> str:
+        raw = json.dumps([backend, model, prompt], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        p = self._entry(key)
+        try:
+            data = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return None
+
+        if time.time() - float(data.get("created", 0)) > self.ttl_seconds:
+            self._remove(p)
+            self._count(hit=False)
+            return None
+
+        # LRU: 最終利用時刻として mtime を更新
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        self._count(hit=True)
+        return str(data.get("content", ""))
+
+    def put(self, key: str, content: str) -> None:
+        p = self._entry(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        raw = json.dumps({"created": time.time(), "content": content}, ensure_ascii=False)
+        tmp = p.with_name(f"{p.name}.{threading.get_ident()}.tmp")
+        tmp.write_text(raw, encoding="utf-8")
+        os.replace(tmp, p)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_bytes()
+            else:
+                self._total_bytes += len(raw.encode("utf-8"))
+            over = self._total_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self) -> None:
+        """合計サイズが上限の 9 割になるまで古いものから消す。"""
+
+        entries: list[tuple[float, int, Path]] = []
+        for p in self.path.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+
+        total = sum(size for _m, size, _p in entries)
+        target = int(self.max_bytes * 0.9)
+        for _mtime, size, p in entries:
+            if total <= target:
+                break
+            self._remove(p)
+            total -= size
+
+        with self._lock:
+            self._total_bytes = total
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def _count(self, *, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _scan_bytes(self) -> int:
+        total = 0
+        for p in self.path.glob("*/*.json"):
+            try:
+                total += p.stat().st_size
+            except OSError:
+                continue
+        return total
+
+    @staticmethod
+    def _remove(p: Path) -> None:
+        try:
+            p.unlink()
+        except OSError:
+            pass
+
+
+_default_cache: LLMCache | None = None
+
+
+def configure_llm_cache(root: Path, cfg: LLMCacheConfig) -> LLMCache | None:
+    """プロセス全体で使うキャッシュを設定する（無効なら None）。"""
+
+    global _default_cache
+    if not cfg.enabled:
+        _default_cache = None
+        return None
+    _default_cache = LLMCache(
+        cache_dir(root),
+        ttl_seconds=cfg.ttl_seconds,
+        max_bytes=int(cfg.max_mb * 1024 * 1024),
+    )
+    return _default_cache
+
+
+def get_llm_cache() -> LLMCache | None:
+    return _default_cache
@@ -0,0 +1,111 @@
+"""ログファイルの tail 追従（TUI 用）。
+
+TUI は 0.5 秒ごとに events.log などの末尾を表示する。
+毎回ファイル全体を読むとログが育つほど重くなるため、
+
+- 読んだ位置（offset）と inode を覚えて、追記分だけ読む
+- inode が変わったら（ローテート）新しいファイルを先頭から読む
+- サイズが縮んだら（truncate / クリア）表示も空にして読み直す
+- 行は固定長のリングバッファ（deque）に持つ
+
+ことで、refresh のコストをログサイズに依存させない。
+"""
+
+from __future__ import annotations
+
+import os
+from collections import deque
+from pathlib import Path
+
+
+class LogTail:
+    def __init__(self, path: Path, *, max_lines: int = 200, window_bytes: int = 64 * 1024) -> None:
+        self.path = path
+        self.max_lines = max_lines
+        # 初回/大量追記時に読む最大バイト数（末尾だけ読めば足りる）
+        self.window_bytes = window_bytes
+        self._lines: deque[str] = deque(maxlen=max_lines)
+        self._partial = b""
+        self._offset = 0
+        self._ino: int | None = None
+
+    @property
+    def exists(self) -> bool:
+        return self._ino is not None
+
+    def poll(self) -> bool:
+        """追記分を取り込む。表示内容が変わったら True。"""
+
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            if self._ino is None:
+                return False
+            self._reset(clear=True)
+            self._ino = None
+            return True
+
+        changed = False
+        if st.st_ino != self._ino:
+            # 新規 or ローテート: これまでの行は残し、新しいファイルを頭から読む
+            changed = self._ino is None or bool(self._partial)
+            self._flush_partial()
+            self._ino = st.st_ino
+            self._offset = 0
+        elif st.st_size < self._offset:
+            # truncate（ログのクリア）
+            self._reset(clear=True)
+            changed = True
+
+        if st.st_size == self._offset:
+            return changed
+        return self._read(st.st_size) or changed
+
+    def tail(self, n: int) -> list[str]:
+        lines = list(self._lines)
+        if self._partial:
+            lines.append(self._partial.decode("utf-8", errors="replace"))
+        return lines[-n:] if n > 0 else []
+
+    # ---- internal ----
+
+    def _read(self, size: int) -> bool:
+        start = self._offset
+        skip_first = False
+        if size - start > self.window_bytes:
+            # 読む必要のない古い部分は飛ばす（途中から読むので先頭の欠けた行は捨てる）
+            start = size - self.window_bytes
+            self._lines.clear()
+            self._partial = b""
+            skip_first = True
+
+        try:
+            with self.path.open("rb") as f:
+                if os.fstat(f.fileno()).st_ino != self._ino:
+                    # stat と open の間にローテートされた。次回に回す
+                    return False
+                f.seek(start)
+                chunk = f.read(size - start)
+        except OSError:
+            return False
+
+        self._offset = start + len(chunk)
+        data = self._partial + chunk
+        parts = data.split(b"\n")
+        self._partial = parts.pop()
+        if skip_first and parts:
+            parts = parts[1:]
+        for raw in parts:
+            self._lines.append(raw.rstrip(b"\r").decode("utf-8", errors="replace"))
+        return True
+
+    def _flush_partial(self) -> None:
+        if self._partial:
+            self._lines.append(self._partial.decode("utf-8", errors="replace"))
+            self._partial = b""
+
+    def _reset(self, *, clear: bool) -> None:
+        if clear:
+            self._lines.clear()
+        self._partial = b""
+        self._offset = 0
@@ -10,6 +10,35 @@ Directory layout (per workdir):
 - `<workdir>/.usagi/agents/<agent_id>/outbox/`
 - `<workdir>/.usagi/agents/<agent_id>/notes/`
 - `<workdir>/.usagi/agents/<agent_id>/archive/` (processed inbox messages)
+- `<workdir>/.usagi/agents/<agent_id>/processing/` (claimed, not yet acked)
+- `<workdir>/.usagi/agents/<agent_id>/deadletter/` (gave up after max_attempts)
+
+Backends:
+- `MailboxBackend` is the interface the agent ticks use: deliver / claim / ack / nack.
+  A claimed message is invisible to other claimers until it is acked, nacked or its
+  visibility timeout expires; after `max_attempts` it goes to dead-letter.
+- `MarkdownMailbox` (default) keeps the per-file layout above. Claim moves the file
+  into `processing/`, dead letters go to `deadletter/`. The attempt count lives
+  next to the message (`<name>.attempts`) and moves with it, so `max_attempts`
+  holds across restarts.
+- Moves never overwrite: names only have second resolution, so a file that is
+  already there keeps its name and the moved one gets a `-2`, `-3` .. suffix
+  (link + unlink; of two concurrent claims exactly one unlink succeeds).
+- A nacked message is not claimable again until `retry_backoff_seconds`
+  (doubling per attempt) has passed, so a transient error (rate limit, git lock)
+  does not burn through `max_attempts` in one tick. The Markdown backend keeps the
+  deadline as the file's mtime.
+- `SqliteMailbox` (`usagi.mailbox_sqlite`) stores messages in `.usagi/mailbox.db` (WAL)
+  and renders Markdown for humans via `export_markdown()`.
+- `configure_mailbox(root, cfg)` picks the backend per root (runtime `[system.mailbox]`).
+
+Inbox index:
+- Each agent's pending messages are kept in an in-memory index (`MailboxIndex`)
+  with kind/from/title. Messages delivered by this process are indexed at write
+  time; files dropped by other processes are parsed once when first seen.
+- Handlers filter by kind via `list_messages(kinds=...)` and only read the body
+  of messages they actually handle. Other kinds are archived in one batch
+  (`archive_unhandled`).
 
 NOTE:
 - This module intentionally does NOT run any watchers. It is pure filesystem helpers.
@@ -18,9 +47,18 @@ NOTE:
 
 from __future__ import annotations
 
+import os
+import threading
 import time
+import uuid
+from collections.abc import Callable, Collection, Iterable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Protocol
+
+from usagi.events import emit_event, events_path
+from usagi.mailbox_parse import MailMessage, parse_mail_markdown
+from usagi.runtime import MailboxConfig
 
 
 @dataclass(frozen=True)
@@ -48,6 +86,14 @@ class AgentMailbox:
     def archive(self) -> Path:
         return self.base / "archive"
 
+    @property
+    def processing(self) -> Path:
+        return self.base / "processing"
+
+    @property
+    def deadletter(self) -> Path:
+        return self.base / "deadletter"
+
 
 def ensure_mailbox(root: Path, agent_id: str) -> AgentMailbox:
     mb = AgentMailbox(root=root, agent_id=agent_id)
@@ -64,66 +110,541 @@ def deliver_markdown(
     title: str,
     body: str,
     kind: str = "message",
-) -> Path:
-    """Deliver a Markdown message to recipient inbox.
+) -> Path | None:
+    """Deliver a message to the recipient through the configured backend.
 
     Side effects:
     - Writes an event line to `<root>/.usagi/events.log` for traceability.
+    - Notifies `subscribe_deliveries` listeners (the watch dispatcher).
 
     Returns:
-        The created file path.
+        The created inbox file, or None when the backend does not write one (sqlite).
     """
 
-    ensure_mailbox(root, from_agent)
-    to_mb = ensure_mailbox(root, to_agent)
+    p = get_mailbox_backend(root).deliver(
+        from_agent=from_agent, to_agent=to_agent, title=title, body=body, kind=kind
+    )
+    name = p.name if p is not None else title
+    _event(root, f"mailbox: delivered kind={kind} {from_agent} -> {to_agent}: {name}")
+    for fn in list(_listeners):
+        try:
+            fn(to_agent)
+        except Exception:
+            pass
+    return p
 
-    ts = time.strftime("%Y%m%d-%H%M%S")
-    safe_title = _slug(title) or "message"
-    p = to_mb.inbox / f"{ts}-{from_agent}-{safe_title}.md"
-    p = _ensure_unique_path(p)
 
-    content = (
+def render_markdown(
+    *, kind: str, from_agent: str, to_agent: str, title: str, body: str, created: str = ""
+) -> str:
+    return (
         "---\n"
         f"kind: {kind}\n"
         f"from: {from_agent}\n"
         f"to: {to_agent}\n"
         f"title: {title}\n"
-        f"created: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        f"created: {created or time.strftime('%Y-%m-%d %H:%M:%S')}\n"
         "---\n\n"
         f"# {title}\n\n"
         f"{body.strip()}\n"
     )
-    p.write_text(content, encoding="utf-8")
 
-    _event(root, f"mailbox: delivered kind={kind} {from_agent} -> {to_agent}: {p.name}")
-    return p
+
+def message_name(from_agent: str, title: str, ts: float | None = None) -> str:
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(ts))
+    return f"{stamp}-{from_agent}-{_slug(title) or 'message'}.md"
+
+
+@dataclass(frozen=True)
+class ClaimedMessage:
+    """A message claimed by one consumer. Pass it back to `ack` / `nack`."""
+
+    id: str
+    agent_id: str
+    name: str
+    kind: str
+    title: str
+    from_agent: str
+    to_agent: str
+    body: str
+    attempts: int = 1
+
+    @property
+    def stem(self) -> str:
+        return Path(self.name).stem
+
+
+class MailboxBackend(Protocol):
+    def deliver(
+        self, *, from_agent: str, to_agent: str, title: str, body: str, kind: str
+    ) -> Path | None: ...
+
+    def claim(
+        self, agent_id: str, kinds: Collection[str] | None = None, *, rescan: bool = True
+    ) -> ClaimedMessage | None: ...
+
+    def ack(self, msg: ClaimedMessage) -> None: ...
+
+    def nack(self, msg: ClaimedMessage, *, error: str = "") -> bool: ...
+
+    def archive_unhandled(self, agent_id: str, kinds: Collection[str]) -> int: ...
+
+    def export_markdown(self, out_dir: Path) -> int: ...
+
+
+class MarkdownMailbox:
+    """One Markdown file per message under `.usagi/agents/<id>/`."""
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        visibility_seconds: float = 600.0,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 30.0,
+    ) -> None:
+        self.root = root
+        self.visibility_seconds = visibility_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+    def deliver(
+        self, *, from_agent: str, to_agent: str, title: str, body: str, kind: str
+    ) -> Path:
+        ensure_mailbox(self.root, from_agent)
+        to_mb = ensure_mailbox(self.root, to_agent)
+        content = render_markdown(
+            kind=kind, from_agent=from_agent, to_agent=to_agent, title=title, body=body
+        )
+        # 受け手の scan が書きかけを読まないよう tmp（.md 以外）に書いてから移す
+        tmp = to_mb.inbox / f".{uuid.uuid4().hex}.tmp"
+        tmp.write_text(content, encoding="utf-8")
+        p = _move_message(tmp, to_mb.inbox, name=message_name(from_agent, title))
+        assert p is not None
+        get_mailbox_index(self.root, to_agent).add(
+            InboxEntry(path=p, kind=kind, title=title, from_agent=from_agent)
+        )
+        return p
+
+    def claim(
+        self, agent_id: str, kinds: Collection[str] | None = None, *, rescan: bool = True
+    ) -> ClaimedMessage | None:
+        mb = _ensure_claim_dirs(self.root, agent_id)
+        self._requeue_expired(mb)
+        idx = get_mailbox_index(self.root, agent_id)
+        now = time.time()
+        for entry in idx.entries(kinds, rescan=rescan):
+            if entry.not_before > now:
+                # nack された直後（backoff 中）
+                continue
+            # 同時に claim した側は None になる
+            dst = _move_message(entry.path, mb.processing)
+            idx.discard(entry.path.name)
+            if dst is None:
+                continue
+            os.utime(dst)  # visibility timeout の起点
+            attempts = _read_attempts(dst) + 1
+            _write_attempts(dst, attempts)
+            msg = parse_mail_markdown(dst.read_text(encoding="utf-8"))
+            return ClaimedMessage(
+                id=str(dst),
+                agent_id=agent_id,
+                name=dst.name,
+                kind=msg.kind,
+                title=msg.title,
+                from_agent=msg.from_agent,
+                to_agent=msg.to_agent,
+                body=msg.body,
+                attempts=attempts,
+            )
+        return None
+
+    def ack(self, msg: ClaimedMessage) -> None:
+        self._finish(msg, AgentMailbox(self.root, msg.agent_id).archive)
+        _event(self.root, f"mailbox: archived {msg.agent_id}: {msg.name}")
+
+    def nack(self, msg: ClaimedMessage, *, error: str = "") -> bool:
+        mb = AgentMailbox(self.root, msg.agent_id)
+        if msg.attempts >= self.max_attempts:
+            self._finish(msg, mb.deadletter)
+            _event(self.root, f"mailbox: dead-letter {msg.agent_id}: {msg.name} {error}".rstrip())
+            return True
+        moved = _move_message(Path(msg.id), mb.inbox)
+        if moved is None:
+            return False
+        # backoff の期限を mtime に入れる（他プロセスの scan もこれを見る）
+        not_before = time.time() + _backoff(self.retry_backoff_seconds, msg.attempts)
+        os.utime(moved, (not_before, not_before))
+        # claim_messages は inbox を scan し直さないので index に戻す
+        get_mailbox_index(self.root, msg.agent_id).add(
+            InboxEntry(
+                path=moved,
+                kind=msg.kind,
+                title=msg.title,
+                from_agent=msg.from_agent,
+                not_before=not_before,
+            )
+        )
+        return False
+
+    def archive_unhandled(self, agent_id: str, kinds: Collection[str]) -> int:
+        return len(archive_unhandled(root=self.root, agent_id=agent_id, kinds=kinds))
+
+    def export_markdown(self, out_dir: Path) -> int:
+        # ファイル自体が Markdown なので書き出すものは無い
+        return 0
+
+    def _finish(self, msg: ClaimedMessage, dst_dir: Path) -> None:
+        dst_dir.mkdir(parents=True, exist_ok=True)
+        dst = _move_message(Path(msg.id), dst_dir)
+        _attempts_path(dst or Path(msg.id)).unlink(missing_ok=True)
+
+    def _requeue_expired(self, mb: AgentMailbox) -> None:
+        deadline = time.time() - self.visibility_seconds
+        try:
+            with os.scandir(mb.processing) as it:
+                expired = [
+                    e for e in it if e.name.endswith(".md") and e.stat().st_mtime <= deadline
+                ]
+        except FileNotFoundError:
+            return
+        for e in expired:
+            attempts = _read_attempts(Path(e.path))
+            dst_dir = mb.deadletter if attempts >= self.max_attempts else mb.inbox
+            dst_dir.mkdir(parents=True, exist_ok=True)
+            dst = _move_message(Path(e.path), dst_dir)
+            if dst is None:
+                continue
+            if dst_dir == mb.deadletter:
+                _attempts_path(dst).unlink(missing_ok=True)
+                _event(self.root, f"mailbox: dead-letter {mb.agent_id}: {e.name} (timeout)")
+            else:
+                _event(self.root, f"mailbox: redeliver {mb.agent_id}: {e.name} (timeout)")
+
+
+_BACKENDS: dict[Path, MailboxBackend] = {}
+_BACKENDS_LOCK = threading.Lock()
+_listeners: list[Callable[[str], None]] = []
+
+
+def configure_mailbox(root: Path, cfg: MailboxConfig) -> MailboxBackend:
+    """root で使う backend を runtime の設定で切り替える。"""
+
+    backend: MailboxBackend
+    if cfg.backend == "sqlite":
+        from usagi.mailbox_sqlite import SqliteMailbox
+
+        backend = SqliteMailbox(
+            root,
+            visibility_seconds=cfg.visibility_seconds,
+            max_attempts=cfg.max_attempts,
+            retry_backoff_seconds=cfg.retry_backoff_seconds,
+        )
+    else:
+        backend = MarkdownMailbox(
+            root,
+            visibility_seconds=cfg.visibility_seconds,
+            max_attempts=cfg.max_attempts,
+            retry_backoff_seconds=cfg.retry_backoff_seconds,
+        )
+    with _BACKENDS_LOCK:
+        _BACKENDS[root.resolve()] = backend
+    # 古い backend は閉じない: 実行中のレーンがまだ claim/ack に使っているかもしれない。
+    # 参照が無くなった時点で（sqlite の接続も）片付く
+    return backend
+
+
+def get_mailbox_backend(root: Path) -> MailboxBackend:
+    key = root.resolve()
+    with _BACKENDS_LOCK:
+        backend = _BACKENDS.get(key)
+        if backend is None:
+            backend = _BACKENDS[key] = MarkdownMailbox(root)
+        return backend
+
+
+def subscribe_deliveries(fn: Callable[[str], None]) -> Callable[[], None]:
+    """deliver のたびに宛先 agent id で呼ばれる（file を介さない backend 用）。"""
+
+    _listeners.append(fn)
+
+    def unsubscribe() -> None:
+        try:
+            _listeners.remove(fn)
+        except ValueError:
+            pass
+
+    return unsubscribe
+
+
+def claim_messages(
+    *, root: Path, agent_id: str, kinds: Collection[str]
+) -> Iterator[ClaimedMessage]:
+    """Claim pending messages of `kinds` one at a time (ack each with `ack_message`).
+
+    Messages of other kinds are archived up front. A message that is never acked
+    (handler raised) becomes claimable again after the visibility timeout.
+
+    The inbox directory is scanned once, by `archive_unhandled`; the claims reuse
+    that snapshot (plus in-process deliveries). Files dropped in by other
+    processes meanwhile are picked up on the next call.
+    """
+
+    box = get_mailbox_backend(root)
+    box.archive_unhandled(agent_id, kinds)
+    while (msg := box.claim(agent_id, kinds, rescan=False)) is not None:
+        yield msg
+
+
+def ack_message(*, root: Path, message: ClaimedMessage) -> None:
+    get_mailbox_backend(root).ack(message)
+
+
+def nack_message(*, root: Path, message: ClaimedMessage, error: str = "") -> bool:
+    """Give a claimed message back after a failed handler.
+
+    It is redelivered right away, or dead-lettered once `max_attempts` is reached.
+    Returns True when the message was dead-lettered.
+    """
+
+    return get_mailbox_backend(root).nack(message, error=error)
+
+
+def export_markdown(root: Path, out_dir: Path | None = None) -> int:
+    """人が読む用の Markdown を書き出す（書いた件数）。"""
+
+    return get_mailbox_backend(root).export_markdown(
+        out_dir or root / ".usagi" / "mailbox-export"
+    )
+
+
+@dataclass(frozen=True)
+class InboxEntry:
+    """Pending inbox message header (body is read lazily via `read_message`)."""
+
+    path: Path
+    kind: str
+    title: str
+    from_agent: str
+    # これより前は claim しない（nack の backoff。epoch 秒）
+    not_before: float = 0.0
+
+
+class MailboxIndex:
+    """In-memory index of one agent's inbox.
+
+    `entries()` costs one `os.scandir` of the inbox; messages already seen are
+    not re-read. Files removed by others (archive from another process) drop out.
+    `entries(rescan=False)` skips the scan and returns what is already indexed;
+    callers must cope with entries whose file is gone.
+    """
+
+    def __init__(self, inbox: Path) -> None:
+        self.inbox = inbox
+        self._lock = threading.Lock()
+        self._entries: dict[str, InboxEntry] = {}
+
+    def add(self, entry: InboxEntry) -> None:
+        with self._lock:
+            self._entries[entry.path.name] = entry
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def entries(
+        self, kinds: Collection[str] | None = None, *, rescan: bool = True
+    ) -> list[InboxEntry]:
+        if rescan:
+            self._rescan()
+
+        with self._lock:
+            out = [self._entries[n] for n in sorted(self._entries)]
+        if kinds is None:
+            return out
+        return [e for e in out if e.kind in kinds]
+
+    def _rescan(self) -> None:
+        try:
+            with os.scandir(self.inbox) as it:
+                names = {e.name for e in it if e.name.endswith(".md") and e.is_file()}
+        except FileNotFoundError:
+            names = set()
+
+        with self._lock:
+            for name in list(self._entries):
+                if name not in names:
+                    del self._entries[name]
+            unknown = [n for n in names if n not in self._entries]
+
+        for name in unknown:
+            entry = _read_entry(self.inbox / name)
+            if entry is not None:
+                self.add(entry)
+
+
+_INDEXES: dict[Path, MailboxIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_mailbox_index(root: Path, agent_id: str) -> MailboxIndex:
+    inbox = AgentMailbox(root=root, agent_id=agent_id).inbox
+    key = inbox.resolve()
+    with _INDEXES_LOCK:
+        idx = _INDEXES.get(key)
+        if idx is None:
+            idx = _INDEXES[key] = MailboxIndex(inbox)
+        return idx
 
 
 def list_inbox(*, root: Path, agent_id: str) -> list[Path]:
-    mb = ensure_mailbox(root, agent_id)
-    return sorted(mb.inbox.glob("*.md"))
+    ensure_mailbox(root, agent_id)
+    return [e.path for e in get_mailbox_index(root, agent_id).entries()]
+
+
+def list_messages(
+    *, root: Path, agent_id: str, kinds: Collection[str] | None = None
+) -> list[InboxEntry]:
+    """Pending messages (oldest first), optionally filtered by kind without reading files."""
+
+    ensure_mailbox(root, agent_id)
+    return get_mailbox_index(root, agent_id).entries(kinds)
+
+
+def read_message(entry: InboxEntry) -> MailMessage:
+    return parse_mail_markdown(entry.path.read_text(encoding="utf-8"))
 
 
 def archive_message(*, root: Path, agent_id: str, message_path: Path) -> Path:
     """Move an inbox message into archive (processed)."""
 
+    return archive_messages(root=root, agent_id=agent_id, message_paths=[message_path])[0]
+
+
+def archive_messages(*, root: Path, agent_id: str, message_paths: Iterable[Path]) -> list[Path]:
+    """Move several inbox messages into archive with a single event line."""
+
+    paths = list(message_paths)
+    if not paths:
+        return []
+    mb = ensure_mailbox(root, agent_id)
+    idx = get_mailbox_index(root, agent_id)
+    out: list[Path] = []
+    for p in paths:
+        dst = _move_message(p, mb.archive)
+        idx.discard(p.name)
+        if dst is not None:
+            out.append(dst)
+    if not out:
+        return []
+    if len(out) == 1:
+        _event(root, f"mailbox: archived {agent_id}: {out[0].name}")
+    else:
+        _event(root, f"mailbox: archived {agent_id}: {len(out)} messages")
+    return out
+
+
+def archive_unhandled(*, root: Path, agent_id: str, kinds: Collection[str]) -> list[Path]:
+    """Archive every pending message whose kind the caller does not handle."""
+
+    skip = [e.path for e in list_messages(root=root, agent_id=agent_id) if e.kind not in kinds]
+    return archive_messages(root=root, agent_id=agent_id, message_paths=skip)
+
+
+def _ensure_claim_dirs(root: Path, agent_id: str) -> AgentMailbox:
     mb = ensure_mailbox(root, agent_id)
-    dst = mb.archive / message_path.name
-    dst = _ensure_unique_path(dst)
-    message_path.replace(dst)
-    _event(root, f"mailbox: archived {agent_id}: {dst.name}")
+    for d in [mb.processing, mb.deadletter]:
+        d.mkdir(parents=True, exist_ok=True)
+    return mb
+
+
+def _attempts_path(claimed: Path) -> Path:
+    return claimed.with_name(claimed.name + ".attempts")
+
+
+def _read_attempts(claimed: Path) -> int:
+    try:
+        return int(_attempts_path(claimed).read_text(encoding="utf-8").strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_attempts(claimed: Path, attempts: int) -> None:
+    p = _attempts_path(claimed)
+    tmp = p.with_name(p.name + ".tmp")
+    tmp.write_text(str(attempts), encoding="utf-8")
+    os.replace(tmp, p)
+
+
+def _read_entry(p: Path) -> InboxEntry | None:
+    try:
+        msg = parse_mail_markdown(p.read_text(encoding="utf-8"))
+        mtime = p.stat().st_mtime
+    except (OSError, UnicodeDecodeError):
+        # 書き込み途中/消えた。次の scan で拾い直す
+        return None
+    return InboxEntry(
+        path=p,
+        kind=msg.kind,
+        title=msg.title,
+        from_agent=msg.from_agent,
+        # 未来の mtime は nack の backoff（_requeue_expired 等で戻ったものは過去）
+        not_before=mtime if mtime > time.time() else 0.0,
+    )
+
+
+def _backoff(base: float, attempts: int) -> float:
+    return max(0.0, base) * 2 ** max(0, attempts - 1)
+
+
+def _move_message(src: Path, dst_dir: Path, *, name: str | None = None) -> Path | None:
+    """src を dst_dir に移す（上書きしない）。`<name>.attempts` も一緒に移す。
+
+    同名があれば `-2`, `-3` .. を付ける。link してから src を unlink するので、
+    同じ src を同時に移そうとしても unlink できた1つだけが勝つ（負けた側は None）。
+    src が既に無ければ None。
+    """
+
+    name = name or src.name
+    stem, suffix = Path(name).stem, Path(name).suffix
+    i = 1
+    while True:
+        dst = dst_dir / (name if i == 1 else f"{stem}-{i}{suffix}")
+        try:
+            os.link(src, dst)
+            break
+        except FileExistsError:
+            i += 1
+        except FileNotFoundError:
+            return None
+        except OSError:
+            # hard link できないファイルシステム: 確認してから rename（競合時は上書きしうる）
+            dst = _ensure_unique_path(dst)
+            try:
+                os.rename(src, dst)
+            except FileNotFoundError:
+                return None
+            _move_attempts(src, dst)
+            return dst
+    try:
+        os.unlink(src)
+    except FileNotFoundError:
+        # 先を越された（別の claim が同じ src を移した）
+        dst.unlink(missing_ok=True)
+        return None
+    _move_attempts(src, dst)
     return dst
 
 
-def _event(root: Path, msg: str) -> None:
+def _move_attempts(src: Path, dst: Path) -> None:
     try:
-        p = root / ".usagi" / "events.log"
-        p.parent.mkdir(parents=True, exist_ok=True)
-        ts = time.strftime("%Y-%m-%d %H:%M:%S")
-        with p.open("a", encoding="utf-8") as f:
-            f.write(f"[{ts}] {msg}\n")
-    except Exception:
-        return
+        os.replace(_attempts_path(src), _attempts_path(dst))
+    except FileNotFoundError:
+        pass
+
+
+def _event(root: Path, msg: str) -> None:
+    emit_event(events_path(root), msg)
 
 
 def _slug(s: str) -> str:
@@ -0,0 +1,167 @@
+"""Event-driven mailbox dispatcher.
+
+`.usagi/agents/<agent_id>/inbox/` への .md 到着を watchdog で検知し、
+その agent の handler だけを起動する。
+
+- 何も届いていない間は Event.wait で眠るだけ（ポーリング/glob しない）
+- inotify 取りこぼし対策として、ゆっくりした fallback rescan で全 handler を叩く
+- handler は AgentLanes で agent ごとに直列・agent 間は並行に実行する
+
+NOTE:
+- mailbox.py は watcher を持たない方針なので、監視はこのモジュールに分離する。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from watchdog.events import FileSystemEventHandler
+
+log = logging.getLogger(__name__)
+
+
+def agents_dir(root: Path) -> Path:
+    return root / ".usagi" / "agents"
+
+
+def agent_for_inbox_path(root: Path, path: Path) -> str | None:
+    """`<root>/.usagi/agents/<id>/inbox/<file>.md` なら <id> を返す。"""
+
+    if path.suffix.lower() != ".md":
+        return None
+    try:
+        rel = path.relative_to(agents_dir(root))
+    except ValueError:
+        return None
+    parts = rel.parts
+    if len(parts) != 3 or parts[1] != "inbox":
+        return None
+    return parts[0]
+
+
+class MailboxDispatcher:
+    """inbox に届いた agent id を溜めて、ループ側に渡す。"""
+
+    def __init__(self, root: Path, *, rescan_seconds: float = 10.0) -> None:
+        self.root = root
+        self.rescan_seconds = rescan_seconds
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending: set[str] = set()
+        self._last_rescan = 0.0
+
+    def mark(self, agent_id: str) -> None:
+        with self._lock:
+            self._pending.add(agent_id)
+        self._wake.set()
+
+    def rescan_due(self) -> bool:
+        return time.monotonic() - self._last_rescan >= self.rescan_seconds
+
+    def wait(self, timeout: float) -> tuple[set[str], bool]:
+        """inbox 到着を待つ。
+
+        returns: (pending agent ids, rescan)
+        - rescan=True のときは取りこぼし対策で全 handler を回す合図
+        """
+
+        if not self.rescan_due():
+            self._wake.wait(timeout)
+
+        with self._lock:
+            self._wake.clear()
+            pending = self._pending
+            self._pending = set()
+
+        rescan = self.rescan_due()
+        if rescan:
+            self._last_rescan = time.monotonic()
+        return pending, rescan
+
+    def event_handler(self) -> FileSystemEventHandler:
+        return _InboxHandler(self)
+
+
+class _InboxHandler(FileSystemEventHandler):
+    def __init__(self, dispatcher: MailboxDispatcher) -> None:
+        self.dispatcher = dispatcher
+
+    def _mark(self, src: str) -> None:
+        agent_id = agent_for_inbox_path(self.dispatcher.root, Path(src))
+        if agent_id:
+            self.dispatcher.mark(agent_id)
+
+    def on_created(self, event):  # type: ignore[override]
+        if not event.is_directory:
+            self._mark(event.src_path)
+
+    def on_modified(self, event):  # type: ignore[override]
+        if not event.is_directory:
+            self._mark(event.src_path)
+
+    def on_moved(self, event):  # type: ignore[override]
+        # archive への移動(inbox -> archive)は dest が inbox ではないので無視される
+        if not event.is_directory:
+            self._mark(event.dest_path)
+
+
+class AgentLanes:
+    """agent ごとの実行レーン（上限付きスレッドプール）。
+
+    - 同じ agent の tick は同時に1本だけ（inbox を2重処理しない）
+    - 実行中に再度 submit されたら、終了後にもう1回だけ回す（coalesce）
+    - 別 agent の tick は並行に走る（worker の codex exec 中でも boss/assist が進む）
+    - `pools` で名前付きの別プールを持てる（worker の tick を別枠にして、fan-out 直後の
+      worker の山が boss/manager/lead のスレッドを使い切らないように）。
+      submit(pool=...) で指定し、無い名前は既定のプールで走る
+    """
+
+    def __init__(self, max_workers: int = 8, *, pools: dict[str, int] | None = None) -> None:
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="usagi-lane"
+        )
+        self._pools = {
+            name: ThreadPoolExecutor(max_workers=max(1, n), thread_name_prefix=f"usagi-lane-{name}")
+            for name, n in (pools or {}).items()
+        }
+        self._lock = threading.Lock()
+        self._running: set[str] = set()
+        self._again: dict[str, Callable[[], None]] = {}
+
+    def submit(self, agent_id: str, fn: Callable[[], None], *, pool: str = "") -> bool:
+        """tick を投入する。既に走っていれば再実行予約だけして False を返す。"""
+
+        with self._lock:
+            if agent_id in self._running:
+                self._again[agent_id] = fn
+                return False
+            self._running.add(agent_id)
+        self._pools.get(pool, self._pool).submit(self._run, agent_id, fn)
+        return True
+
+    def busy(self) -> bool:
+        with self._lock:
+            return bool(self._running)
+
+    def shutdown(self, *, wait: bool = False) -> None:
+        for pool in [self._pool, *self._pools.values()]:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, agent_id: str, fn: Callable[[], None]) -> None:
+        while True:
+            try:
+                fn()
+            except Exception:  # noqa: BLE001
+                # 1 agent の失敗で他レーンを止めない
+                log.error("mailbox lane crashed: %s", agent_id, exc_info=True)
+            with self._lock:
+                nxt = self._again.pop(agent_id, None)
+                if nxt is None:
+                    self._running.discard(agent_id)
+                    return
+            fn = nxt
@@ -0,0 +1,351 @@
+"""SQLite (WAL) mailbox backend.
+
+Markdown mailbox は 1 message = 1 file なので、配達ごとに mkdir/exists/write/rename が走り、
+同じ inbox を2スレッドが同時に処理しない保証も無い。こちらは `.usagi/mailbox.db` の
+1 テーブルに持ち、claim を `BEGIN IMMEDIATE` の中で行う。
+
+状態遷移:
+- pending --claim--> claimed --ack--> done
+- claimed --nack / visibility timeout--> pending（attempts < max_attempts）
+- claimed --nack / visibility timeout--> dead（attempts >= max_attempts）
+
+inbox ディレクトリに直接置かれた .md（人手/旧プロセス）は claim 時に取り込む
+（DB に入れてから archive へ移す。読めないファイルは deadletter へ）。
+同じ名前でも内容が違えば別の message として取り込む（名前は秒単位なので衝突しうる）。
+人が読む Markdown は `export_markdown()` で書き出す。
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Collection, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from usagi.events import emit_event, events_path
+from usagi.mailbox import (
+    ClaimedMessage,
+    _backoff,
+    _move_message,
+    ensure_mailbox,
+    get_mailbox_index,
+    message_name,
+    render_markdown,
+)
+from usagi.mailbox_parse import parse_mail_markdown
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    agent_id TEXT NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    from_agent TEXT NOT NULL,
+    to_agent TEXT NOT NULL,
+    body TEXT NOT NULL,
+    created REAL NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    visible_at REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS messages_inbox ON messages(agent_id, state, id);
+CREATE INDEX IF NOT EXISTS messages_name ON messages(agent_id, name);
+"""
+
+# export 先のサブディレクトリ（Markdown mailbox と同じ名前）
+_EXPORT_DIRS = {
+    "pending": "inbox",
+    "claimed": "processing",
+    "done": "archive",
+    "dead": "deadletter",
+}
+
+
+def mailbox_db_path(root: Path) -> Path:
+    return root / ".usagi" / "mailbox.db"
+
+
+class SqliteMailbox:
+    def __init__(
+        self,
+        root: Path,
+        *,
+        visibility_seconds: float = 600.0,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 30.0,
+        path: Path | None = None,
+    ) -> None:
+        self.root = root
+        self.path = path or mailbox_db_path(root)
+        self.visibility_seconds = visibility_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._local = threading.local()
+        self._conns: list[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    # ---- MailboxBackend ----
+
+    def deliver(
+        self, *, from_agent: str, to_agent: str, title: str, body: str, kind: str
+    ) -> None:
+        # ファイルは書かない（人が読む Markdown は export_markdown で）
+        now = time.time()
+        with self._tx() as db:
+            cur = db.execute(
+                "INSERT INTO messages (agent_id, kind, title, from_agent, to_agent, body, created)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (to_agent, kind, title, from_agent, to_agent, body, now),
+            )
+            mid = int(cur.lastrowid or 0)
+            # id を付けて一意にする（Markdown 側の -2, -3 .. の代わり）
+            name = message_name(from_agent, title, now).removesuffix(".md") + f"-{mid}.md"
+            db.execute("UPDATE messages SET name = ? WHERE id = ?", (name, mid))
+
+    def claim(
+        self, agent_id: str, kinds: Collection[str] | None = None, *, rescan: bool = True
+    ) -> ClaimedMessage | None:
+        if rescan:
+            self._ingest_markdown(agent_id)
+        now = time.time()
+        sql = (
+            "SELECT id, name, kind, title, from_agent, to_agent, body, state, attempts"
+            " FROM messages WHERE agent_id = ?"
+            " AND (state = 'pending' AND visible_at <= ? OR state = 'claimed' AND visible_at <= ?)"
+        )
+        args: list[object] = [agent_id, now, now]
+        if kinds is not None:
+            sql += f" AND kind IN ({','.join('?' * len(kinds))})"
+            args.extend(kinds)
+        sql += " ORDER BY id LIMIT 1"
+
+        with self._tx() as db:
+            while True:
+                row = db.execute(sql, args).fetchone()
+                if row is None:
+                    return None
+                mid, name, kind, title, from_agent, to_agent, body, state, attempts = row
+                if state == "claimed" and attempts >= self.max_attempts:
+                    # 期限切れのまま回数切れ
+                    db.execute(
+                        "UPDATE messages SET state = 'dead', last_error = 'timeout' WHERE id = ?",
+                        (mid,),
+                    )
+                    self._event(f"mailbox: dead-letter {agent_id}: {name} (timeout)")
+                    continue
+                db.execute(
+                    "UPDATE messages SET state = 'claimed', visible_at = ?,"
+                    " attempts = attempts + 1 WHERE id = ?",
+                    (now + self.visibility_seconds, mid),
+                )
+                return ClaimedMessage(
+                    id=str(mid),
+                    agent_id=agent_id,
+                    name=name,
+                    kind=kind,
+                    title=title,
+                    from_agent=from_agent,
+                    to_agent=to_agent,
+                    body=body,
+                    attempts=attempts + 1,
+                )
+
+    def ack(self, msg: ClaimedMessage) -> None:
+        with self._tx() as db:
+            db.execute(
+                "UPDATE messages SET state = 'done' WHERE id = ? AND state = 'claimed'",
+                (int(msg.id),),
+            )
+        self._event(f"mailbox: archived {msg.agent_id}: {msg.name}")
+
+    def nack(self, msg: ClaimedMessage, *, error: str = "") -> bool:
+        dead = msg.attempts >= self.max_attempts
+        visible_at = time.time() + _backoff(self.retry_backoff_seconds, msg.attempts)
+        with self._tx() as db:
+            db.execute(
+                "UPDATE messages SET state = ?, visible_at = ?, last_error = ?"
+                " WHERE id = ? AND state = 'claimed'",
+                ("dead" if dead else "pending", visible_at, error[:2000], int(msg.id)),
+            )
+        if dead:
+            self._event(f"mailbox: dead-letter {msg.agent_id}: {msg.name} {error}".rstrip())
+        return dead
+
+    def archive_unhandled(self, agent_id: str, kinds: Collection[str]) -> int:
+        self._ingest_markdown(agent_id)
+        marks = ",".join("?" * len(kinds))
+        with self._tx() as db:
+            cur = db.execute(
+                "UPDATE messages SET state = 'done' WHERE agent_id = ? AND state = 'pending'"
+                + (f" AND kind NOT IN ({marks})" if kinds else ""),
+                [agent_id, *kinds],
+            )
+            n = cur.rowcount
+        if n:
+            self._event(f"mailbox: archived {agent_id}: {n} messages")
+        return n
+
+    def export_markdown(self, out_dir: Path) -> int:
+        """全 message を `<out_dir>/<agent>/<inbox|processing|archive|deadletter>/` に書く。
+
+        既に同じ場所にあるものは書き直さない。状態が変わったものは古い場所から消す。
+        """
+
+        rows = self._conn().execute(
+            "SELECT name, agent_id, state, kind, title, from_agent, to_agent, body, created"
+            " FROM messages ORDER BY id"
+        )
+        n = 0
+        for name, agent_id, state, kind, title, from_agent, to_agent, body, created in rows:
+            sub = _EXPORT_DIRS.get(state, "archive")
+            dst = out_dir / agent_id / sub / name
+            if dst.exists():
+                continue
+            for other in _EXPORT_DIRS.values():
+                if other != sub:
+                    (out_dir / agent_id / other / name).unlink(missing_ok=True)
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dst.with_name(dst.name + ".tmp")
+            tmp.write_text(
+                render_markdown(
+                    kind=kind,
+                    from_agent=from_agent,
+                    to_agent=to_agent,
+                    title=title,
+                    body=body,
+                    created=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created)),
+                ),
+                encoding="utf-8",
+            )
+            os.replace(tmp, dst)
+            n += 1
+        return n
+
+    # ---- misc ----
+
+    def counts(self, agent_id: str) -> dict[str, int]:
+        rows = self._conn().execute(
+            "SELECT state, COUNT(*) FROM messages WHERE agent_id = ? GROUP BY state", (agent_id,)
+        )
+        return {state: int(n) for state, n in rows}
+
+    def close(self) -> None:
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for c in conns:
+            try:
+                c.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    # ---- internal ----
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # autocommit にして BEGIN IMMEDIATE を自分で出す
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _ingest_markdown(self, agent_id: str) -> None:
+        """inbox ディレクトリに直接置かれた .md を DB に移す。
+
+        先に INSERT して commit してから archive へ移す（途中で落ちても次回やり直せる）。
+        同じ名前・同じ内容が既に DB にあれば INSERT しない（並行 claim / 落ちた後の
+        二重取り込み防止）。名前だけ同じ別の message は `-<id>` を付けて取り込む。
+        """
+
+        inbox = self.root / ".usagi" / "agents" / agent_id / "inbox"
+        try:
+            with os.scandir(inbox) as it:
+                names = sorted(e.name for e in it if e.name.endswith(".md") and e.is_file())
+        except FileNotFoundError:
+            return
+        if not names:
+            return
+        mb = ensure_mailbox(self.root, agent_id)
+        idx = get_mailbox_index(self.root, agent_id)
+        for name in names:
+            src = inbox / name
+            try:
+                text = src.read_text(encoding="utf-8")
+            except UnicodeDecodeError:
+                self._move(src, mb.deadletter)
+                idx.discard(name)
+                self._event(f"mailbox: dead-letter {agent_id}: {name} (unreadable)")
+                continue
+            except OSError:
+                # 消えた/読めない。次の scan でやり直す
+                continue
+            msg = parse_mail_markdown(text)
+            to_agent = msg.to_agent or agent_id
+            with self._tx() as db:
+                # 名前が衝突して -<id> を付けたものも含めて、内容で同じ message か判断する
+                rows = db.execute(
+                    "SELECT name, kind, title, from_agent, to_agent, body FROM messages"
+                    " WHERE agent_id = ? AND (name = ? OR name LIKE ?)",
+                    (agent_id, name, name.removesuffix(".md") + "-%.md"),
+                ).fetchall()
+                content = (msg.kind, msg.title, msg.from_agent, to_agent, msg.body)
+                seen = any(tuple(r[1:]) == content for r in rows)
+                taken = any(r[0] == name for r in rows)
+                if not seen:
+                    cur = db.execute(
+                        "INSERT INTO messages"
+                        " (agent_id, name, kind, title, from_agent, to_agent, body, created)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            agent_id,
+                            name,
+                            msg.kind,
+                            msg.title,
+                            msg.from_agent,
+                            to_agent,
+                            msg.body,
+                            time.time(),
+                        ),
+                    )
+                    if taken:
+                        # 名前だけ衝突した別の message
+                        mid = int(cur.lastrowid or 0)
+                        db.execute(
+                            "UPDATE messages SET name = ? WHERE id = ?",
+                            (name.removesuffix(".md") + f"-{mid}.md", mid),
+                        )
+            self._move(src, mb.archive)
+            idx.discard(name)
+            if not seen:
+                self._event(f"mailbox: imported {agent_id}: {name}")
+
+    @staticmethod
+    def _move(src: Path, dst_dir: Path) -> None:
+        dst_dir.mkdir(parents=True, exist_ok=True)
+        _move_message(src, dst_dir)
+
+    def _event(self, msg: str) -> None:
+        emit_event(events_path(self.root), msg)
@@ -0,0 +1,230 @@
+"""main への merge queue（課ブランチの取り込みを直列化する）。
+
+以前は部長の MERGE_OK ごとに `merge_to_main_and_delete_branch` が共有の base repo で
+`checkout main` + `merge` していたので、並行した merge が HEAD/index を取り合っていた。
+
+ここでは main への取り込みを repo ごとに1本の queue に通す。
+
+- `submit(branch)` は queue に積んで待つ。lock を取れた呼び出しが、その時点で積まれて
+  いる分をまとめて1バッチとして処理する（後から来た分は次のバッチ）
+- 衝突は `git merge-tree --write-tree` で事前に確認する（作業ツリーには触れない）。
+  衝突するブランチだけ弾き、残りは取り込む
+- バッチ内は main の先から順に積み上げ、fast-forward できるものはそのまま進め、
+  できないものだけ `commit-tree` で merge commit を作る。main の更新と取り込んだ
+  ブランチの削除は1回の `update-ref`（compare-and-swap）で行う。先を越されていたら
+  （別プロセス等）計算し直す
+- base repo が main を checkout していれば、最後に作業ツリーを新しい main に合わせる
+- 待ち時間（submit から反映まで）は MergeResult と metrics() で返す
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from usagi.git_ops import ZERO_OID, GitRepo
+
+log = logging.getLogger(__name__)
+
+_CAS_RETRIES = 5
+_WAIT_SAMPLES = 100
+
+# 取り込めた（main に入っている）状態
+_OK = frozenset({"fast-forward", "merged", "up-to-date"})
+
+
+@dataclass
+class MergeResult:
+    branch: str
+    # fast-forward / merged / up-to-date / conflict / missing / failed
+    status: str
+    conflicts: list[str] = field(default_factory=list)
+    # submit してから main に反映される（または弾かれる）まで
+    wait_seconds: float = 0.0
+    # 一緒に処理したブランチ数
+    batch: int = 1
+    # 反映後の main（弾かれたときは ""）
+    commit: str = ""
+    detail: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status in _OK
+
+
+@dataclass
+class _Request:
+    branch: str
+    delete: bool
+    enqueued_at: float = field(default_factory=time.monotonic)
+    result: MergeResult | None = None
+
+
+class MergeQueue:
+    def __init__(self, repo_path: Path, *, main: str = "main") -> None:
+        self.repo = GitRepo(repo_path)
+        self.main = main
+        self._cond = threading.Condition()
+        self._pending: deque[_Request] = deque()
+        # main への書き込み（バッチ処理）は同時に1つだけ
+        self._land_lock = threading.Lock()
+        self._waits: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._landed = 0
+        self._rejected = 0
+        self._batches = 0
+
+    def submit(self, branch: str, *, delete: bool = True) -> MergeResult:
+        """branch を main に取り込む（反映されるまで待つ）。
+
+        delete=True なら取り込んだ後に branch を消す（main と同じ update-ref で）。
+        """
+
+        req = _Request(branch=branch, delete=delete)
+        with self._cond:
+            self._pending.append(req)
+        while True:
+            with self._land_lock:
+                if req.result is None:
+                    with self._cond:
+                        batch = list(self._pending)
+                        self._pending.clear()
+                    if batch:
+                        self._run_batch(batch)
+            if req.result is not None:
+                return req.result
+            # 他のスレッドが自分を含むバッチを処理中
+            with self._cond:
+                if req.result is None:
+                    self._cond.wait(0.1)
+
+    def metrics(self) -> dict[str, float]:
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                "depth": len(self._pending),
+                "landed": self._landed,
+                "rejected": self._rejected,
+                "batches": self._batches,
+                "wait_avg_seconds": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "wait_p95_seconds": round(waits[int((len(waits) - 1) * 0.95)], 3) if waits else 0.0,
+                "wait_max_seconds": round(waits[-1], 3) if waits else 0.0,
+            }
+
+    # ---- internal ----
+
+    def _run_batch(self, batch: list[_Request]) -> None:
+        try:
+            results = self._land(batch)
+        except Exception as e:  # noqa: BLE001
+            log.error("merge queue: batch %s failed: %s", [r.branch for r in batch], e)
+            results = [MergeResult(r.branch, "failed", detail=str(e)) for r in batch]
+
+        now = time.monotonic()
+        with self._cond:
+            self._batches += 1
+            for req, res in zip(batch, results, strict=True):
+                res.wait_seconds = round(now - req.enqueued_at, 3)
+                res.batch = len(batch)
+                self._waits.append(res.wait_seconds)
+                if res.ok:
+                    self._landed += 1
+                else:
+                    self._rejected += 1
+                req.result = res
+            self._cond.notify_all()
+
+    def _land(self, batch: list[_Request]) -> list[MergeResult]:
+        repo = self.repo
+        repo.ensure_repo()
+        repo.ensure_initial_commit()
+        main_ref = f"refs/heads/{self.main}"
+
+        for _ in range(_CAS_RETRIES):
+            refs = repo.branches()
+            base = refs.get(self.main, "")
+            if not base:
+                raise RuntimeError(f"branch not found: {self.main}")
+            cur = base
+            results: list[MergeResult] = []
+            updates: list[tuple[str, str, str | None]] = []
+            deleted: set[str] = set()
+            for req in batch:
+                tip = refs.get(req.branch, "")
+                res = self._stack(req.branch, tip, cur)
+                results.append(res)
+                if res.ok:
+                    cur = res.commit or cur
+                    ref = f"refs/heads/{req.branch}"
+                    # 同じブランチが2回積まれていても削除は1回
+                    if req.delete and req.branch != self.main and ref not in deleted:
+                        deleted.add(ref)
+                        updates.append((ref, ZERO_OID, tip))
+
+            if cur != base:
+                updates.insert(0, (main_ref, cur, base))
+            try:
+                if updates:
+                    repo.update_refs(updates)
+            except RuntimeError as e:
+                # main か対象ブランチが動いた: 取り直して積み直す
+                log.info("merge queue: ref moved while landing, retrying: %s", e)
+                continue
+            for res in results:
+                if res.ok:
+                    res.commit = cur
+            if cur != base:
+                self._sync_worktree(base, cur)
+            return results
+        raise RuntimeError(f"{self.main} kept moving while landing")
+
+    def _stack(self, branch: str, tip: str, cur: str) -> MergeResult:
+        """cur（バッチ内でここまで積んだ main）の上に branch を載せる。"""
+
+        if not tip:
+            return MergeResult(branch, "missing", detail=f"branch not found: {branch}")
+        if tip == cur or self.repo.is_ancestor(tip, cur):
+            return MergeResult(branch, "up-to-date", commit=cur)
+        if self.repo.is_ancestor(cur, tip):
+            return MergeResult(branch, "fast-forward", commit=tip)
+        tree, conflicts = self.repo.merge_tree(cur, tip)
+        if conflicts:
+            return MergeResult(branch, "conflict", conflicts=conflicts)
+        merged = self.repo.commit_tree(tree, [cur, tip], f"Merge branch '{branch}'")
+        return MergeResult(branch, "merged", commit=merged)
+
+    def _sync_worktree(self, old: str, new: str) -> None:
+        """base repo が main を checkout していたら、index/作業ツリーを new に合わせる。"""
+
+        gitdir = self.repo.git_dir
+        if gitdir is None:
+            return
+        try:
+            head = (gitdir / "HEAD").read_text(encoding="utf-8").strip()
+        except OSError:
+            return
+        if head != f"ref: refs/heads/{self.main}":
+            return
+        try:
+            # 2-way merge: old から変わったファイルだけ更新（ローカルの変更は残す）
+            self.repo.run(["read-tree", "-m", "-u", old, new])
+        except RuntimeError as e:
+            log.warning("merge queue: could not update %s worktree: %s", self.repo.path, e)
+
+
+_queues: dict[Path, MergeQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_merge_queue(repo_path: Path) -> MergeQueue:
+    """base repo ごとに1つの MergeQueue。"""
+
+    key = repo_path.resolve()
+    with _queues_lock:
+        q = _queues.get(key)
+        if q is None:
+            q = _queues[key] = MergeQueue(repo_path)
+        return q
@@ -45,6 +45,7 @@ reports_to = "dev_mgr"
 
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -107,40 +108,80 @@ class AgentDef:
         p.write_text(content, encoding="utf-8")
 
 
+@dataclass
+class _OrgIndex:
+    """Organization の lookup 用インデックス（agents から一度だけ作る）。"""
+
+    by_id: dict[str, AgentDef]
+    by_name: dict[str, AgentDef]
+    children: dict[str, list[AgentDef]]
+    commandable: dict[str, frozenset[str]]
+
+    @classmethod
+    def build(cls, agents: list[AgentDef]) -> _OrgIndex:
+        by_id: dict[str, AgentDef] = {}
+        by_name: dict[str, AgentDef] = {}
+        children: dict[str, list[AgentDef]] = {}
+        for a in agents:
+            # 重複時は従来の線形探索と同じく先勝ち
+            by_id.setdefault(a.id, a)
+            by_name.setdefault(a.name, a)
+            children.setdefault(a.reports_to, []).append(a)
+        commandable = {
+            aid: frozenset(a.can_command) | {c.id for c in children.get(aid, [])}
+            for aid, a in by_id.items()
+        }
+        return cls(by_id=by_id, by_name=by_name, children=children, commandable=commandable)
+
+
 @dataclass
 class Organization:
-    """組織全体（agentsフラット + 階層情報）。"""
+    """組織全体（agentsフラット + 階層情報）。
+
+    lookup は id/name/children の dict インデックスで O(1)。
+    インデックスはインスタンスごとに持ち、`agents` を代入し直したときは作り直す。
+    agents をその場で追加/削除したり、AgentDef の reports_to 等を書き換えた場合は
+    `reindex()` を呼ぶ。
+    """
 
     agents: list[AgentDef] = field(default_factory=list)
+    _index: _OrgIndex | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        super().__setattr__(name, value)
+        if name == "agents":
+            super().__setattr__("_index", None)
+
+    @property
+    def index(self) -> _OrgIndex:
+        if self._index is None:
+            self._index = _OrgIndex.build(self.agents)
+        return self._index
+
+    def reindex(self) -> None:
+        self._index = None
 
     def find(self, agent_id: str) -> AgentDef | None:
-        for a in self.agents:
-            if a.id == agent_id:
-                return a
-        return None
+        return self.index.by_id.get(agent_id)
 
     def by_name(self, name: str) -> AgentDef | None:
-        for a in self.agents:
-            if a.name == name:
-                return a
-        return None
+        return self.index.by_name.get(name)
 
     def subordinates_of(self, agent_id: str) -> list[AgentDef]:
         """直属の部下を返す（reports_toで判定）。"""
-        return [a for a in self.agents if a.reports_to == agent_id]
+        return list(self.index.children.get(agent_id, []))
+
+    def roots(self) -> list[AgentDef]:
+        """最上位（reports_to が空）のエージェント。"""
+        return self.subordinates_of("")
 
     def can_command(self, commander_id: str, target_id: str) -> bool:
         """指揮権限チェック。明示can_command、または直属関係で判断。"""
-        commander = self.find(commander_id)
-        if not commander:
+        allowed = self.index.commandable.get(commander_id)
+        if allowed is None:
             return False
-        if target_id in commander.can_command:
-            return True
-        # 直属の上司が部下に指示するのは許可
-        target = self.find(target_id)
-        if target and target.reports_to == commander_id:
-            return True
-        return False
+        # 直属の上司が部下に指示するのは許可（commandable に含めてある）
+        return target_id in allowed
 
     def pick_worker(
         self,
@@ -180,6 +221,29 @@ def _parse_agent_new(data: dict) -> AgentDef:
     )
 
 
+_org_cache: dict[Path, tuple[tuple[int, int], Organization]] = {}
+_org_cache_lock = threading.Lock()
+
+
+def load_org_cached(path: Path) -> Organization:
+    """load_org のキャッシュ版。org.toml の mtime/size が変わったときだけ読み直す。
+
+    watch/TUI のループから繰り返し呼ばれる用。返り値は共有されるので書き換えないこと。
+    """
+
+    st = path.stat()
+    sig = (st.st_mtime_ns, st.st_size)
+    key = path.resolve()
+    with _org_cache_lock:
+        hit = _org_cache.get(key)
+        if hit is not None and hit[0] == sig:
+            return hit[1]
+    org = load_org(path)
+    with _org_cache_lock:
+        _org_cache[key] = (sig, org)
+    return org
+
+
 def load_org(path: Path) -> Organization:
     """TOMLファイルから組織定義を読み込む。"""
     raw = tomllib.loads(path.read_text(encoding="utf-8"))
@@ -6,12 +6,17 @@
 
 設定ファイル: `usagi.runtime.toml`（デフォルト）
 
+watch など常駐処理は `get_runtime_provider()` 経由で読む（変更時だけ再パース + 変更通知）。
+
 秘密情報（Discord token / API key など）はこのファイルに直書きしない。
 環境変数またはトークンファイル参照で扱う。
 """
 
 from __future__ import annotations
 
+import logging
+import threading
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -33,6 +38,7 @@ class VotePolicy:
     threshold: str = "2of3"
     voters: list[str] = field(default_factory=lambda: ["boss", "ghost_boss", "reviewer"])
     ask_human_on_tie: bool = True
+    voter_timeout_seconds: float = 180.0  # 1人格あたりの投票待ち上限（超えたら abstain）
 
 
 @dataclass
@@ -58,6 +64,52 @@ class PromptCompression:
     max_chars_vote: int = 3500
 
 
+@dataclass
+class LLMCacheConfig:
+    enabled: bool = False
+    ttl_seconds: float = 86400.0
+    max_mb: float = 64.0
+
+
+@dataclass
+class EventLogConfig:
+    max_mb: float = 5.0  # events.log がこのサイズを超えたら events.log.1.. にローテート
+    backups: int = 3
+    flush_seconds: float = 0.5  # バックグラウンド writer の fsync 間隔
+    jsonl: bool = False  # events.jsonl（agent/kind/duration 付き）も書く
+
+
+@dataclass
+class MailboxConfig:
+    """agent 間 mailbox の保存先。"""
+
+    backend: str = "markdown"  # markdown | sqlite（.usagi/mailbox.db, WAL）
+    visibility_seconds: float = 600.0  # claim したまま ack されないと再配信するまでの秒数
+    max_attempts: int = 3  # これを超えて失敗した message は dead-letter に回す
+    retry_backoff_seconds: float = 30.0  # nack した message を再配信するまでの秒数（毎回2倍）
+
+
+@dataclass
+class WorktreePoolConfig:
+    """worker の git worktree プール（.usagi/worktrees/pool/<n>）。"""
+
+    size: int = 4  # 事前に作っておく worktree 数（足りなければ上限まで増やす）
+    max_size: int = 16  # 同時に貸し出せる worktree の上限
+    lease_seconds: float = 3600.0  # これを過ぎた貸し出しは持ち主が死んだとみなして回収する
+
+
+@dataclass
+class SchedulerConfig:
+    """watch ジョブの優先度/公平性。"""
+
+    # これだけ待つごとに実効優先度を 1 上げる（低優先度も最後には回る）
+    aging_seconds: float = 120.0
+    # frontmatter に priority が無いときの、置き場所（親ディレクトリ名）ごとの優先度
+    source_priority: dict[str, int] = field(default_factory=lambda: {"secretary": 2})
+    # 同じ優先度内での project ごとの重み（既定 1.0）
+    project_weights: dict[str, float] = field(default_factory=dict)
+
+
 @dataclass
 class RuntimeMode:
     name: str = "manual"
@@ -70,11 +122,22 @@ class RuntimeMode:
 
     boss_id: str = "boss"  # PR merge等の実行権限者
     worker_pool_size: int = 5  # autopilot/watch で同時起動するworkerコンテナ数
+    worker_pool_max: int = 0  # キュー滞留時にここまで worker を増やす（0 なら増やさない）
+    watch_queue_max: int = 200  # watch のジョブキュー上限
+    watch_queue_policy: str = "coalesce"  # coalesce | block | drop（満杯/重複時の振る舞い）
+    chain_pool_size: int = 8  # mailbox chain の tick を並行実行するスレッド数（agent毎に直列）
+    chain_worker_pool_size: int = 4  # worker の tick 専用のスレッド数（chain_pool_size とは別枠）
     use_worker_container: bool = True  # worker処理を別コンテナで実行する
     worker_image_build: str = "auto"  # auto | never
     input_postprocess: str = "keep"  # keep | trash
+    input_dedup: bool = True  # 内容（正規化後のハッシュ）が処理済みと同じ入力は再実行しない
 
     compress: PromptCompression = field(default_factory=PromptCompression)
+    llm_cache: LLMCacheConfig = field(default_factory=LLMCacheConfig)
+    events: EventLogConfig = field(default_factory=EventLogConfig)
+    scheduler: SchedulerConfig = field(default_factory=SchedulerConfig)
+    mailbox: MailboxConfig = field(default_factory=MailboxConfig)
+    worktree_pool: WorktreePoolConfig = field(default_factory=WorktreePoolConfig)
 
 
 def load_runtime(path: Path | None = None) -> RuntimeMode:
@@ -103,6 +166,7 @@ def load_runtime(path: Path | None = None) -> RuntimeMode:
             threshold=str(vote.get("threshold", "2of3")),
             voters=list(vote.get("voters", ["boss", "ghost_boss", "reviewer"]) or []),
             ask_human_on_tie=bool(vote.get("ask_human_on_tie", True)),
+            voter_timeout_seconds=float(vote.get("voter_timeout_seconds", 180.0)),
         ),
         autopilot=AutopilotConfig(
             enabled=bool(autopilot.get("enabled", False)),
@@ -115,12 +179,139 @@ def load_runtime(path: Path | None = None) -> RuntimeMode:
         docker_required=bool(system.get("docker_required", True)),
         boss_id=str(system.get("boss_id", "boss")),
         worker_pool_size=int(system.get("worker_pool_size", 5)),
+        worker_pool_max=int(system.get("worker_pool_max", 0)),
+        watch_queue_max=int(system.get("watch_queue_max", 200)),
+        watch_queue_policy=str(system.get("watch_queue_policy", "coalesce")),
+        chain_pool_size=int(system.get("chain_pool_size", 8)),
+        chain_worker_pool_size=int(system.get("chain_worker_pool_size", 4)),
         use_worker_container=bool(system.get("use_worker_container", True)),
         worker_image_build=str(system.get("worker_image_build", "auto")),
         input_postprocess=str(system.get("input_postprocess", "keep")),
+        input_dedup=bool(system.get("input_dedup", True)),
         compress=PromptCompression(
             enabled=bool(system.get("compress", {}).get("enabled", True)),
             max_chars_default=int(system.get("compress", {}).get("max_chars_default", 2500)),
             max_chars_vote=int(system.get("compress", {}).get("max_chars_vote", 3500)),
         ),
+        llm_cache=LLMCacheConfig(
+            enabled=bool(system.get("llm_cache", {}).get("enabled", False)),
+            ttl_seconds=float(system.get("llm_cache", {}).get("ttl_seconds", 86400.0)),
+            max_mb=float(system.get("llm_cache", {}).get("max_mb", 64.0)),
+        ),
+        events=EventLogConfig(
+            max_mb=float(system.get("events", {}).get("max_mb", 5.0)),
+            backups=int(system.get("events", {}).get("backups", 3)),
+            flush_seconds=float(system.get("events", {}).get("flush_seconds", 0.5)),
+            jsonl=bool(system.get("events", {}).get("jsonl", False)),
+        ),
+        scheduler=SchedulerConfig(
+            aging_seconds=float(system.get("scheduler", {}).get("aging_seconds", 120.0)),
+            source_priority={
+                str(k): int(v)
+                for k, v in (
+                    system.get("scheduler", {}).get("source_priority", {"secretary": 2}) or {}
+                ).items()
+            },
+            project_weights={
+                str(k): float(v)
+                for k, v in (system.get("scheduler", {}).get("project_weights", {}) or {}).items()
+            },
+        ),
+        mailbox=MailboxConfig(
+            backend=str(system.get("mailbox", {}).get("backend", "markdown")),
+            visibility_seconds=float(system.get("mailbox", {}).get("visibility_seconds", 600.0)),
+            max_attempts=int(system.get("mailbox", {}).get("max_attempts", 3)),
+            retry_backoff_seconds=float(
+                system.get("mailbox", {}).get("retry_backoff_seconds", 30.0)
+            ),
+        ),
+        worktree_pool=WorktreePoolConfig(
+            size=int(system.get("worktree_pool", {}).get("size", 4)),
+            max_size=int(system.get("worktree_pool", {}).get("max_size", 16)),
+            lease_seconds=float(system.get("worktree_pool", {}).get("lease_seconds", 3600.0)),
+        ),
     )
+
+
+RuntimeListener = Callable[[RuntimeMode, RuntimeMode], None]
+
+
+class RuntimeConfigProvider:
+    """runtime.toml のキャッシュ付きローダ。
+
+    - get() は stat だけして、mtime/size が変わったときだけ再パースする
+    - 変更があれば subscribe() した listener に (old, new) を通知する
+    - 編集途中などでパースに失敗したら、直前の設定を使い続ける
+
+    返す RuntimeMode は共有オブジェクトなので書き換えないこと。
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or Path("usagi.runtime.toml")
+        self._lock = threading.Lock()
+        self._listeners: list[RuntimeListener] = []
+        self._sig: tuple[int, int] | None = None
+        self._runtime = load_runtime(self.path)
+        self._sig = self._stat()
+
+    def get(self) -> RuntimeMode:
+        sig = self._stat()
+        with self._lock:
+            if sig == self._sig:
+                return self._runtime
+            old = self._runtime
+            try:
+                new = load_runtime(self.path)
+            except Exception:
+                logging.getLogger(__name__).warning(
+                    "failed to reload %s; keeping previous runtime", self.path, exc_info=True
+                )
+                # 直るまで毎回パースし直さないよう sig は進める
+                self._sig = sig
+                return old
+            self._runtime = new
+            self._sig = sig
+            listeners = list(self._listeners) if new != old else []
+
+        for fn in listeners:
+            try:
+                fn(old, new)
+            except Exception:
+                logging.getLogger(__name__).warning("runtime listener failed", exc_info=True)
+        return new
+
+    def subscribe(self, fn: RuntimeListener) -> Callable[[], None]:
+        with self._lock:
+            self._listeners.append(fn)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                try:
+                    self._listeners.remove(fn)
+                except ValueError:
+                    pass
+
+        return unsubscribe
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+
+_providers: dict[Path, RuntimeConfigProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_runtime_provider(path: Path | None = None) -> RuntimeConfigProvider:
+    """runtime.toml ごとのプロセス共通 provider を返す。"""
+
+    p = path or Path("usagi.runtime.toml")
+    key = p.resolve()
+    with _providers_lock:
+        prov = _providers.get(key)
+        if prov is None:
+            prov = _providers[key] = RuntimeConfigProvider(p)
+        return prov
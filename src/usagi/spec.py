@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import unicodedata
 from dataclasses import dataclass, field
 
 import yaml
 
+# frontmatter の `priority:`（数値でも名前でも可）。大きいほど先に処理する
+PRIORITY_LEVELS = {"low": 0, "normal": 1, "high": 2, "urgent": 3}
+PRIORITY_NORMAL = PRIORITY_LEVELS["normal"]
+PRIORITY_MAX = PRIORITY_LEVELS["urgent"]
+
 
 @dataclass
 class Agent:
@@ -14,6 +21,7 @@ class Agent:
 @dataclass
 class UsagiSpec:
     project: str = "usagi-project"
+    priority: int = PRIORITY_NORMAL
     objective: str = ""
     context: str = ""
     tasks: list[str] = field(default_factory=list)
@@ -27,6 +35,41 @@ class UsagiSpec:
     )
 
 
+def parse_priority(value: object) -> int | None:
+    """`priority:` の値を 0..PRIORITY_MAX に正規化する（解釈できなければ None）。"""
+
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int | float):
+        return max(0, min(int(value), PRIORITY_MAX))
+    return PRIORITY_LEVELS.get(str(value).strip().lower())
+
+
+def read_frontmatter(md: str) -> dict:
+    """frontmatter だけを読む（壊れていれば空）。"""
+
+    frontmatter, _body = _extract_frontmatter(md)
+    if not frontmatter:
+        return {}
+    try:
+        front = yaml.safe_load(frontmatter)
+    except yaml.YAMLError:
+        return {}
+    return front if isinstance(front, dict) else {}
+
+
+def spec_digest(md: str) -> str:
+    """spec の内容ハッシュ（BLAKE2b）。
+
+    改行コード・行末空白・前後の空行・Unicode 正規化の違いは同じ内容とみなす。
+    """
+
+    text = unicodedata.normalize("NFC", md.replace("\r\n", "\n").replace("\r", "\n"))
+    lines = [line.rstrip() for line in text.split("\n")]
+    normalized = "\n".join(lines).strip("\n")
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
 def parse_spec_markdown(md: str) -> UsagiSpec:
     frontmatter, body = _extract_frontmatter(md)
     front: dict = yaml.safe_load(frontmatter) if frontmatter else {}
@@ -37,9 +80,11 @@ def parse_spec_markdown(md: str) -> UsagiSpec:
     constraints = _pick_bullets(body, ["制約", "Constraints"])
 
     project = str(front.get("project", "usagi-project"))
+    priority = parse_priority(front.get("priority"))
 
     return UsagiSpec(
         project=project,
+        priority=PRIORITY_NORMAL if priority is None else priority,
         objective=objective,
         context=context,
         tasks=tasks,
@@ -12,19 +12,14 @@ from __future__ import annotations
 
 import shutil
 import subprocess
-import time
 from pathlib import Path
 
+from usagi.events import emit_event
 from usagi.runtime import RuntimeMode
 
 
 def _event(event_log_path: Path | None, msg: str) -> None:
-    if event_log_path is None:
-        return
-    event_log_path.parent.mkdir(parents=True, exist_ok=True)
-    ts = time.strftime("%Y-%m-%d %H:%M:%S")
-    with event_log_path.open("a", encoding="utf-8") as f:
-        f.write(f"[{ts}] {msg}\n")
+    emit_event(event_log_path, msg, kind="startup_check")
 
 
 def _check_codex_cli(event_log_path: Path | None) -> bool:
@@ -2,15 +2,26 @@
 
 - `.usagi/status.json` に状態を保存
 - watch/autopilot が更新し、CLI `usagi status` が表示する
+
+プロセス内の更新は `StatusRegistry`（`get_status_registry()`）を通す。
+- メモリ上で更新し、status.json へは短いタイマーでまとめて atomic に書く
+- 変更通知（subscribe）で TUI がファイルをポーリングせずに済む
 """
 
 from __future__ import annotations
 
+import atexit
+import copy
 import json
+import os
+import threading
 import time
+from collections.abc import Callable
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
 
+from usagi.events import emit_event
+
 _WARNED_CORRUPT_STATUS: set[Path] = set()
 
 
@@ -45,15 +56,12 @@ def _warn_corrupt_status(path: Path, *, reason: str) -> None:
         return
     _WARNED_CORRUPT_STATUS.add(path)
 
-    try:
-        event_log_path = path.parent / "events.log"
-        event_log_path.parent.mkdir(parents=True, exist_ok=True)
-        ts = time.strftime("%Y-%m-%d %H:%M:%S")
-        with event_log_path.open("a", encoding="utf-8") as f:
-            f.write(f"[{ts}] WARN: status.json is invalid; using empty status ({reason})\n")
-    except Exception:
-        # best-effort only
-        return
+    # emit_event is best-effort only
+    emit_event(
+        path.parent / "events.log",
+        f"WARN: status.json is invalid; using empty status ({reason})",
+        kind="warn",
+    )
 
 
 def load_status(path: Path) -> SystemStatus:
@@ -85,4 +93,168 @@ def load_status(path: Path) -> SystemStatus:
 def save_status(path: Path, st: SystemStatus) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     raw = {"agents": {k: asdict(v) for k, v in st.agents.items()}}
-    path.write_text(json.dumps(raw, ensure_ascii=False, indent=2), encoding="utf-8")
+    # 読み手(TUI/CLI)が書きかけを読まないよう tmp -> rename
+    tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(raw, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+StatusListener = Callable[[SystemStatus], None]
+
+
+class StatusRegistry:
+    """status.json のプロセス内レジストリ。
+
+    - set() はメモリ更新だけ（load/save の往復をしない）
+    - 変更があれば flush_seconds 後にまとめて1回書く
+    - agent ごとのロックで、同じ agent の状態遷移を直列化する
+    - 自分が書いていない間に status.json が外部で更新されたら読み直す
+    """
+
+    def __init__(self, path: Path, *, flush_seconds: float = 0.2) -> None:
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self._lock = threading.RLock()
+        self._agent_locks: dict[str, threading.Lock] = {}
+        self._listeners: list[StatusListener] = []
+        self._timer: threading.Timer | None = None
+        self._dirty = False
+        self._status = SystemStatus()
+        self._sig: tuple[int, int] | None = None
+        self._reload()
+
+    def agent_lock(self, agent_id: str) -> threading.Lock:
+        with self._lock:
+            lock = self._agent_locks.get(agent_id)
+            if lock is None:
+                lock = self._agent_locks[agent_id] = threading.Lock()
+            return lock
+
+    def set(self, s: AgentStatus) -> None:
+        with self.agent_lock(s.agent_id):
+            with self._lock:
+                self._maybe_reload()
+                self._status.set(s)
+                self._dirty = True
+                self._schedule_flush()
+                snap = self._snapshot()
+            self._notify(snap)
+
+    def update(self, agent_id: str, name: str, state: str, task: str = "") -> None:
+        self.set(AgentStatus(agent_id=agent_id, name=name, state=state, task=task))
+
+    def get(self, agent_id: str) -> AgentStatus | None:
+        return self.snapshot().agents.get(agent_id)
+
+    def snapshot(self) -> SystemStatus:
+        with self._lock:
+            reloaded = self._maybe_reload()
+            snap = self._snapshot()
+        if reloaded:
+            self._notify(snap)
+        return snap
+
+    def subscribe(self, fn: StatusListener) -> Callable[[], None]:
+        """変更時に呼ばれる listener を登録する。戻り値で解除できる。"""
+
+        with self._lock:
+            self._listeners.append(fn)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                try:
+                    self._listeners.remove(fn)
+                except ValueError:
+                    pass
+
+        return unsubscribe
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            try:
+                save_status(self.path, self._status)
+            except OSError:
+                # best-effort: 次の set で再挑戦する
+                return
+            self._dirty = False
+            self._sig = _file_sig(self.path)
+
+    # ---- internal ----
+
+    def _snapshot(self) -> SystemStatus:
+        return SystemStatus(agents={k: copy.copy(v) for k, v in self._status.agents.items()})
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            return
+        t = threading.Timer(self.flush_seconds, self.flush)
+        t.daemon = True
+        self._timer = t
+        t.start()
+
+    def _reload(self) -> None:
+        self._status = load_status(self.path)
+        self._sig = _file_sig(self.path)
+
+    def _maybe_reload(self) -> bool:
+        # 未書き込みの変更がある間はメモリ側を正とする
+        if self._dirty or _file_sig(self.path) == self._sig:
+            return False
+        self._reload()
+        return True
+
+    def _notify(self, snap: SystemStatus) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for fn in listeners:
+            try:
+                fn(snap)
+            except Exception:
+                # listener の失敗で更新側を止めない
+                pass
+
+
+def _file_sig(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+_registries: dict[Path, StatusRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_status_registry(path: Path) -> StatusRegistry:
+    """status.json ごとのプロセス共通レジストリを返す。"""
+
+    key = path.resolve()
+    with _registries_lock:
+        reg = _registries.get(key)
+        if reg is None:
+            reg = _registries[key] = StatusRegistry(path)
+        return reg
+
+
+def set_agent_status(
+    status_path: Path | None, agent_id: str, name: str, state: str, task: str = ""
+) -> None:
+    """status_path が None なら何もしない（テスト/ヘッドレス用）。"""
+
+    if status_path is None:
+        return
+    get_status_registry(status_path).update(agent_id, name, state, task)
+
+
+@atexit.register
+def flush_status_registries() -> None:
+    with _registries_lock:
+        regs = list(_registries.values())
+    for reg in regs:
+        reg.flush()
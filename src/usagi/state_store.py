@@ -0,0 +1,199 @@
+"""watch の処理済み状態ストア（snapshot + append-only journal）。
+
+- `state.json`: snapshot（`{input path: {"mtime_ns": ..., "size": ..., "hash": ...}}`）
+- `state.json.journal`: 1行1更新の JSON Lines（追記のみ）
+
+1入力ごとの記録は journal への1行追記だけ（O(1)）。
+journal が一定行数を超えたら snapshot を tmp に書いて atomic rename し、journal を空にする。
+
+同一プロセス内の WatchWorker 群から共有されるため、操作はロックで直列化する。
+TUI など読み取り側は `refresh()` で journal の追記分だけを読む。
+
+互換:
+- 旧形式（`{path: mtime_ns}` の int 値）の state.json もそのまま読める。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class StateStore:
+    def __init__(self, path: Path, *, compact_every: int = 500) -> None:
+        self.path = path
+        self.journal_path = path.with_name(path.name + ".journal")
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._data: dict[str, dict] = {}
+        # content hash -> 最後にその内容を処理した path
+        self._by_hash: dict[str, str] = {}
+        self._pending: list[tuple[str, dict]] = []
+        self._journal_lines = 0
+        self._journal_offset = 0
+        self._journal_ino: int | None = None
+        self._snapshot_sig: tuple[int, int] | None = None
+        self.load()
+
+    # ---- read ----
+
+    def load(self) -> None:
+        with self._lock:
+            self._data = {}
+            self._by_hash = {}
+            self._snapshot_sig = self._sig(self.path)
+            if self.path.exists():
+                raw = json.loads(self.path.read_text(encoding="utf-8") or "{}")
+                for k, v in raw.items():
+                    self._data[k] = _entry(v)
+                    self._index(k, self._data[k])
+            self._journal_offset = 0
+            self._journal_lines = 0
+            self._journal_ino = None
+            self._read_journal()
+
+    def refresh(self) -> bool:
+        """他プロセス/他インスタンスの更新を取り込む。変化があれば True。"""
+
+        with self._lock:
+            if self._sig(self.path) != self._snapshot_sig:
+                # compaction された
+                self.load()
+                return True
+            try:
+                st = self.journal_path.stat()
+            except FileNotFoundError:
+                return False
+            if st.st_ino != self._journal_ino or st.st_size < self._journal_offset:
+                self.load()
+                return True
+            if st.st_size == self._journal_offset:
+                return False
+            return self._read_journal() > 0
+
+    def last_mtime_ns(self, p: Path) -> int:
+        with self._lock:
+            return int(self._data.get(str(p), {}).get("mtime_ns", 0))
+
+    def entry(self, p: Path) -> dict | None:
+        with self._lock:
+            e = self._data.get(str(p))
+            return dict(e) if e is not None else None
+
+    def find_hash(self, digest: str) -> tuple[Path, dict] | None:
+        """同じ内容ハッシュで処理済みのエントリ（別 path を含む）。"""
+
+        with self._lock:
+            key = self._by_hash.get(digest)
+            if key is None:
+                return None
+            e = self._data.get(key, {})
+            if e.get("hash") != digest:
+                return None
+            return Path(key), dict(e)
+
+    def snapshot(self) -> dict[str, dict]:
+        """全エントリのコピー（起動時スキャンで1回だけ突き合わせる用）。"""
+
+        with self._lock:
+            return {k: dict(v) for k, v in self._data.items()}
+
+    # ---- write ----
+
+    def set_mtime_ns(self, p: Path, mtime_ns: int) -> None:
+        self.update(p, mtime_ns=int(mtime_ns))
+
+    def update(self, p: Path, **fields: object) -> None:
+        """エントリを部分更新する（save() で journal に追記される）。"""
+
+        key = str(p)
+        with self._lock:
+            e = dict(self._data.get(key, {}))
+            e.update(fields)
+            self._data[key] = e
+            self._index(key, e)
+            self._pending.append((key, fields))
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            lines = "".join(
+                json.dumps({"p": k, "e": e}, ensure_ascii=False) + "\n" for k, e in self._pending
+            )
+            with self.journal_path.open("a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                self._journal_offset = f.tell()
+            self._journal_ino = self.journal_path.stat().st_ino
+            self._journal_lines += len(self._pending)
+            self._pending = []
+            if self._journal_lines >= self.compact_every:
+                self.compact()
+
+    def compact(self) -> None:
+        """snapshot を書き直して journal を空にする。"""
+
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(self._data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self.journal_path.write_text("", encoding="utf-8")
+            self._snapshot_sig = self._sig(self.path)
+            self._journal_ino = self.journal_path.stat().st_ino
+            self._journal_offset = 0
+            self._journal_lines = 0
+
+    # ---- internal ----
+
+    def _read_journal(self) -> int:
+        try:
+            with self.journal_path.open("rb") as f:
+                self._journal_ino = os.fstat(f.fileno()).st_ino
+                f.seek(self._journal_offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return 0
+
+        # 書きかけの最終行は次回に回す
+        end = chunk.rfind(b"\n") + 1
+        n = 0
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            key = str(rec.get("p", ""))
+            e = self._data.setdefault(key, {})
+            e.update(rec.get("e", {}))
+            self._index(key, e)
+            n += 1
+        self._journal_offset += end
+        self._journal_lines += n
+        return n
+
+    def _index(self, key: str, e: dict) -> None:
+        digest = e.get("hash")
+        if digest:
+            self._by_hash[str(digest)] = key
+
+    @staticmethod
+    def _sig(p: Path) -> tuple[int, int] | None:
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+
+def _entry(v: object) -> dict:
+    if isinstance(v, dict):
+        return dict(v)
+    # 旧形式: path -> mtime_ns
+    return {"mtime_ns": int(v)}  # type: ignore[arg-type]
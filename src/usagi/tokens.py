@@ -7,12 +7,19 @@
 3. TOMLの tokens セクション(キーファイルパス指定)
 
 トークンはメモリ上でのみ保持し、ログやレポートには絶対に出力しない。
+
+流量制限（任意）:
+- `[tokens] rpm_limit / tpm_limit` でキーごとの requests/min, tokens/min を指定
+- OpenAI backend は `get_token_pool()` からキーを借りて、429/401 を報告する
 """
 
 from __future__ import annotations
 
-import itertools
 import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -22,18 +29,70 @@ except ModuleNotFoundError:
     import tomli as tomllib  # type: ignore[no-redef]
 
 
+@dataclass
+class _KeyState:
+    """APIキー1本ぶんの流量/健康状態（トークン本体は repr に出さない）。"""
+
+    key: str = field(repr=False)
+    req_bucket: float = 0.0
+    tok_bucket: float = 0.0
+    refilled_at: float = field(default_factory=time.monotonic)
+    cooldown_until: float = 0.0
+    inflight: int = 0
+    last_status: int | None = None
+
+
+@dataclass
+class TokenLease:
+    """acquire() で借りたキー。終わったら report() で結果を返す。"""
+
+    pool: TokenPool = field(repr=False)
+    key: str = field(repr=False)
+    est_tokens: int = 0
+    _done: bool = field(default=False, init=False, repr=False)
+
+    def report(
+        self,
+        *,
+        status_code: int | None = None,
+        tokens_used: int = 0,
+        retry_after: float | None = None,
+    ) -> None:
+        if self._done:
+            return
+        self._done = True
+        self.pool.release(
+            self.key,
+            status_code=status_code,
+            tokens_used=tokens_used,
+            est_tokens=self.est_tokens,
+            retry_after=retry_after,
+        )
+
+
 @dataclass
 class TokenPool:
-    """複数APIキーをラウンドロビンで返すプール。"""
+    """複数APIキーを流量と健康状態を見ながら配るプール（スレッドセーフ）。
+
+    - キーごとに requests/min と tokens/min のトークンバケットを持つ（0 は無制限）
+    - 429 を受けたキーは cooldown_seconds 休ませる（Retry-After があればそれに従う）
+    - 401/403 を受けたキーは auth_cooldown_seconds 休ませる（失効キーを配り続けない）
+    - 使えるキーの中から、処理中リクエスト数が最も少ないキーを選ぶ
+    """
 
     _keys: list[str] = field(default_factory=list, repr=False)
-    _cycle: itertools.cycle | None = field(  # type: ignore[type-arg]
-        default=None, init=False, repr=False
-    )
+    rpm_limit: int = 0
+    tpm_limit: int = 0
+    cooldown_seconds: float = 60.0
+    auth_cooldown_seconds: float = 600.0
+    _states: list[_KeyState] = field(default_factory=list, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
     def __post_init__(self) -> None:
-        if self._keys:
-            self._cycle = itertools.cycle(self._keys)
+        self._states = [
+            _KeyState(key=k, req_bucket=float(self.rpm_limit), tok_bucket=float(self.tpm_limit))
+            for k in self._keys
+        ]
 
     @property
     def available(self) -> bool:
@@ -44,15 +103,141 @@ class TokenPool:
         return len(self._keys)
 
     def next_key(self) -> str:
-        """次のAPIキーを返す。なければエラー。"""
-        if not self._cycle:
+        """次のAPIキーを返す。なければエラー。
+
+        結果を報告しない呼び出し向け（inflight は数えない）。
+        """
+        lease = self.acquire()
+        lease.report()
+        return lease.key
+
+    def acquire(self, *, est_tokens: int = 0, timeout: float | None = None) -> TokenLease:
+        """使えるキーを1本借りる。全キーが制限中なら空くまで待つ。"""
+
+        if not self._states:
             msg = (
                 "APIキーが設定されていません。\n"
                 "USAGI_API_KEYS または OPENAI_API_KEY 環境変数を設定するか、"
                 "TOML設定の [tokens] セクションを確認してください。"
             )
             raise RuntimeError(msg)
-        return next(self._cycle)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                best: _KeyState | None = None
+                wait = 1.0
+                for st in self._states:
+                    self._refill(st, now)
+                    ready_in = self._ready_in(st, now, est_tokens)
+                    if ready_in > 0:
+                        wait = min(wait, ready_in)
+                        continue
+                    if best is None or (st.inflight, -st.req_bucket) < (
+                        best.inflight,
+                        -best.req_bucket,
+                    ):
+                        best = st
+                if best is not None:
+                    if self.rpm_limit:
+                        best.req_bucket -= 1
+                    if self.tpm_limit:
+                        best.tok_bucket -= est_tokens
+                    best.inflight += 1
+                    return TokenLease(pool=self, key=best.key, est_tokens=est_tokens)
+
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RuntimeError("利用可能なAPIキーがありません（rate limit / cooldown 中）")
+            time.sleep(max(wait, 0.01))
+
+    @contextmanager
+    def lease(self, *, est_tokens: int = 0, timeout: float | None = None) -> Iterator[TokenLease]:
+        lease = self.acquire(est_tokens=est_tokens, timeout=timeout)
+        try:
+            yield lease
+        finally:
+            lease.report()
+
+    def release(
+        self,
+        key: str,
+        *,
+        status_code: int | None = None,
+        tokens_used: int = 0,
+        est_tokens: int = 0,
+        retry_after: float | None = None,
+    ) -> None:
+        with self._lock:
+            st = next((s for s in self._states if s.key == key), None)
+            if st is None:
+                return
+            st.inflight = max(0, st.inflight - 1)
+            st.last_status = status_code
+            # 見積もりとの差分を精算
+            if self.tpm_limit and tokens_used:
+                st.tok_bucket -= tokens_used - est_tokens
+            now = time.monotonic()
+            if status_code == 429:
+                st.cooldown_until = now + (retry_after or self.cooldown_seconds)
+            elif status_code in {401, 403}:
+                st.cooldown_until = now + self.auth_cooldown_seconds
+
+    def health(self) -> list[dict[str, object]]:
+        """キーごとの状態（キー本体は含めない）。"""
+
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    "index": i,
+                    "inflight": st.inflight,
+                    "cooldown_seconds": max(0.0, st.cooldown_until - now),
+                    "last_status": st.last_status,
+                }
+                for i, st in enumerate(self._states)
+            ]
+
+    def _refill(self, st: _KeyState, now: float) -> None:
+        elapsed = now - st.refilled_at
+        st.refilled_at = now
+        if self.rpm_limit:
+            st.req_bucket = min(self.rpm_limit, st.req_bucket + elapsed * self.rpm_limit / 60.0)
+        if self.tpm_limit:
+            st.tok_bucket = min(self.tpm_limit, st.tok_bucket + elapsed * self.tpm_limit / 60.0)
+
+    def _ready_in(self, st: _KeyState, now: float, est_tokens: int) -> float:
+        """このキーが使えるまでの秒数（0 なら今すぐ使える）。"""
+
+        ready = max(0.0, st.cooldown_until - now)
+        if self.rpm_limit and st.req_bucket < 1:
+            ready = max(ready, (1 - st.req_bucket) * 60.0 / self.rpm_limit)
+        if self.tpm_limit and est_tokens and st.tok_bucket < est_tokens:
+            need = min(est_tokens, self.tpm_limit) - st.tok_bucket
+            ready = max(ready, need * 60.0 / self.tpm_limit)
+        return ready
+
+
+_shared_pool: TokenPool | None = None
+_shared_lock = threading.Lock()
+
+
+def set_token_pool(pool: TokenPool | None) -> None:
+    """プロセス全体で使うプールを差し替える（watch 起動時/テスト用）。"""
+
+    global _shared_pool
+    with _shared_lock:
+        _shared_pool = pool
+
+
+def get_token_pool() -> TokenPool:
+    """プロセス全体で共有するプール（未設定なら環境変数から作る）。"""
+
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = load_tokens(None)
+        return _shared_pool
 
 
 def load_tokens(
@@ -60,6 +245,7 @@ def load_tokens(
 ) -> TokenPool:
     """トークンを読み込んでプールを作る。"""
     keys: list[str] = []
+    limits: dict = {}
 
     # 1. USAGI_API_KEYS (カンマ区切り)
     env_keys = os.environ.get("USAGI_API_KEYS", "")
@@ -79,6 +265,7 @@ def load_tokens(
             toml_path.read_text(encoding="utf-8")
         )
         tokens_section = raw.get("tokens", {})
+        limits = tokens_section
 
         # key_files: トークンファイルのリスト
         for kf in tokens_section.get("key_files", []):
@@ -95,4 +282,10 @@ def load_tokens(
             if k and k not in keys:
                 keys.append(k)
 
-    return TokenPool(_keys=keys)
+    return TokenPool(
+        _keys=keys,
+        rpm_limit=int(limits.get("rpm_limit", 0)),
+        tpm_limit=int(limits.get("tpm_limit", 0)),
+        cooldown_seconds=float(limits.get("cooldown_seconds", 60.0)),
+        auth_cooldown_seconds=float(limits.get("auth_cooldown_seconds", 600.0)),
+    )
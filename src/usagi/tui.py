@@ -11,21 +11,24 @@
 
 from __future__ import annotations
 
-import json
 import threading
 import time
+from collections.abc import Callable
 from pathlib import Path
 
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, VerticalScroll
+from textual.css.query import NoMatches
 from textual.widgets import Button, Footer, Header, Input, ListItem, ListView, Static
 
 from usagi.autopilot import clear_stop, request_stop, stop_requested
 from usagi.boss_inbox import BossInput, write_boss_input
 from usagi.demo import DemoConfig, run_demo_forever
 from usagi.display import display_name
+from usagi.events import emit_event, events_path
+from usagi.log_tail import LogTail
 from usagi.logging_setup import setup_logging
-from usagi.org import load_org
+from usagi.org import load_org_cached
 from usagi.secretary import (
     SecretaryAgent,
     SecretaryConfig,
@@ -34,7 +37,8 @@ from usagi.secretary import (
     place_input_for_boss,
     secretary_log_path,
 )
-from usagi.state import load_status
+from usagi.state import SystemStatus, get_status_registry, set_agent_status
+from usagi.state_store import StateStore
 from usagi.watch import watch_inputs
 
 
@@ -147,19 +151,44 @@ def _focused_window_label(focused: object | None) -> str:
     return focused.__class__.__name__
 
 
-# NOTE: 状態表示は組織図に統合したため、専用ウィンドウは廃止。
-class _EventsBox(Static):
-    def update_text(self, log_path: Path, max_lines: int = 21) -> None:
-        if not log_path.exists():
-            self.update("(no events yet)")
-            return
+class _TailBox(Static):
+    """ログ末尾の表示。LogTail で追記分だけ読み、変化がなければ再描画しない。"""
+
+    EMPTY_TEXT = "(empty)"
+    ERROR_TEXT = "(failed to read log)"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._tail: LogTail | None = None
+        self._shown: str | None = None
+
+    def show_tail(self, log_path: Path, max_lines: int) -> None:
+        if self._tail is None or self._tail.path != log_path:
+            self._tail = LogTail(log_path, max_lines=max(200, max_lines))
+            self._shown = None
         try:
-            lines = log_path.read_text(encoding="utf-8").splitlines()
+            changed = self._tail.poll()
         except Exception:
-            self.update("(failed to read events)")
+            self._show(self.ERROR_TEXT)
             return
-        tail = lines[-max_lines:]
-        self.update("\n".join(tail) if tail else "(no events yet)")
+        if not changed and self._shown is not None:
+            return
+        tail = self._tail.tail(max_lines)
+        self._show("\n".join(tail) if tail else self.EMPTY_TEXT)
+
+    def _show(self, text: str) -> None:
+        if text != self._shown:
+            self._shown = text
+            self.update(text)
+
+
+# NOTE: 状態表示は組織図に統合したため、専用ウィンドウは廃止。
+class _EventsBox(_TailBox):
+    EMPTY_TEXT = "(no events yet)"
+    ERROR_TEXT = "(failed to read events)"
+
+    def update_text(self, log_path: Path, max_lines: int = 21) -> None:
+        self.show_tail(log_path, max_lines)
 
 
 class _InputsBox(ListView):
@@ -174,6 +203,8 @@ class _InputsBox(ListView):
         self.state_path = state_path
         self.max_items = max_items
         self._paths: list[Path] = []
+        # state.json(+journal) は追記分だけ読む（全体の JSON parse を毎回しない）
+        self._state: StateStore | None = None
         # 画面のフラッシュを避けるため、同一内容なら再描画しない
         # signature: [(relative_name, done_flag)]
         self._last_signature: list[tuple[str, bool]] | None = None
@@ -199,12 +230,14 @@ class _InputsBox(ListView):
         state_path = self.state_path
         inputs_dir.mkdir(parents=True, exist_ok=True)
 
-        state: dict[str, int] = {}
-        if state_path.exists():
-            try:
-                state = json.loads(state_path.read_text(encoding="utf-8"))
-            except Exception:
-                state = {}
+        try:
+            if self._state is None:
+                self._state = StateStore(state_path)
+            else:
+                self._state.refresh()
+        except Exception:
+            self._state = None
+        state = self._state
 
         items: list[tuple[Path, int]] = []
         for p in sorted(inputs_dir.glob("**/*.md")):
@@ -230,7 +263,7 @@ class _InputsBox(ListView):
             rows = ["(no inputs)"]
         else:
             for p, mtime_ns in items:
-                last = int(state.get(str(p), 0))
+                last = state.last_mtime_ns(p) if state is not None else 0
                 done = last >= mtime_ns
                 if not done:
                     pending += 1
@@ -276,50 +309,75 @@ class _InputsBox(ListView):
             self.index = 0
 
 
-class _BossChatBox(Static):
+class _BossChatBox(_TailBox):
+    EMPTY_TEXT = "(no messages)"
+    ERROR_TEXT = "(failed to read chat log)"
+
     def update_text(self, log_path: Path, max_lines: int = 25) -> None:
-        if not log_path.exists():
-            self.update("(no messages)")
-            return
-        try:
-            lines = log_path.read_text(encoding="utf-8").splitlines()
-        except Exception:
-            self.update("(failed to read chat log)")
-            return
-        tail = lines[-max_lines:]
-        self.update("\n".join(tail) if tail else "(no messages)")
+        self.show_tail(log_path, max_lines)
+
 
+class _SecretaryChatBox(_TailBox):
+    EMPTY_TEXT = "(秘書ログなし)"
+    ERROR_TEXT = "(failed to read secretary log)"
 
-class _SecretaryChatBox(Static):
     def update_text(self, root: Path, max_lines: int = 25) -> None:
-        log_path = secretary_log_path(root)
-        if not log_path.exists():
-            self.update("(秘書ログなし)")
-            return
-        try:
-            lines = log_path.read_text(encoding="utf-8").splitlines()
-        except Exception:
-            self.update("(failed to read secretary log)")
-            return
-        tail = lines[-max_lines:]
-        self.update("\n".join(tail) if tail else "(秘書ログなし)")
+        self.show_tail(secretary_log_path(root), max_lines)
 
 
 class _OrgBox(Static):
+    """組織図 + 稼働状況。
+
+    status は StatusRegistry の変更通知で受け取る（status.json を毎回読まない）。
+    別プロセスの watch が書いた分は、たまに snapshot() で拾う。
+    """
+
+    RESYNC_EVERY = 10
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._status_path: Path | None = None
+        self._status: SystemStatus | None = None
+        self._unsubscribe: Callable[[], None] | None = None
+        self._ticks = 0
+
+    def _on_status(self, st: SystemStatus) -> None:
+        # 更新スレッドから呼ばれる。参照の差し替えだけなので lock 不要
+        self._status = st
+
+    def _current_status(self, status_path: Path) -> SystemStatus:
+        reg = get_status_registry(status_path)
+        if self._status_path != status_path:
+            if self._unsubscribe is not None:
+                self._unsubscribe()
+            self._status_path = status_path
+            self._unsubscribe = reg.subscribe(self._on_status)
+            self._status = None
+
+        self._ticks += 1
+        if self._status is None or self._ticks % self.RESYNC_EVERY == 0:
+            self._status = reg.snapshot()
+        return self._status
+
+    def on_unmount(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
     def update_text(self, org_path: Path, status_path: Path, *, blink: bool = False) -> None:
         if not org_path.exists():
             self.update("(no org.toml)")
             return
 
         try:
-            org = load_org(org_path)
+            org = load_org_cached(org_path)
         except Exception:
             self.update("(failed to load org.toml)")
             return
 
-        st = load_status(status_path)
+        st = self._current_status(status_path)
 
-        roots = [a for a in org.agents if not a.reports_to]
+        roots = org.roots()
 
         def line_for(agent_id: str, name: str) -> str:
             a = st.agents.get(agent_id)
@@ -344,8 +402,7 @@ class _OrgBox(Static):
         def walk(agent_id: str, name: str, indent: int) -> None:
             prefix = "  " * indent
             lines.append(prefix + line_for(agent_id, name))
-            children = [a for a in org.agents if a.reports_to == agent_id]
-            for c in children:
+            for c in org.subordinates_of(agent_id):
                 walk(c.id, display_name(c), indent + 1)
 
         for r in roots:
@@ -516,7 +573,6 @@ class UsagiTui(App):
                 recursive=True,
                 org_path=self.org_path,
                 runtime_path=self.root / "usagi.runtime.toml",
-                worker_pool_size=5,
                 stop_file=self.root / ".usagi/STOP",
                 status_path=self.root / ".usagi/status.json",
                 event_log_path=self.root / ".usagi/events.log",
@@ -545,7 +601,12 @@ class UsagiTui(App):
 
     def _refresh(self) -> None:
         # mode button
-        self.query_one("#mode", Button).label = _mode_label(self.root)
+        try:
+            mode = self.query_one("#mode", Button)
+        except NoMatches:
+            # 終了処理中に interval が発火した（画面は既に外れている）
+            return
+        mode.label = _mode_label(self.root)
 
         # focus indicator (bottom bar)
         try:
@@ -570,11 +631,7 @@ class UsagiTui(App):
         # 観測用: org解決先をeventsに1回だけ書く
         if not hasattr(self, "_org_path_logged"):
             self._org_path_logged = True  # type: ignore[attr-defined]
-            events = self.root / ".usagi/events.log"
-            events.parent.mkdir(parents=True, exist_ok=True)
-            ts = time.strftime("%Y-%m-%d %H:%M:%S")
-            with events.open("a", encoding="utf-8") as f:
-                f.write(f"[{ts}] tui: org_path={org_path}\n")
+            emit_event(events_path(self.root), f"tui: org_path={org_path}")
         self.query_one(_SecretaryChatBox).update_text(self.root)
         self.query_one(_InputsBox).refresh_items()
         self.query_one(_EventsBox).update_text(self.root / ".usagi/events.log")
@@ -623,11 +680,7 @@ class UsagiTui(App):
         except Exception:
             return
 
-        events = self.root / ".usagi/events.log"
-        events.parent.mkdir(parents=True, exist_ok=True)
-        tss = time.strftime("%Y-%m-%d %H:%M:%S")
-        with events.open("a", encoding="utf-8") as f:
-            f.write(f"[{tss}] inputs: trashed {dst.name}\n")
+        emit_event(events_path(self.root), f"inputs: trashed {dst.name}")
 
         lv.refresh_items()
 
@@ -671,14 +724,15 @@ class UsagiTui(App):
         def _reply() -> None:
             # secretary is also an agent: update status + event log
             try:
-                from usagi.state import AgentStatus, load_status, save_status
-
-                st = load_status(self.root / ".usagi/status.json")
-                st.set(AgentStatus(agent_id="secretary", name="秘書クマ", state="working", task="reply"))
-                save_status(self.root / ".usagi/status.json", st)
-                ts = time.strftime("%Y-%m-%d %H:%M:%S")
-                with (self.root / ".usagi/events.log").open("a", encoding="utf-8") as f:
-                    f.write(f"[{ts}] agent: secretary state=working task=reply\n")
+                set_agent_status(
+                    self.root / ".usagi/status.json", "secretary", "秘書クマ", "working", "reply"
+                )
+                emit_event(
+                    events_path(self.root),
+                    "agent: secretary state=working task=reply",
+                    agent="secretary",
+                    kind="status",
+                )
             except Exception:
                 pass
 
@@ -690,14 +744,15 @@ class UsagiTui(App):
             append_secretary_log(self.root, who="🐻 secretary", text=reply)
 
             try:
-                from usagi.state import AgentStatus, load_status, save_status
-
-                st = load_status(self.root / ".usagi/status.json")
-                st.set(AgentStatus(agent_id="secretary", name="秘書クマ", state="idle", task=""))
-                save_status(self.root / ".usagi/status.json", st)
-                ts = time.strftime("%Y-%m-%d %H:%M:%S")
-                with (self.root / ".usagi/events.log").open("a", encoding="utf-8") as f:
-                    f.write(f"[{ts}] agent: secretary state=idle task=\n")
+                set_agent_status(
+                    self.root / ".usagi/status.json", "secretary", "秘書クマ", "idle"
+                )
+                emit_event(
+                    events_path(self.root),
+                    "agent: secretary state=idle task=",
+                    agent="secretary",
+                    kind="status",
+                )
             except Exception:
                 pass
 
@@ -720,14 +775,19 @@ class UsagiTui(App):
         # AI で要約してから submit（別スレッドでブロッキング回避）
         def _summarize_and_submit() -> None:
             try:
-                from usagi.state import AgentStatus, load_status, save_status
-
-                st = load_status(self.root / ".usagi/status.json")
-                st.set(AgentStatus(agent_id="secretary", name="秘書クマ", state="working", task="summarize"))
-                save_status(self.root / ".usagi/status.json", st)
-                ts0 = time.strftime("%Y-%m-%d %H:%M:%S")
-                with (self.root / ".usagi/events.log").open("a", encoding="utf-8") as f:
-                    f.write(f"[{ts0}] agent: secretary state=working task=summarize\n")
+                set_agent_status(
+                    self.root / ".usagi/status.json",
+                    "secretary",
+                    "秘書クマ",
+                    "working",
+                    "summarize",
+                )
+                emit_event(
+                    events_path(self.root),
+                    "agent: secretary state=working task=summarize",
+                    agent="secretary",
+                    kind="status",
+                )
             except Exception:
                 pass
 
@@ -760,20 +820,17 @@ class UsagiTui(App):
                     f.write(line + "\n")
             log.write_text("", encoding="utf-8")
 
-            events = self.root / ".usagi/events.log"
-            events.parent.mkdir(parents=True, exist_ok=True)
-            with events.open("a", encoding="utf-8") as f:
-                f.write(f"[{ts}] secretary: placed input {p.relative_to(self.root)}\n")
-                f.write(f"[{ts}] secretary: archived+cleared chat\n")
+            events = events_path(self.root)
+            emit_event(events, f"secretary: placed input {p.relative_to(self.root)}")
+            emit_event(events, "secretary: archived+cleared chat")
 
             try:
-                from usagi.state import AgentStatus, load_status, save_status
-
-                st = load_status(self.root / ".usagi/status.json")
-                st.set(AgentStatus(agent_id="secretary", name="秘書クマ", state="idle", task=""))
-                save_status(self.root / ".usagi/status.json", st)
-                with events.open("a", encoding="utf-8") as f:
-                    f.write(f"[{ts}] agent: secretary state=idle task=\n")
+                set_agent_status(
+                    self.root / ".usagi/status.json", "secretary", "秘書クマ", "idle"
+                )
+                emit_event(
+                    events, "agent: secretary state=idle task=", agent="secretary", kind="status"
+                )
             except Exception:
                 pass
 
@@ -2,8 +2,8 @@
 
 - inputs_dir 配下に .md が追加/更新されたらジョブキューに投入
 - デバウンスで保存連打を1回にまとめる
-- 逐次ワーカーが処理して outputs_dir にレポートを書き出す
-- state.json に最終処理mtimeを保存して二重処理を防ぐ
+- ワーカープール（usagi.job_queue）が処理して outputs_dir にレポートを書き出す
+- state.json（+ journal）に最終処理mtimeを保存して二重処理を防ぐ（usagi.state_store）
 
 CIではinotify実機がない想定なので、Observer起動部分は薄くし、
 ロジック（デバウンス/worker/state）はユニットテストで担保する。
@@ -11,62 +11,53 @@ CIではinotify実機がない想定なので、Observer起動部分は薄くし
 
 from __future__ import annotations
 
+import heapq
 import json
+import os
 import queue
 import threading
 import time
-from dataclasses import dataclass
+from collections.abc import Callable
+from functools import partial
 from pathlib import Path
 
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
 from usagi.announce import announce
-from usagi.agent_chain import boss_handle_spec, lead_tick, manager_tick, worker_tick
+from usagi.agent_chain import boss_handle_spec
+from usagi.agent_dispatch import TickContext, dispatch_agents, dispatch_tick
 from usagi.boss_tick import boss_tick
-from usagi.peer_assist import assist_tick
 from usagi.boss_autopick import boss_autopick
+from usagi.events import emit_event, events_path, start_event_sink
+from usagi.input_scan import is_changed, scan_changed
+from usagi.job_queue import JobQueue, WatchJob, WatchPool
+from usagi.llm_cache import configure_llm_cache, get_llm_cache
+from usagi.mailbox import configure_mailbox, subscribe_deliveries
+from usagi.mailbox_dispatch import AgentLanes, MailboxDispatcher, agents_dir
 from usagi.approval_pipeline import run_approval_pipeline
-from usagi.org import load_org
-from usagi.runtime import load_runtime
-from usagi.spec import parse_spec_markdown
-from usagi.state import AgentStatus, load_status, save_status
+from usagi.org import ROLE_WORKER, load_org_cached
+from usagi.runtime import get_runtime_provider
+from usagi.spec import parse_spec_markdown, spec_digest
+from usagi.state import flush_status_registries, get_status_registry, set_agent_status
+from usagi.state_store import StateStore
+from usagi.tokens import load_tokens, set_token_pool
 from usagi.validate import validate_spec
+from usagi.worktree_pool import WorktreePool, get_worktree_pool
 from usagi.report_state import update_boss_report
 
 
-@dataclass
-class WatchJob:
-    path: Path
-
-
-class StateStore:
-    def __init__(self, path: Path) -> None:
-        self.path = path
-        self._data: dict[str, int] = {}
-        self.load()
-
-    def load(self) -> None:
-        if not self.path.exists():
-            self._data = {}
-            return
-        self._data = json.loads(self.path.read_text(encoding="utf-8"))
-
-    def save(self) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.path.write_text(json.dumps(self._data, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    def last_mtime_ns(self, p: Path) -> int:
-        return int(self._data.get(str(p), 0))
-
-    def set_mtime_ns(self, p: Path, mtime_ns: int) -> None:
-        self._data[str(p)] = int(mtime_ns)
+class DebouncedEnqueuer:
+    """path ごとに debounce してから queue に積む。
 
+    起動時スキャンで数千ファイルを一度に enqueue しても threading.Timer を
+    ファイル数だけ作らないよう、締切をヒープに持ち 1 本のスレッドで捌く。
+    再 enqueue は締切を延ばすだけ（古いヒープ要素は取り出し時に読み捨てる）。
+    """
 
-class DebouncedEnqueuer:
     def __init__(
         self,
-        q: queue.Queue[WatchJob],
+        q: queue.Queue[WatchJob] | JobQueue,
         debounce_seconds: float,
         *,
         event_log_path: Path | None = None,
@@ -74,37 +65,84 @@ class DebouncedEnqueuer:
         self.q = q
         self.debounce_seconds = debounce_seconds
         self.event_log_path = event_log_path
-        self._lock = threading.Lock()
-        self._timers: dict[str, threading.Timer] = {}
+        self._cond = threading.Condition()
+        # key -> (deadline, path, reason)。ヒープ側は (deadline, seq, key)
+        self._pending: dict[str, tuple[float, Path, str]] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._seq = 0
+        self._thread: threading.Thread | None = None
+        self._stopped = False
 
     def enqueue(self, p: Path, reason: str = "update") -> None:
         key = str(p)
-        with self._lock:
-            if key in self._timers:
-                self._timers[key].cancel()
-            t = threading.Timer(self.debounce_seconds, self._fire, args=(p, reason))
-            self._timers[key] = t
-            t.start()
+        deadline = time.monotonic() + self.debounce_seconds
+        with self._cond:
+            self._pending[key] = (deadline, p, reason)
+            self._seq += 1
+            heapq.heappush(self._heap, (deadline, self._seq, key))
+            if len(self._heap) > 2 * len(self._pending) + 64:
+                # 同じ path の連打で古い要素が溜まったら作り直す
+                self._heap = [(d, i, k) for i, (k, (d, _p, _r)) in enumerate(self._pending.items())]
+                heapq.heapify(self._heap)
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(
+                    target=self._run, daemon=True, name="usagi-debounce"
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        t = self._thread
+        if t is not None and t is not threading.current_thread():
+            t.join(timeout=2.0)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                due = self._pop_due_locked()
+                if not due:
+                    if self._stopped:
+                        return
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cond.wait(timeout)
+                    continue
+            # put は block policy だと待つことがあるので lock の外で
+            for p, reason in due:
+                self._fire(p, reason)
+
+    def _pop_due_locked(self) -> list[tuple[Path, str]]:
+        now = time.monotonic()
+        due: list[tuple[Path, str]] = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _seq, key = heapq.heappop(self._heap)
+            cur = self._pending.get(key)
+            if cur is None or cur[0] != deadline:
+                continue  # 延長済み/発火済み
+            del self._pending[key]
+            due.append((cur[1], cur[2]))
+        return due
 
     def _fire(self, p: Path, reason: str) -> None:
-        with self._lock:
-            self._timers.pop(str(p), None)
         self._event(f"queued({reason}): {p.name}")
-        self.q.put(WatchJob(path=p))
+        # JobQueue は coalesce/drop したとき False を返す（queue.Queue は None）
+        if self.q.put(WatchJob(path=p)) is False:
+            self._event(f"not queued({reason}): {p.name} (already queued or queue full)")
 
-    def _event(self, msg: str) -> None:
-        if self.event_log_path is None:
-            return
-        self.event_log_path.parent.mkdir(parents=True, exist_ok=True)
-        ts = time.strftime("%Y-%m-%d %H:%M:%S")
-        with self.event_log_path.open("a", encoding="utf-8") as f:
-            f.write(f"[{ts}] {msg}\n")
+    def _event(self, msg: str, **fields) -> None:
+        emit_event(self.event_log_path, msg, **fields)
 
 
 class WatchWorker:
     def __init__(
         self,
-        q: queue.Queue[WatchJob],
+        q: queue.Queue[WatchJob] | JobQueue,
         *,
         inputs_dir: Path,
         outputs_dir: Path,
@@ -141,6 +179,15 @@ class WatchWorker:
                 job = self.q.get(timeout=0.2)
             except queue.Empty:
                 continue
+            if job.priority is not None:
+                # JobQueue を通ったジョブだけ。優先度別の待ち時間（tail latency）を後から集計できる
+                wait = time.monotonic() - job.enqueued_at
+                self._event(
+                    f"dequeued: {job.path.name} prio={job.priority} "
+                    f"project={job.project or '-'} wait={wait:.2f}s",
+                    kind="dequeue",
+                    duration=wait,
+                )
             try:
                 try:
                     self._process(job)
@@ -164,11 +211,16 @@ class WatchWorker:
             return
 
         file_stat = p.stat()
-        prev = self.state.last_mtime_ns(p)
-        if file_stat.st_mtime_ns <= prev:
+        if not is_changed(self.state.entry(p), file_stat.st_mtime_ns, file_stat.st_size):
             return
 
         raw_text = p.read_text(encoding="utf-8")
+        digest = spec_digest(raw_text)
+        runtime = get_runtime_provider(self.runtime_path).get()
+        if runtime.input_dedup and self._dedup(p, file_stat, digest):
+            self._postprocess_input(p)
+            return
+
         try:
             spec = parse_spec_markdown(raw_text)
         except Exception:
@@ -179,8 +231,7 @@ class WatchWorker:
                 "## 元の内容\n\n```\n" + raw_text + "\n```\n"
             )
             self._write_report(p, report)
-            self.state.set_mtime_ns(p, file_stat.st_mtime_ns)
-            self.state.save()
+            self._mark_done(p, file_stat, hash=digest)
             return
 
         # 項目不足でも AI に咀嚼させるため strict=False
@@ -198,8 +249,7 @@ class WatchWorker:
                 "入力ファイルが空です。\n"
             )
             self._write_report(p, report)
-            self.state.set_mtime_ns(p, file_stat.st_mtime_ns)
-            self.state.save()
+            self._mark_done(p, file_stat, hash=digest)
             return
 
         # objective/tasks が空の場合、raw_text 全体を objective に入れる
@@ -218,13 +268,9 @@ class WatchWorker:
 
         # announce + status
         announce("社長うさぎ", f"開始: {p.name}")
-        self._event(f"開始: {p.name}")
-        if self.status_path is not None:
-            status_store = load_status(self.status_path)
-            status_store.set(
-                AgentStatus(agent_id="boss", name="社長うさぎ", state="working", task=p.name)
-            )
-            save_status(self.status_path, status_store)
+        self._event(f"開始: {p.name}", agent="boss", kind="job_start")
+        started = time.monotonic()
+        set_agent_status(self.status_path, "boss", "社長うさぎ", "working", p.name)
 
         # minimal UI for background
         class _Ui:
@@ -244,8 +290,7 @@ class WatchWorker:
                 return None
 
         org_file = self.org_path or Path("examples/org.toml")
-        runtime_file = self.runtime_path or Path("usagi.runtime.toml")
-        runtime = load_runtime(runtime_file)
+        ok = False
 
         # 意思決定者(boss/manager/lead/取締役会)はホスト側で実行。
         # workerの実装ステップだけコンテナに委譲（pipeline内部で判断）。
@@ -260,7 +305,7 @@ class WatchWorker:
                 root=self.outputs_dir.parent,
                 outputs_dir=self.outputs_dir,
                 status_path=self.status_path,
-                org=load_org(org_file),
+                org=load_org_cached(org_file),
                 runtime=runtime,
                 spec=spec,
                 model=self.model,
@@ -270,6 +315,7 @@ class WatchWorker:
                 job_id=job_id,
             )
             self._event("boss delegated")
+            ok = True
         except Exception as e:  # noqa: BLE001
             import traceback
 
@@ -288,28 +334,61 @@ class WatchWorker:
             announce("社長うさぎ", f"失敗: {p.name}")
         finally:
             announce("社長うさぎ", f"終了: {p.name}")
-            self._event(f"終了: {p.name}")
-            if self.status_path is not None:
-                status_store = load_status(self.status_path)
-                status_store.set(AgentStatus(agent_id="boss", name="社長うさぎ", state="idle", task=""))
-                save_status(self.status_path, status_store)
+            self._event(
+                f"終了: {p.name}",
+                agent="boss",
+                kind="job_end",
+                duration=time.monotonic() - started,
+            )
+            set_agent_status(self.status_path, "boss", "社長うさぎ", "idle")
 
             # mtime更新は、最後に必ず行う（st変数の上書きを避ける）
-            self.state.set_mtime_ns(p, file_stat.st_mtime_ns)
-            self.state.save()
+            # 失敗したときは hash を残さない（同じ内容の再投入/touch で再実行できるように）。
+            # update() は部分更新なので、前回成功時の hash/job_id は空で上書きして消す
+            if ok:
+                self._mark_done(p, file_stat, hash=digest, job_id=job_id)
+            else:
+                self._mark_done(p, file_stat, hash="", job_id="")
+
+        self._postprocess_input(p)
+
+    def _dedup(self, p: Path, file_stat: os.stat_result, digest: str) -> bool:
+        """内容が処理済みと同じなら記録だけ更新して True（LLM チェーンを回さない）。"""
+
+        prev = self.state.entry(p)
+        if prev is not None and prev.get("hash") == digest:
+            # touch / 変更なし保存 / git checkout
+            self._event(f"skip (内容変更なし): {p.name}", kind="dedup")
+            self._mark_done(p, file_stat)
+            return True
+
+        hit = self.state.find_hash(digest)
+        if hit is None or not hit[1].get("job_id"):
+            return False
+        src, e = hit
+        job_id = str(e["job_id"])
+        self._event(f"reuse: {p.name} = {src.name} (job_id={job_id})", kind="dedup")
+        self._write_report(
+            p,
+            "# usagi watch: 同一内容\n\n"
+            f"`{src.name}` と同じ内容のため、前回の結果（job_id={job_id}）を再利用しました。\n",
+        )
+        self._mark_done(p, file_stat, hash=digest, job_id=job_id, reused_from=str(src))
+        return True
 
+    def _postprocess_input(self, p: Path) -> None:
         # inputs の後処理
-        runtime2 = load_runtime(self.runtime_path)
-        if runtime2.input_postprocess == "trash":
+        runtime = get_runtime_provider(self.runtime_path).get()
+        if runtime.input_postprocess == "trash":
             self._trash_input(p)
 
-    def _event(self, msg: str) -> None:
-        if self.event_log_path is None:
-            return
-        self.event_log_path.parent.mkdir(parents=True, exist_ok=True)
-        ts = time.strftime("%Y-%m-%d %H:%M:%S")
-        with self.event_log_path.open("a", encoding="utf-8") as f:
-            f.write(f"[{ts}] {msg}\n")
+    def _event(self, msg: str, **fields) -> None:
+        emit_event(self.event_log_path, msg, **fields)
+
+    def _mark_done(self, p: Path, file_stat: os.stat_result, **fields: object) -> None:
+        # 起動時スキャン（input_scan）が stat だけで済むよう size も残す
+        self.state.update(p, mtime_ns=file_stat.st_mtime_ns, size=file_stat.st_size, **fields)
+        self.state.save()
 
     def _write_report(self, src: Path, report: str, *, spec=None, job_id: str = "", messages=None) -> Path:
         """outputs/report.md を更新する（社長用の状態ファイル）。"""
@@ -375,9 +454,84 @@ class _Handler(FileSystemEventHandler):
             self.enq.enqueue(Path(event.src_path), reason="modified")
 
 
-def scan_inputs(inputs_dir: Path, enq: DebouncedEnqueuer) -> None:
-    for p in inputs_dir.glob("**/*.md"):
+def _chain_handlers(
+    *,
+    root: Path,
+    outputs_dir: Path,
+    status_path: Path | None,
+    org,
+    runtime,
+    model: str,
+    offline: bool,
+    repo_root: Path,
+) -> dict[str, Callable[[], None]]:
+    """inbox の持ち主 agent id -> その inbox を処理する tick。"""
+
+    ctx = TickContext(
+        root=root,
+        status_path=status_path,
+        org=org,
+        runtime=runtime,
+        model=model,
+        offline=offline,
+        outputs_dir=outputs_dir,
+        repo_root=repo_root,
+    )
+    # role x kind の handler を持つ agent 全員に同じ dispatcher（lane ごとに並行に動く）
+    handlers: dict[str, Callable[[], None]] = {
+        a.id: partial(dispatch_tick, ctx, a.id) for a in dispatch_agents(org)
+    }
+
+    common = {"root": root, "status_path": status_path, "org": org, "runtime": runtime}
+    handlers[runtime.boss_id or "boss"] = partial(boss_tick, **common, outputs_dir=outputs_dir)
+    return handlers
+
+
+def _prewarm_worktrees(pool: WorktreePool, event_log_path: Path | None) -> None:
+    try:
+        reclaimed = pool.reclaim()
+        made = pool.prewarm()
+    except Exception as e:  # noqa: BLE001
+        emit_event(event_log_path, f"worktree pool: prewarm failed: {type(e).__name__}: {e}")
+        return
+    emit_event(event_log_path, f"worktree pool: prewarmed={made} reclaimed={reclaimed}")
+
+
+def scan_inputs(
+    inputs_dir: Path,
+    enq: DebouncedEnqueuer,
+    state: StateStore | None = None,
+    *,
+    event_log_path: Path | None = None,
+) -> None:
+    """起動時スキャン。state があれば未処理/変更ありのファイルだけ積む。"""
+
+    if state is None:
+        for p in inputs_dir.glob("**/*.md"):
+            enq.enqueue(p, reason="scan")
+        return
+
+    started = time.monotonic()
+    res = scan_changed(inputs_dir, state)
+    for p in res.changed:
         enq.enqueue(p, reason="scan")
+    emit_event(
+        event_log_path,
+        f"scan: {len(res.changed)}/{res.total} inputs changed",
+        kind="scan",
+        duration=time.monotonic() - started,
+    )
+
+
+def _write_pool_metrics(path: Path, metrics: dict) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps({"updated_at": time.time(), **metrics}), encoding="utf-8")
+        os.replace(tmp, path)
+    except Exception:
+        # best-effort
+        return
 
 
 def watch_inputs(
@@ -393,29 +547,45 @@ def watch_inputs(
     recursive: bool,
     org_path: Path | None = None,
     runtime_path: Path | None = None,
-    worker_pool_size: int = 5,
+    worker_pool_size: int | None = None,
     stop_file: Path | None = None,
     status_path: Path | None = None,
     event_log_path: Path | None = None,
+    mailbox_rescan_seconds: float = 10.0,
 ) -> None:
-    q: queue.Queue[WatchJob] = queue.Queue()
+    runtime_provider = get_runtime_provider(runtime_path)
+    runtime = runtime_provider.get()
+
+    q = JobQueue(
+        runtime.watch_queue_max,
+        policy=runtime.watch_queue_policy,
+        scheduler=runtime.scheduler,
+    )
     state = StateStore(state_path)
     enq = DebouncedEnqueuer(q, debounce_seconds=debounce_seconds, event_log_path=event_log_path)
 
-    runtime = load_runtime(runtime_path)
+    # events.log はバックグラウンド writer でまとめて書く
+    root = outputs_dir.parent
+    sinks = [start_event_sink(events_path(root), runtime.events)]
+    if event_log_path is not None:
+        sinks.append(start_event_sink(event_log_path, runtime.events))
 
     # 起動時にAPI疎通などを試す（失敗してもwatch自体は継続）
     from usagi.startup_check import run_startup_check
 
     run_startup_check(runtime=runtime, model=model, offline=offline, event_log_path=event_log_path)
 
-    pool_size = int(worker_pool_size or runtime.worker_pool_size or 5)
-    pool_size = max(1, min(pool_size, 20))
+    # LLM 応答キャッシュ（opt-in）
+    configure_llm_cache(outputs_dir.parent, runtime.llm_cache)
+
+    # APIキー（org.toml の [tokens] も含む）を worker 間で共有する
+    try:
+        set_token_pool(load_tokens(org_path))
+    except Exception:
+        pass
 
-    workers: list[WatchWorker] = []
-    threads: list[threading.Thread] = []
-    for _i in range(pool_size):
-        w = WatchWorker(
+    def new_worker() -> WatchWorker:
+        return WatchWorker(
             q,
             inputs_dir=inputs_dir,
             outputs_dir=outputs_dir,
@@ -429,31 +599,119 @@ def watch_inputs(
             status_path=status_path,
             event_log_path=event_log_path,
         )
-        workers.append(w)
-        t = threading.Thread(target=w.run_forever, daemon=True)
-        t.start()
-        threads.append(t)
+
+    # 既定は runtime の worker_pool_size（再読込時の on_runtime_change と同じ値を使う）。
+    # worker_pool_size を渡したときだけ起動時の値を上書きする
+    pool = WatchPool(
+        q,
+        new_worker,
+        size=int(worker_pool_size or runtime.worker_pool_size or 5),
+        max_size=runtime.worker_pool_max,
+    )
+    metrics_path = root / ".usagi" / "watch_pool.json"
+    last_metrics: dict | None = None
+    last_metrics_at = 0.0
+
+    def on_runtime_change(old, new) -> None:
+        # runtime.toml の編集を再起動なしで反映する
+        pool_cfg = (new.worker_pool_size, new.worker_pool_max)
+        if pool_cfg != (old.worker_pool_size, old.worker_pool_max):
+            pool.configure(size=new.worker_pool_size, max_size=new.worker_pool_max)
+            emit_event(
+                event_log_path,
+                f"runtime: worker_pool_size={new.worker_pool_size} max={new.worker_pool_max}",
+            )
+        queue_cfg = (new.watch_queue_max, new.watch_queue_policy, new.scheduler)
+        if queue_cfg != (old.watch_queue_max, old.watch_queue_policy, old.scheduler):
+            q.configure(
+                maxsize=new.watch_queue_max,
+                policy=new.watch_queue_policy,
+                scheduler=new.scheduler,
+            )
+        if new.llm_cache != old.llm_cache:
+            configure_llm_cache(outputs_dir.parent, new.llm_cache)
+        if new.events != old.events:
+            for sink in sinks:
+                start_event_sink(sink.path, new.events)
+        if new.mailbox != old.mailbox:
+            configure_mailbox(root, new.mailbox)
+            emit_event(event_log_path, f"runtime: mailbox={new.mailbox.backend}")
+        if new.compress != old.compress:
+            emit_event(event_log_path, f"runtime: compress={new.compress}")
+        if new.worktree_pool != old.worktree_pool:
+            get_worktree_pool(work_root, new.worktree_pool)
+
+    unsubscribe_runtime = runtime_provider.subscribe(on_runtime_change)
 
     inputs_dir.mkdir(parents=True, exist_ok=True)
-    scan_inputs(inputs_dir, enq)
+    scan_inputs(inputs_dir, enq, state, event_log_path=event_log_path)
 
     obs = Observer()
     obs.schedule(_Handler(enq), str(inputs_dir), recursive=recursive)
-    obs.start()
 
     # mailbox chain: repo root is the same root as inputs/outputs
-    root = outputs_dir.parent
+    dispatcher = MailboxDispatcher(root.resolve(), rescan_seconds=mailbox_rescan_seconds)
+    configure_mailbox(root, runtime.mailbox)
+    # sqlite backend はファイルが増えないので、配達を直接 dispatcher に知らせる
+    unsubscribe_mail = subscribe_deliveries(dispatcher.mark)
+    mail_dir = agents_dir(dispatcher.root)
+    mail_dir.mkdir(parents=True, exist_ok=True)
+    obs.schedule(dispatcher.event_handler(), str(mail_dir), recursive=True)
+    obs.start()
+
+    # worker の worktree を先に作っておく（job のたびに git worktree add を待たない）
+    if not offline:
+        threading.Thread(
+            target=_prewarm_worktrees,
+            args=(get_worktree_pool(work_root, runtime.worktree_pool), event_log_path),
+            daemon=True,
+            name="usagi-worktree-prewarm",
+        ).start()
+
+    # agent ごとの実行レーン（長い worker tick が boss/assist を塞がないように）
+    # worker は別枠（fan-out 直後に worker の tick が並んでも他の role のレーンを使い切らない）
+    lanes = AgentLanes(
+        max_workers=runtime.chain_pool_size,
+        pools={ROLE_WORKER: runtime.chain_worker_pool_size},
+    )
 
     try:
         while True:
             if stop_file is not None and stop_file.exists():
                 break
 
+            # inbox に何か届くまで眠る（stop_file 確認のため短い timeout で起きる）
+            pending, rescan = dispatcher.wait(timeout=0.5)
+            # stat だけ。変更があれば on_runtime_change が呼ばれる
+            runtime = runtime_provider.get()
+
+            # キュー滞留に応じて worker を増減し、状況を .usagi/watch_pool.json に出す
+            # （LLM 応答キャッシュの hit/miss も一緒に。変わったら events.log にも）
+            pool.autoscale()
+            now = time.monotonic()
+            if now - last_metrics_at >= 5.0:
+                last_metrics_at = now
+                metrics = pool.metrics()
+                cache = get_llm_cache()
+                if cache is not None:
+                    metrics["llm_cache"] = cache.stats()
+                if metrics != last_metrics:
+                    cache_stats = metrics.get("llm_cache")
+                    if cache_stats and cache_stats != (last_metrics or {}).get("llm_cache"):
+                        emit_event(
+                            event_log_path,
+                            f"llm cache: hits={cache_stats['hits']} misses={cache_stats['misses']}",
+                        )
+                    last_metrics = metrics
+                    _write_pool_metrics(metrics_path, metrics)
+
+            if not pending and not rescan:
+                continue
+
             # mailbox chain ticks (best-effort)
             try:
-                org = load_org(org_path or Path("examples/org.toml"))
-                runtime = load_runtime(runtime_path or Path("usagi.runtime.toml"))
-                manager_tick(
+                org = load_org_cached(org_path or Path("examples/org.toml"))
+                handlers = _chain_handlers(
                     root=root,
                     outputs_dir=outputs_dir,
                     status_path=status_path,
@@ -463,67 +721,15 @@ def watch_inputs(
                     offline=offline,
                     repo_root=work_root,
                 )
-                lead_tick(
-                    root=root,
-                    status_path=status_path,
-                    org=org,
-                    runtime=runtime,
-                    model=model,
-                    offline=offline,
-                )
-                worker_tick(
-                    root=root,
-                    status_path=status_path,
-                    org=org,
-                    runtime=runtime,
-                    model=model,
-                    offline=offline,
-                    repo_root=work_root,
-                )
-
-                # same-layer cooperation
-                assist_tick(
-                    root=root,
-                    status_path=status_path,
-                    org=org,
-                    runtime=runtime,
-                    model=model,
-                    offline=offline,
-                    agent_id="qa_mgr",
-                    role_hint="品質部長",
-                )
-                assist_tick(
-                    root=root,
-                    status_path=status_path,
-                    org=org,
-                    runtime=runtime,
-                    model=model,
-                    offline=offline,
-                    agent_id="ops_mgr",
-                    role_hint="運用部長",
-                )
-                assist_tick(
-                    root=root,
-                    status_path=status_path,
-                    org=org,
-                    runtime=runtime,
-                    model=model,
-                    offline=offline,
-                    agent_id="dev_rev_lead",
-                    role_hint="開発レビュー課長",
-                )
-
-                boss_tick(
-                    root=root,
-                    outputs_dir=outputs_dir,
-                    status_path=status_path,
-                    org=org,
-                    runtime=runtime,
-                )
+                due = list(handlers) if rescan else [aid for aid in handlers if aid in pending]
+                for aid in due:
+                    agent = org.find(aid)
+                    is_worker = agent is not None and agent.role == ROLE_WORKER
+                    lanes.submit(aid, handlers[aid], pool=ROLE_WORKER if is_worker else "")
 
                 # autopick: if everyone is idle, boss can restart work
-                if status_path is not None:
-                    st = load_status(status_path)
+                if rescan and status_path is not None and not lanes.busy():
+                    st = get_status_registry(status_path).snapshot()
                     all_ids = [a.id for a in org.agents]
                     all_idle = True
                     for aid in all_ids:
@@ -537,14 +743,17 @@ def watch_inputs(
                         boss_autopick(root=root, outputs_dir=outputs_dir, org=org, runtime=runtime)
             except Exception:
                 pass
-
-            time.sleep(0.5)
     except KeyboardInterrupt:
-        for w in workers:
-            w.stop()
+        pool.stop()
         obs.stop()
     finally:
-        for w in workers:
-            w.stop()
+        unsubscribe_runtime()
+        unsubscribe_mail()
+        pool.stop()
+        lanes.shutdown(wait=False)
         obs.stop()
         obs.join()
+        enq.stop()
+        flush_status_registries()
+        for sink in sinks:
+            sink.stop()
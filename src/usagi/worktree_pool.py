@@ -0,0 +1,445 @@
+"""worker 用 git worktree のプール（貸し出し式）。
+
+以前は `_run_worker_step_worktree` が課ごとに1つの worktree（.usagi/worktrees/<team>）を
+使い回していたので、同じ課の job が並行すると互いのファイルを踏み合っていた。
+かといって task ごとに `git worktree add` すると毎回 checkout のコストがかかる。
+
+ここでは `.usagi/worktrees/pool/<n>` を事前に作っておき、1 job に1つ貸し出す。
+
+- 貸し出しは `<n>.lease`（O_EXCL で作る JSON: pid/host/token/branch/期限）で排他する
+  （別プロセスの watch と共有しても二重に貸さない）。返却は token が自分のものの
+  ときだけ消す
+- 貸し出し中は heartbeat スレッドが期限を延ばし続ける（長い codex exec でも切れない）
+- worktree は常に detached HEAD。同じブランチを2つの job が同時に触れるように、
+  ブランチへの反映は `update-ref <new> <old>`（compare-and-swap）で行い、
+  先を越されていたら merge してからやり直す
+- 貸し出し時に `reset --hard` + `clean -fdx` して前の job の残骸を消す
+- 持ち主のプロセスが死んだ貸し出しは回収する。pid は再利用される（コンテナで再起動すると
+  同じ pid になりがち）ので、lease に起動時刻（boot id + starttime）を残して照合する。
+  自分の pid の lease でも、このプロセスが出した token でなければ前の自分の残骸として回収する。
+  期限切れで回収するのは持ち主の生死が分からない（別ホストの）貸し出しだけ
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from usagi.git_ops import GitRepo
+from usagi.runtime import WorktreePoolConfig
+
+log = logging.getLogger(__name__)
+
+_POLL_SECONDS = 0.2
+
+
+def pool_dir(repo_root: Path) -> Path:
+    return repo_root / ".usagi" / "worktrees" / "pool"
+
+
+@dataclass
+class WorktreeLease:
+    """貸し出し中の worktree。`with` で使うと抜けるときに返却する。"""
+
+    pool: WorktreePool
+    slot: int
+    path: Path
+    branch: str
+    # 貸し出し時の branch の先（branch が無かったときは ""）
+    start: str
+    # lease ファイルの持ち主の印（回収→別の job に貸し直された後に消さないため）
+    token: str
+    released: bool = field(default=False, init=False)
+
+    @property
+    def repo(self) -> GitRepo:
+        return GitRepo(self.path)
+
+    def commit(self, message: str) -> bool:
+        """変更を commit し、branch を今の HEAD まで進める。
+
+        他の job が先に branch を進めていたら merge してからやり直す。
+        衝突したら merge を戻して False（HEAD の commit は worktree に残るだけ）。
+        """
+
+        wt = self.repo
+        wt.add_all()
+        if wt.run(["status", "--porcelain"]):
+            wt.commit(message)
+        head = wt.head()
+        old = self.start
+        for _ in range(3):
+            if head == old:
+                return True
+            if self.pool.repo.update_ref(f"refs/heads/{self.branch}", head, old):
+                self.start = head
+                return True
+            # 先を越された: 今の branch を取り込んで再挑戦
+            old = self.pool.repo.branches().get(self.branch, "")
+            try:
+                wt.run(["merge", "--no-edit", old])
+            except RuntimeError as e:
+                _try(wt, ["merge", "--abort"])
+                log.error("worktree pool: merge into %s failed: %s", self.branch, e)
+                return False
+            head = wt.head()
+        return False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.pool.release(self)
+
+    def __enter__(self) -> WorktreeLease:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.release()
+
+
+class WorktreePool:
+    def __init__(
+        self,
+        repo_root: Path,
+        *,
+        size: int = 4,
+        max_size: int = 16,
+        lease_seconds: float = 3600.0,
+    ) -> None:
+        self.repo_root = repo_root
+        self.dir = pool_dir(repo_root)
+        self.repo = GitRepo(repo_root / ".usagi" / "repo")
+        self.size = 1
+        self.max_size = 1
+        self.lease_seconds = lease_seconds
+        self._cond = threading.Condition()
+        # worktree add/prune は共有の .git/worktrees を触るので直列にする
+        self._git_lock = threading.Lock()
+        self._repo_ready = False
+        self._host = socket.gethostname()
+        # このプロセスが貸し出し中の lease（heartbeat で期限を延ばす）
+        self._held: dict[int, WorktreeLease] = {}
+        # このプロセスが書いた lease の token（_held に入る前の checkout 中も含む）
+        self._tokens: set[str] = set()
+        self._started = _process_started(os.getpid())
+        self._heartbeat: threading.Thread | None = None
+        self.configure(size=size, max_size=max_size, lease_seconds=lease_seconds)
+
+    def configure(self, *, size: int, max_size: int, lease_seconds: float) -> None:
+        with self._cond:
+            self.size = max(1, size)
+            self.max_size = max(self.size, max_size)
+            self.lease_seconds = lease_seconds
+            self._cond.notify_all()
+
+    def prewarm(self) -> int:
+        """size 個まで worktree を作っておく。作った数を返す。"""
+
+        self._ensure_repo()
+        made = 0
+        for slot in range(self.size):
+            path = self._slot_path(slot)
+            if path.exists():
+                continue
+            token = self._try_lease(slot, branch="")
+            if token is None:
+                continue
+            try:
+                self._create(path, "main")
+                made += 1
+            except RuntimeError as e:
+                log.error("worktree pool: prewarm %s failed: %s", path, e)
+            finally:
+                self._drop(slot, token)
+        return made
+
+    def acquire(
+        self, branch: str, *, base: str = "main", timeout: float | None = None
+    ) -> WorktreeLease:
+        """branch（無ければ base）を checkout した worktree を1つ借りる。
+
+        空きが無ければ返却/回収されるまで待つ。timeout を過ぎたら TimeoutError。
+        """
+
+        self._ensure_repo()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self.reclaim()
+            # 既にある worktree を優先し、無ければ上限まで増やす
+            existing = [s for s in range(self.max_size) if self._slot_path(s).exists()]
+            fresh = [s for s in range(self.max_size) if s not in existing]
+            for slot in [*existing, *fresh]:
+                token = self._try_lease(slot, branch=branch)
+                if token is None:
+                    continue
+                try:
+                    lease = self._checkout(slot, branch, base, token)
+                except BaseException:
+                    self._drop(slot, token)
+                    raise
+                self._hold(lease)
+                return lease
+            with self._cond:
+                wait = _POLL_SECONDS
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                    if wait <= 0:
+                        raise TimeoutError(f"no free worktree in {self.dir}")
+                # 同じプロセスの返却は notify で、別プロセスの返却は poll で気づく
+                self._cond.wait(wait)
+
+    def release(self, lease: WorktreeLease) -> None:
+        with self._cond:
+            if self._held.get(lease.slot) is lease:
+                del self._held[lease.slot]
+            self._tokens.discard(lease.token)
+            # 回収されて別の job に貸し直されていたら、その lease は消さない
+            p = self._lease_path(lease.slot)
+            if self._read_lease(p).get("token") == lease.token:
+                p.unlink(missing_ok=True)
+            else:
+                log.warning("worktree pool: lease %s was taken over; not removing", p.name)
+            self._cond.notify_all()
+
+    def renew(self) -> int:
+        """このプロセスが貸し出し中の lease の期限を延ばす。延ばした数を返す。"""
+
+        n = 0
+        with self._cond:
+            for lease in list(self._held.values()):
+                p = self._lease_path(lease.slot)
+                data = self._read_lease(p)
+                if data.get("token") != lease.token:
+                    continue
+                data["expires_at"] = time.time() + self.lease_seconds
+                tmp = p.with_name(p.name + ".tmp")
+                try:
+                    tmp.write_text(json.dumps(data), encoding="utf-8")
+                    os.replace(tmp, p)
+                except OSError as e:
+                    log.warning("worktree pool: could not renew %s: %s", p.name, e)
+                    continue
+                n += 1
+        return n
+
+    def reclaim(self) -> int:
+        """持ち主が死んだ / 期限切れの貸し出しを回収する。回収した数を返す。"""
+
+        n = 0
+        now = time.time()
+        try:
+            leases = sorted(self.dir.glob("*.lease"))
+        except OSError:
+            return 0
+        for p in leases:
+            try:
+                data = json.loads(p.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                # 書きかけ（作った直後）かもしれないので、古いものだけ捨てる
+                try:
+                    stale = now - p.stat().st_mtime > 60
+                except OSError:
+                    continue
+                if not stale:
+                    continue
+                data = {}
+            if data and not self._orphaned(data, now):
+                continue
+            p.unlink(missing_ok=True)
+            log.warning("worktree pool: reclaimed %s (%s)", p.name, data.get("branch", ""))
+            n += 1
+        if n:
+            with self._cond:
+                self._cond.notify_all()
+        return n
+
+    def leases(self) -> dict[int, dict]:
+        out: dict[int, dict] = {}
+        for p in self.dir.glob("*.lease"):
+            try:
+                out[int(p.stem)] = json.loads(p.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+        return out
+
+    # ---- internal ----
+
+    def _slot_path(self, slot: int) -> Path:
+        return self.dir / str(slot)
+
+    def _lease_path(self, slot: int) -> Path:
+        return self.dir / f"{slot}.lease"
+
+    def _try_lease(self, slot: int, *, branch: str) -> str | None:
+        """slot の lease を取る。取れたら token、埋まっていたら None。"""
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(self._lease_path(slot), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return None
+        token = uuid.uuid4().hex
+        with self._cond:
+            self._tokens.add(token)
+        data = {
+            "pid": os.getpid(),
+            "started": self._started,
+            "host": self._host,
+            "token": token,
+            "branch": branch,
+            "acquired_at": time.time(),
+            "expires_at": time.time() + self.lease_seconds,
+        }
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        return token
+
+    def _orphaned(self, data: dict, now: float) -> bool:
+        if data.get("host") != self._host:
+            # 別ホストの持ち主は生死が分からないので期限で判断する
+            return float(data.get("expires_at", 0)) < now
+        try:
+            pid = int(data.get("pid", 0))
+        except (TypeError, ValueError):
+            return True
+        if pid == os.getpid():
+            # 再起動前の自分（同じ pid）の残骸なら token に覚えが無い
+            with self._cond:
+                return data.get("token") not in self._tokens
+        # 同じホストなら持ち主が生きている限り回収しない（期限切れでも）
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except (PermissionError, OverflowError):
+            pass
+        # pid が別のプロセスに再利用されていたら起動時刻が合わない
+        started = data.get("started") or ""
+        return bool(started) and started != _process_started(pid)
+
+    def _drop(self, slot: int, token: str) -> None:
+        """貸し出す前に手放す lease を消す。"""
+
+        with self._cond:
+            self._tokens.discard(token)
+        self._lease_path(slot).unlink(missing_ok=True)
+
+    @staticmethod
+    def _read_lease(p: Path) -> dict:
+        try:
+            return json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _hold(self, lease: WorktreeLease) -> None:
+        with self._cond:
+            self._held[lease.slot] = lease
+            if self._heartbeat is None or not self._heartbeat.is_alive():
+                self._heartbeat = threading.Thread(
+                    target=self._heartbeat_loop, daemon=True, name="usagi-worktree-lease"
+                )
+                self._heartbeat.start()
+
+    def _heartbeat_loop(self) -> None:
+        while True:
+            with self._cond:
+                if not self._held:
+                    self._heartbeat = None
+                    return
+                interval = min(max(self.lease_seconds / 3, 0.05), 300.0)
+            time.sleep(interval)
+            self.renew()
+
+    def _ensure_repo(self) -> None:
+        if self._repo_ready:
+            return
+        with self._git_lock:
+            self.repo.path.mkdir(parents=True, exist_ok=True)
+            self.repo.ensure_repo()
+            self.repo.ensure_initial_commit()
+            self._repo_ready = True
+
+    def _create(self, path: Path, start: str) -> None:
+        with self._git_lock:
+            # 前回のプロセスが消したディレクトリの登録が残っていると add できない
+            self.repo.run(["worktree", "prune"])
+            self.repo.run(["worktree", "add", "--detach", str(path), start])
+
+    def _checkout(self, slot: int, branch: str, base: str, token: str) -> WorktreeLease:
+        start = self.repo.branches().get(branch, "")
+        target = start or self.repo.resolve(f"{base}^{{commit}}")
+        if not target:
+            raise RuntimeError(f"not a valid object name: '{base}'")
+
+        path = self._slot_path(slot)
+        if not (path / ".git").exists():
+            self._create(path, target)
+        else:
+            wt = GitRepo(path)
+            # 前の job（落ちたものも含む）の残骸を消す
+            gitdir = wt.git_dir
+            if gitdir is not None and (gitdir / "MERGE_HEAD").exists():
+                _try(wt, ["merge", "--abort"])
+            if gitdir is not None and any(
+                (gitdir / d).exists() for d in ("rebase-merge", "rebase-apply")
+            ):
+                _try(wt, ["rebase", "--abort"])
+            # --force で index/作業ツリーの変更も捨てる（reset --hard 相当）
+            wt.run(["checkout", "--detach", "--force", target])
+            wt.run(["clean", "-ffdx"])
+        return WorktreeLease(
+            pool=self, slot=slot, path=path, branch=branch, start=start, token=token
+        )
+
+
+def _process_started(pid: int) -> str:
+    """pid の起動を識別する文字列（boot id + starttime）。取れない環境では ""。"""
+
+    try:
+        boot = Path("/proc/sys/kernel/random/boot_id").read_text(encoding="utf-8").strip()
+        stat = Path(f"/proc/{pid}/stat").read_text(encoding="utf-8")
+    except OSError:
+        return ""
+    # comm に空白や ')' が入っても崩れないよう、最後の ')' の後ろを数える（22番目が starttime）
+    fields = stat.rsplit(")", 1)[-1].split()
+    if len(fields) < 20:
+        return ""
+    return f"{boot}:{fields[19]}"
+
+
+def _try(repo: GitRepo, args: list[str]) -> None:
+    try:
+        repo.run(args)
+    except RuntimeError:
+        pass
+
+
+_pools: dict[Path, WorktreePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_worktree_pool(repo_root: Path, cfg: WorktreePoolConfig | None = None) -> WorktreePool:
+    """repo_root ごとに1つの WorktreePool（cfg を渡すと設定を反映する）。"""
+
+    key = repo_root.resolve()
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            cfg = cfg or WorktreePoolConfig()
+            pool = _pools[key] = WorktreePool(
+                repo_root,
+                size=cfg.size,
+                max_size=cfg.max_size,
+                lease_seconds=cfg.lease_seconds,
+            )
+            return pool
+    if cfg is not None:
+        pool.configure(size=cfg.size, max_size=cfg.max_size, lease_seconds=cfg.lease_seconds)
+    return pool
@@ -0,0 +1,144 @@
+"""role x kind の handler 登録と dispatcher のテスト。"""
+
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from usagi.agent_dispatch import (
+    TickContext,
+    dispatch_agents,
+    dispatch_tick,
+    handled_kinds,
+    register_handler,
+    unregister_handler,
+)
+from usagi.mailbox import (
+    configure_mailbox,
+    deliver_markdown,
+    ensure_mailbox,
+    get_mailbox_index,
+    list_messages,
+)
+from usagi.org import AgentDef, Organization, load_org
+from usagi.runtime import MailboxConfig, RuntimeMode
+
+EXAMPLE_ORG = Path(__file__).resolve().parents[1] / "examples" / "org.toml"
+
+
+def _ctx(root: Path, org: Organization) -> TickContext:
+    return TickContext(
+        root=root,
+        status_path=None,
+        org=org,
+        runtime=RuntimeMode(),
+        model="codex",
+        offline=True,
+        outputs_dir=root / "outputs",
+        repo_root=root,
+    )
+
+
+@pytest.fixture
+def scratch_role() -> Iterator[str]:
+    yield "test_role"
+    for kind in handled_kinds("test_role"):
+        unregister_handler("test_role", kind)
+
+
+def test_dispatch_tick_routes_by_role_and_kind(tmp_path: Path, scratch_role: str) -> None:
+    seen: list[tuple[str, str]] = []
+    register_handler(scratch_role, "ping", lambda ctx, a, msg: seen.append((a.id, msg.title)))
+    org = Organization(agents=[AgentDef(id="x", name="x", role=scratch_role)])
+
+    deliver_markdown(root=tmp_path, from_agent="y", to_agent="x", title="p1", body="", kind="ping")
+    deliver_markdown(root=tmp_path, from_agent="y", to_agent="x", title="n1", body="", kind="noise")
+
+    assert dispatch_tick(_ctx(tmp_path, org), "x") == 1
+    assert seen == [("x", "p1")]
+    # 処理済み/未対応 kind はどちらも inbox から消える
+    assert list_messages(root=tmp_path, agent_id="x") == []
+    assert dispatch_tick(_ctx(tmp_path, org), "missing") == 0
+
+
+def test_failing_handler_is_nacked_and_the_rest_still_run(
+    tmp_path: Path, scratch_role: str
+) -> None:
+    seen: list[str] = []
+
+    def handler(ctx: TickContext, a: AgentDef, msg) -> None:
+        if msg.title == "bad":
+            raise RuntimeError("boom")
+        seen.append(msg.title)
+
+    register_handler(scratch_role, "ping", handler)
+    org = Organization(agents=[AgentDef(id="x", name="x", role=scratch_role)])
+    for title in ("bad", "good"):
+        deliver_markdown(
+            root=tmp_path, from_agent="y", to_agent="x", title=title, body="", kind="ping"
+        )
+
+    # bad は nack されて backoff 中（同じ tick では取り直さない）。good は処理される
+    assert dispatch_tick(_ctx(tmp_path, org), "x") == 1
+    assert seen == ["good"]
+    [pending] = list_messages(root=tmp_path, agent_id="x")
+    assert pending.title == "bad"
+    assert dispatch_tick(_ctx(tmp_path, org), "x") == 0
+
+    # backoff 無しなら、すぐ再 claim され回数切れで dead-letter
+    configure_mailbox(tmp_path, MailboxConfig(retry_backoff_seconds=0.0))
+    os.utime(pending.path, (time.time() - 1, time.time() - 1))
+    get_mailbox_index(tmp_path, "x").discard(pending.path.name)
+    dispatch_tick(_ctx(tmp_path, org), "x")
+    assert list_messages(root=tmp_path, agent_id="x") == []
+    [dead] = ensure_mailbox(tmp_path, "x").deadletter.glob("*.md")
+    assert "bad" in dead.name
+
+
+def test_dispatch_agents_cover_every_department() -> None:
+    org = load_org(EXAMPLE_ORG)
+    ids = {a.id for a in dispatch_agents(org)}
+
+    assert {"dev_mgr", "qa_mgr", "ops_mgr"} <= ids
+    assert {"dev_impl_lead", "qa_lint_lead", "qa_perf_lead", "ops_maint_lead"} <= ids
+    assert {"dev_w1", "dev_w2", "qa_lint1", "qa_perf1"} <= ids
+    # boss 直属の秘書や handler の無い role は対象外
+    assert "secretary" not in ids
+    assert "board" not in ids
+    assert "assist_request" in handled_kinds("lead")
+
+
+def test_non_dev_manager_delegates_to_its_own_lead(tmp_path: Path) -> None:
+    org = load_org(EXAMPLE_ORG)
+    deliver_markdown(
+        root=tmp_path,
+        from_agent="boss",
+        to_agent="qa_mgr",
+        title="lint 強化",
+        body="## 決定事項\n- lint を厳しくする\n",
+        kind="boss_plan",
+    )
+
+    assert dispatch_tick(_ctx(tmp_path, org), "qa_mgr") == 1
+
+    [req] = list_messages(root=tmp_path, agent_id="qa_lint_lead", kinds={"impl_request"})
+    assert req.from_agent == "qa_mgr"
+    for peer in ("dev_mgr", "ops_mgr"):
+        assert list_messages(root=tmp_path, agent_id=peer, kinds={"assist_request"})
+    assert list_messages(root=tmp_path, agent_id="boss", kinds={"manager_report"})
+
+
+def test_run_agent_streams_and_logs_progress(tmp_path: Path) -> None:
+    from usagi.agents import SHACHO_USAGI
+    from usagi.events import events_path
+
+    org = load_org(EXAMPLE_ORG)
+    mgr = org.find("dev_mgr")
+    assert mgr is not None
+
+    msg = _ctx(tmp_path, org).run_agent(mgr, SHACHO_USAGI, "計画して")
+    assert msg.content.startswith("(offline")
+    log = events_path(tmp_path).read_text(encoding="utf-8")
+    assert f"llm: dev_mgr done ({len(msg.content)} chars)" in log
@@ -23,3 +23,28 @@ def test_kansa_usagi_offline() -> None:
     msg = KANSA_USAGI.run(user_prompt="テスト", model="codex", backend=backend)
     assert msg.agent_name == "監査うさぎ"
     assert msg.role == "reviewer"
+
+
+def test_run_stream_reports_chunks() -> None:
+    class ChunkBackend:
+        def generate(self, prompt: str, model: str) -> str:
+            return "ab"
+
+        def generate_stream(self, prompt: str, model: str):  # noqa: ANN201
+            yield "a"
+            yield "b"
+
+    seen: list[str] = []
+    msg = SHACHO_USAGI.run_stream(
+        user_prompt="x", model="codex", backend=ChunkBackend(), on_chunk=seen.append
+    )
+    assert msg.content == "ab"
+    assert seen == ["a", "b"]
+
+    # generate_stream を持たない backend は一括応答を1チャンクとして扱う
+    seen.clear()
+    msg = SHACHO_USAGI.run_stream(
+        user_prompt="x", model="codex", backend=OfflineBackend(), on_chunk=seen.append
+    )
+    assert len(seen) == 1
+    assert msg.content.startswith("(offline")
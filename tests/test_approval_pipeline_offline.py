@@ -38,3 +38,64 @@ do thing
     assert "うさぎさん株式会社レポート" in res.report
     # boss plan + worker impl + lead review + manager decision
     assert len(res.messages) >= 4
+
+
+def test_3persona_vote_is_parallel_and_stops_after_two_matching_votes() -> None:
+    import threading
+    import time
+
+    from usagi.approval_pipeline import _run_3persona_vote
+    from usagi.vote import decide_2of3
+
+    lock = threading.Lock()
+    calls = {"n": 0}
+
+    class SlowThirdBackend:
+        def generate(self, prompt: str, model: str) -> str:
+            with lock:
+                calls["n"] += 1
+                n = calls["n"]
+            if n == 3:
+                time.sleep(2.0)
+                return "decision: block"
+            time.sleep(0.2)
+            return "decision: approve"
+
+    runtime = RuntimeMode()
+    t0 = time.monotonic()
+    votes = _run_3persona_vote(
+        backend=SlowThirdBackend(),
+        model="codex",
+        org=default_org(),
+        runtime=runtime,
+        context="ctx",
+    )
+    elapsed = time.monotonic() - t0
+
+    assert len(votes) == 3
+    assert decide_2of3(votes) == "approve"
+    # 直列なら 0.2+0.2+2.0 秒。並行 + 早期確定なら 1 呼び出しぶん程度
+    assert elapsed < 1.5
+
+
+def test_3persona_vote_timeout_counts_as_abstain() -> None:
+    import time
+
+    from usagi.approval_pipeline import _run_3persona_vote
+
+    class HangingBackend:
+        def generate(self, prompt: str, model: str) -> str:
+            time.sleep(1.0)
+            return "decision: approve"
+
+    runtime = RuntimeMode()
+    runtime.vote.voter_timeout_seconds = 0.1
+    votes = _run_3persona_vote(
+        backend=HangingBackend(),
+        model="codex",
+        org=default_org(),
+        runtime=runtime,
+        context="ctx",
+    )
+    assert [v.decision for v in votes] == ["abstain", "abstain", "abstain"]
+    assert all("timeout" in v.reason for v in votes)
@@ -10,3 +10,28 @@ def test_cli_backend_missing_binary() -> None:
         assert False, "should raise"  # noqa: B011
     except RuntimeError as e:
         assert "CLI not found" in str(e)
+
+
+def test_cli_backend_run_stream_yields_lines() -> None:
+    b = m.CLIBackend(["sh", "-c", "printf 'a\\nb\\n'"], timeout_seconds=5)
+    assert list(b.run_stream("", use_stdin=False)) == ["a\n", "b\n"]
+
+
+def test_cli_backend_run_stream_reads_stdin_and_reports_failure() -> None:
+    b = m.CLIBackend(["sh", "-c", "cat; echo oops >&2; exit 3"], timeout_seconds=5)
+    out: list[str] = []
+    try:
+        for chunk in b.run_stream("hello\n", use_stdin=True):
+            out.append(chunk)
+        assert False, "should raise"  # noqa: B011
+    except RuntimeError as e:
+        assert "oops" in str(e)
+    assert out == ["hello\n"]
+
+
+def test_cli_backend_run_stream_large_prompt_does_not_deadlock() -> None:
+    # stdin を読み切る前に stdout へ大量に書く CLI（パイプバッファより大きい prompt）
+    script = "head -c 200000 /dev/zero | tr '\\0' 'x'; echo; wc -c"
+    b = m.CLIBackend(["sh", "-c", script], timeout_seconds=10)
+    out = "".join(b.run_stream("y" * 1_000_000, use_stdin=True))
+    assert out.splitlines()[-1].strip() == "1000000"
@@ -0,0 +1,43 @@
+import json
+from pathlib import Path
+
+from usagi.events import EventSink, emit_event
+
+
+def test_emit_event_writes_synchronously_without_writer(tmp_path: Path) -> None:
+    p = tmp_path / ".usagi" / "events.log"
+    emit_event(p, "hello")
+    assert p.read_text(encoding="utf-8").endswith("] hello\n")
+
+
+def test_event_sink_background_writer_and_jsonl(tmp_path: Path) -> None:
+    p = tmp_path / "events.log"
+    sink = EventSink(p, jsonl=True, flush_seconds=0.05)
+    sink.start()
+    try:
+        sink.emit("a", agent="w1", kind="status")
+        sink.emit("b", kind="job_end", duration=1.23456)
+        sink.flush()
+    finally:
+        sink.stop()
+
+    lines = p.read_text(encoding="utf-8").splitlines()
+    assert [line.split("] ", 1)[1] for line in lines] == ["a", "b"]
+
+    recs = [json.loads(x) for x in sink.jsonl_path.read_text(encoding="utf-8").splitlines()]
+    assert recs[0]["agent"] == "w1"
+    assert recs[0]["kind"] == "status"
+    assert recs[1]["duration"] == 1.235
+
+
+def test_event_sink_rotates_by_size(tmp_path: Path) -> None:
+    p = tmp_path / "events.log"
+    sink = EventSink(p, max_bytes=100, backups=2)
+    for i in range(30):
+        sink.emit(f"line {i:02d} " + "x" * 20)
+
+    assert p.stat().st_size < 100
+    assert (tmp_path / "events.log.1").exists()
+    assert (tmp_path / "events.log.2").exists()
+    assert not (tmp_path / "events.log.3").exists()
+    assert "line 29" in p.read_text(encoding="utf-8")
@@ -0,0 +1,202 @@
+"""lead -> worker fan-out のテスト。"""
+
+from pathlib import Path
+
+from usagi.fanout import (
+    assign_least_loaded,
+    batch_marker,
+    batches_dir,
+    close_batch,
+    create_batch,
+    load_batch,
+    open_load,
+    parse_batch_marker,
+    record_result,
+    split_subtasks,
+    workers_of,
+)
+from usagi.mailbox import configure_mailbox
+from usagi.org import AgentDef, Organization
+from usagi.runtime import MailboxConfig
+from usagi.state import AgentStatus
+
+
+def _org() -> Organization:
+    return Organization(
+        agents=[
+            AgentDef(id="lead", name="課長", role="lead"),
+            AgentDef(id="w1", name="w1", role="worker", reports_to="lead"),
+            AgentDef(id="w2", name="w2", role="worker", reports_to="lead"),
+            AgentDef(id="w3", name="w3", role="worker", reports_to="lead"),
+            AgentDef(id="rev", name="rev", role="reviewer", reports_to="lead"),
+        ]
+    )
+
+
+def test_split_subtasks_reads_section_and_caps_parts() -> None:
+    brief = (
+        "## 実装指示\n- 全体\n\n"
+        "## サブタスク\n- API を追加\n- CLI を追加\n  - 詳細は無視\n- テスト\n- ドキュメント\n\n"
+        "## 注意\n- x\n"
+    )
+    parts = ["API を追加", "CLI を追加", "テスト", "ドキュメント"]
+    assert split_subtasks(brief, max_parts=5) == parts
+    # worker 数を超えた分は最後の1件にまとめる
+    assert split_subtasks(brief, max_parts=3)[-1] == "テスト / ドキュメント"
+    assert split_subtasks("## 実装指示\n- 全体\n", max_parts=3) == [""]
+
+
+def test_assign_least_loaded_uses_open_load_and_live_status() -> None:
+    workers = workers_of(_org(), "lead")
+    assert [w.id for w in workers] == ["w1", "w2", "w3"]
+
+    plan = assign_least_loaded(
+        ["a", "b", "c"],
+        workers,
+        load={"w1": 2},
+        status={"w2": AgentStatus(agent_id="w2", name="w2", state="working")},
+    )
+    # w3(0) -> w2(1: 稼働中) -> w3(1) の順（同点は組織順）
+    assert [(t, w.id) for t, w in plan] == [("a", "w3"), ("b", "w2"), ("c", "w3")]
+
+
+def test_batch_lifecycle(tmp_path: Path) -> None:
+    b = create_batch(tmp_path, lead="lead", title="t", assignments=[("a", "w1"), ("b", "w2")])
+    assert open_load(tmp_path) == {"w1": 1, "w2": 1}
+
+    marker = batch_marker(b.id, 1)
+    assert parse_batch_marker(f"{marker}\n\nbody") == (b.id, 1)
+    assert parse_batch_marker("no marker") is None
+
+    got = record_result(tmp_path, b.id, 1, "diff-b")
+    assert got is not None and not got.complete and got.done_count() == 1
+    assert open_load(tmp_path) == {"w1": 1}
+
+    got = record_result(tmp_path, b.id, 0, "diff-a")
+    assert got is not None and got.complete
+    assert [s.result for s in got.subtasks] == ["diff-a", "diff-b"]
+
+    close_batch(tmp_path, b.id)
+    assert load_batch(tmp_path, b.id) is None
+    assert (batches_dir(tmp_path) / "archive" / f"{b.id}.json").exists()
+    # 閉じた後の再配送には閉じた時点の batch を返す（書き換えず、開き直さない）
+    late = record_result(tmp_path, b.id, 0, "late")
+    assert late is not None and late.complete
+    assert [s.result for s in late.subtasks] == ["diff-a", "diff-b"]
+    assert load_batch(tmp_path, b.id) is None
+    assert record_result(tmp_path, "nope", 0, "x") is None
+
+
+def test_failed_subtask_closes_batch_and_stale_batches_do_not_count(tmp_path: Path) -> None:
+    b = create_batch(tmp_path, lead="lead", title="t", assignments=[("a", "w1"), ("b", "w2")])
+    record_result(tmp_path, b.id, 0, "diff-a")
+    got = record_result(tmp_path, b.id, 1, "boom", failed=True)
+    assert got is not None and got.complete
+    assert [s.status for s in got.subtasks] == ["done", "failed"]
+
+    create_batch(tmp_path, lead="lead", title="old", assignments=[("c", "w3")])
+    assert open_load(tmp_path) == {"w3": 1}
+    assert open_load(tmp_path, ttl_seconds=-1) == {}
+
+
+def test_dead_lettered_worker_request_reaches_the_lead(tmp_path: Path, monkeypatch) -> None:
+    import usagi.approval_pipeline as ap
+    from usagi.agent_dispatch import TickContext, dispatch_tick
+    from usagi.mailbox import deliver_markdown, list_messages
+    from usagi.runtime import RuntimeMode
+
+    def boom(**kw) -> None:  # noqa: ANN003
+        raise RuntimeError("codex crashed")
+
+    monkeypatch.setattr(ap, "_run_worker_step_worktree", boom)
+    # 再試行を待たずに回数切れまで進める
+    configure_mailbox(tmp_path, MailboxConfig(retry_backoff_seconds=0.0))
+    org = Organization(
+        agents=[
+            AgentDef(id="mgr", name="部長", role="manager"),
+            AgentDef(id="lead", name="課長", role="lead", reports_to="mgr"),
+            AgentDef(id="w1", name="w1", role="worker", reports_to="lead"),
+        ]
+    )
+    ctx = TickContext(
+        root=tmp_path,
+        status_path=None,
+        org=org,
+        runtime=RuntimeMode(),
+        model="codex",
+        offline=True,
+        repo_root=tmp_path,
+    )
+    b = create_batch(tmp_path, lead="lead", title="t", assignments=[("a", "w1")])
+    deliver_markdown(
+        root=tmp_path,
+        from_agent="lead",
+        to_agent="w1",
+        kind="worker_request",
+        title="t",
+        body=batch_marker(b.id, 0) + "\n\nやって",
+    )
+
+    # 再試行の上限まで失敗 → dead-letter → 課長に impl_failed
+    dispatch_tick(ctx, "w1")
+    [failed] = list_messages(root=tmp_path, agent_id="lead", kinds={"impl_failed"})
+    assert "codex crashed" in failed.path.read_text(encoding="utf-8")
+
+    dispatch_tick(ctx, "lead")
+    assert load_batch(tmp_path, b.id) is None
+    [review] = list_messages(root=tmp_path, agent_id="mgr", kinds={"review_result"})
+    assert "(failed)" in review.path.read_text(encoding="utf-8")
+    assert open_load(tmp_path) == {}
+
+
+def test_batch_stays_open_until_the_review_is_sent(tmp_path: Path, monkeypatch) -> None:
+    from usagi.agent_dispatch import TickContext, dispatch_tick
+    from usagi.mailbox import deliver_markdown, list_messages
+    from usagi.runtime import RuntimeMode
+
+    real = TickContext.run_agent
+    calls: list[str] = []
+
+    def flaky(self, agent, llm_agent, prompt):  # noqa: ANN001, ANN202
+        calls.append(prompt)
+        if len(calls) == 1:
+            raise RuntimeError("429 rate limited")
+        return real(self, agent, llm_agent, prompt)
+
+    monkeypatch.setattr(TickContext, "run_agent", flaky)
+    configure_mailbox(tmp_path, MailboxConfig(retry_backoff_seconds=0.0))
+    org = Organization(
+        agents=[
+            AgentDef(id="mgr", name="部長", role="manager"),
+            AgentDef(id="lead", name="課長", role="lead", reports_to="mgr"),
+            AgentDef(id="w1", name="w1", role="worker", reports_to="lead"),
+            AgentDef(id="w2", name="w2", role="worker", reports_to="lead"),
+        ]
+    )
+    ctx = TickContext(
+        root=tmp_path,
+        status_path=None,
+        org=org,
+        runtime=RuntimeMode(),
+        model="codex",
+        offline=True,
+        repo_root=tmp_path,
+    )
+    b = create_batch(tmp_path, lead="lead", title="t", assignments=[("a", "w1"), ("b", "w2")])
+    record_result(tmp_path, b.id, 0, batch_marker(b.id, 0) + "\n\ndiff-a")
+    deliver_markdown(
+        root=tmp_path,
+        from_agent="w2",
+        to_agent="lead",
+        kind="impl_result",
+        title="t",
+        body=batch_marker(b.id, 1) + "\n\ndiff-b",
+    )
+
+    # 1回目のレビューが失敗しても batch は閉じず、再配送で全員分をレビューし直す
+    dispatch_tick(ctx, "lead")
+    assert len(calls) == 2
+    assert all("diff-a" in p and "diff-b" in p for p in calls)
+    assert load_batch(tmp_path, b.id) is None
+    [review] = list_messages(root=tmp_path, agent_id="mgr", kinds={"review_result"})
+    assert "diff-a" in review.path.read_text(encoding="utf-8")
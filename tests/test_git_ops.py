@@ -1,5 +1,6 @@
 """git_ops のテスト（gitは実行できる前提）。"""
 
+import subprocess
 from pathlib import Path
 
 import pytest
@@ -33,3 +34,29 @@ def test_git_repo_init_and_branch(tmp_path: Path) -> None:
     b = org_branch("worker1")
     repo.checkout(b, create=True)
     assert repo.current_branch() == b
+
+
+def test_git_repo_ref_queries_and_updates(tmp_path: Path) -> None:
+    repo = GitRepo(tmp_path)
+    repo.ensure_repo()
+    repo.ensure_initial_commit()
+
+    head = repo.head()
+    assert repo.branches() == {"main": head}
+    assert repo.resolve("main^{commit}") == head
+    assert repo.resolve("no-such-branch") is None
+
+    repo.create_branch("team-a", "main")
+    assert repo.branch_exists("team-a")
+    with pytest.raises(RuntimeError):
+        repo.create_branch("team-a", "main")
+
+    # compare-and-swap: 期待値が違えば更新しない
+    assert repo.update_ref("refs/heads/team-a", head, "1" * 40) is False
+    assert repo.update_ref("refs/heads/team-b", head, "") is True
+
+    # 別プロセスの git が動かした refs も拾う
+    subprocess.run(["git", "branch", "outside"], cwd=tmp_path, check=True)
+    assert repo.branch_exists("outside")
+    subprocess.run(["git", "branch", "-D", "outside"], cwd=tmp_path, check=True)
+    assert not repo.branch_exists("outside")
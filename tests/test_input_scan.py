@@ -0,0 +1,42 @@
+import os
+from pathlib import Path
+
+from usagi.input_scan import scan_changed
+from usagi.state_store import StateStore
+
+
+def test_scan_changed_diffs_against_state(tmp_path: Path) -> None:
+    inputs = tmp_path / "inputs"
+    (inputs / "a" / "deep").mkdir(parents=True)
+    (inputs / "b").mkdir()
+    done = inputs / "done.md"
+    done.write_text("x", encoding="utf-8")
+    grown = inputs / "a" / "grown.md"
+    grown.write_text("x", encoding="utf-8")
+    new = inputs / "a" / "deep" / "new.md"
+    new.write_text("x", encoding="utf-8")
+    legacy = inputs / "b" / "legacy.md"
+    legacy.write_text("x", encoding="utf-8")
+    (inputs / "b" / "note.txt").write_text("x", encoding="utf-8")
+
+    st = StateStore(tmp_path / "state.json")
+    for p in (done, grown):
+        s = p.stat()
+        st.update(p, mtime_ns=s.st_mtime_ns, size=s.st_size)
+    # 旧形式（size 無し）は mtime だけで判断する
+    st.set_mtime_ns(legacy, legacy.stat().st_mtime_ns)
+
+    # mtime を戻したまま中身だけ変わった（size で検知する）
+    s = grown.stat()
+    grown.write_text("xyz", encoding="utf-8")
+    os.utime(grown, ns=(s.st_atime_ns, s.st_mtime_ns))
+
+    res = scan_changed(inputs, st, workers=2)
+    assert res.total == 4
+    assert res.changed == sorted([grown, new])
+
+
+def test_scan_changed_missing_dir(tmp_path: Path) -> None:
+    res = scan_changed(tmp_path / "nope", StateStore(tmp_path / "state.json"))
+    assert res.total == 0
+    assert res.changed == []
@@ -0,0 +1,127 @@
+import queue
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from usagi.job_queue import JobQueue, WatchJob, WatchPool
+from usagi.runtime import SchedulerConfig
+
+
+def test_job_queue_coalesces_pending_duplicates() -> None:
+    q = JobQueue(10)
+    assert q.put(WatchJob(path=Path("a.md"))) is True
+    assert q.put(WatchJob(path=Path("a.md"))) is False
+    assert q.put(WatchJob(path=Path("b.md"))) is True
+    assert q.qsize() == 2
+
+    job = q.get(timeout=0.1)
+    assert job.path == Path("a.md")
+    # 処理中の path は再度積める（処理後の変更を取りこぼさない）
+    assert q.put(WatchJob(path=Path("a.md"))) is True
+
+    m = q.metrics()
+    assert m["busy"] == 1
+    assert m["coalesced"] == 1
+    q.task_done()
+    assert q.metrics()["busy"] == 0
+
+
+def test_job_queue_drop_and_block_policies() -> None:
+    q = JobQueue(1, policy="drop")
+    assert q.put(WatchJob(path=Path("a.md"))) is True
+    assert q.put(WatchJob(path=Path("b.md"))) is False
+    assert q.metrics()["dropped"] == 1
+
+    b = JobQueue(1, policy="block")
+    b.put(WatchJob(path=Path("a.md")))
+    assert b.put(WatchJob(path=Path("a.md")), timeout=0.05) is False
+
+    threading.Timer(0.05, lambda: b.get(timeout=1)).start()
+    assert b.put(WatchJob(path=Path("a.md")), timeout=2) is True
+
+    with pytest.raises(queue.Empty):
+        JobQueue().get(timeout=0.01)
+
+
+def test_job_queue_orders_by_priority_and_source(tmp_path: Path) -> None:
+    low = tmp_path / "low.md"
+    low.write_text("---\npriority: low\n---\n# x\n", encoding="utf-8")
+    urgent = tmp_path / "urgent.md"
+    urgent.write_text("---\npriority: urgent\n---\n# x\n", encoding="utf-8")
+    chat = tmp_path / "secretary" / "proj" / "chat.md"
+    chat.parent.mkdir(parents=True)
+    chat.write_text("# x\n", encoding="utf-8")
+    plain = tmp_path / "plain.md"
+    plain.write_text("# x\n", encoding="utf-8")
+
+    q = JobQueue(10)
+    for p in (low, plain, chat, urgent):
+        q.put(WatchJob(path=p))
+
+    order = [q.get(timeout=0.1) for _ in range(4)]
+    assert [j.path for j in order] == [urgent, chat, plain, low]
+    assert [j.priority for j in order] == [3, 2, 1, 0]
+    assert q.metrics()["depth_by_priority"] == {}
+
+
+def test_job_queue_is_fair_between_projects() -> None:
+    q = JobQueue(50, scheduler=SchedulerConfig(project_weights={"b": 2.0}))
+    for i in range(6):
+        q.put(WatchJob(path=Path(f"a{i}.md"), priority=1, project="a"))
+    for i in range(6):
+        q.put(WatchJob(path=Path(f"b{i}.md"), priority=1, project="b"))
+
+    got = [q.get(timeout=0.1).project for _ in range(6)]
+    # 先に大量投入された a が b を飢えさせない。重み 2 の b は a の倍回る
+    assert got.count("b") == 4
+    assert got.count("a") == 2
+
+
+def test_job_queue_ages_low_priority_jobs() -> None:
+    q = JobQueue(10, scheduler=SchedulerConfig(aging_seconds=10.0))
+    q.put(WatchJob(path=Path("old.md"), priority=0, project="p", enqueued_at=time.monotonic() - 25))
+    q.put(WatchJob(path=Path("new.md"), priority=1, project="p"))
+    # 0 + 25/10 = 2 > 1 なので古い低優先度が先
+    assert q.get(timeout=0.1).path == Path("old.md")
+
+
+class _FakeWorker:
+    def __init__(self) -> None:
+        self._stop = threading.Event()
+
+    def run_forever(self) -> None:
+        self._stop.wait()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def test_watch_pool_resizes_and_autoscales() -> None:
+    q = JobQueue(10)
+    pool = WatchPool(q, _FakeWorker, size=2, max_size=3, idle_seconds=0.0)
+    assert pool.size == 2
+
+    # 全員 busy でキューが滞留していれば増やす
+    q.put(WatchJob(path=Path("a.md")))
+    q.put(WatchJob(path=Path("b.md")))
+    q.get(timeout=0.1)
+    q.put(WatchJob(path=Path("c.md")))
+    q.get(timeout=0.1)
+    assert pool.autoscale() == 3
+    assert pool.autoscale() == 3  # max_size で頭打ち
+
+    # 空いたら基本サイズまで戻す
+    q.get(timeout=0.1)
+    for _ in range(3):
+        q.task_done()
+    pool.autoscale()
+    time.sleep(0.01)
+    assert pool.autoscale() == 2
+
+    pool.configure(size=4)
+    assert pool.size == 4
+    assert pool.metrics()["workers"] == 4
+    pool.stop()
+    assert pool.size == 0
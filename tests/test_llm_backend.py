@@ -9,7 +9,7 @@ def test_llm_config_defaults() -> None:
 
 
 def test_ollama_url_build(monkeypatch) -> None:
-    # monkeypatch requests.post
+    # monkeypatch the pooled requests.Session
     import usagi.llm_backend as m
 
     class DummyResp:
@@ -19,11 +19,96 @@ def test_ollama_url_build(monkeypatch) -> None:
         def json(self):  # noqa: ANN001
             return {"response": "ok"}
 
-    def fake_post(url, json, timeout):  # noqa: ANN001
+    def fake_post(self, url, json, timeout):  # noqa: ANN001
         assert url.endswith("/api/generate")
         return DummyResp()
 
-    monkeypatch.setattr(m.requests, "post", fake_post)
+    monkeypatch.setattr(m.requests.Session, "post", fake_post)
 
     llm = LLM(LLMConfig(backend="ollama", model="llama3.1", ollama_url="http://x"))
     assert llm.generate("hi") == "ok"
+
+
+def test_http_session_is_reused_per_base_url() -> None:
+    import usagi.llm_backend as m
+
+    try:
+        s1 = m.http_session("http://x/")
+        s2 = m.http_session("http://x")
+        s3 = m.http_session("http://y")
+        assert s1 is s2
+        assert s1 is not s3
+    finally:
+        m.close_backends()
+
+
+def test_openai_client_is_reused() -> None:
+    import usagi.llm_backend as m
+
+    try:
+        c1 = m.openai_client(api_key="k1")
+        c2 = m.openai_client(api_key="k1")
+        c3 = m.openai_client(api_key="k2")
+        assert c1 is c2
+        assert c1 is not c3
+    finally:
+        m.close_backends()
+
+
+def test_openai_client_keeps_sdk_timeout_unless_configured() -> None:
+    import usagi.llm_backend as m
+
+    try:
+        default = m.openai_client(api_key="k1")
+        assert getattr(default.timeout, "read", default.timeout) == 600
+        assert m.openai_client(api_key="k1", timeout_seconds=5).timeout == 5.0
+    finally:
+        m.close_backends()
+
+
+def test_ollama_stream(monkeypatch) -> None:
+    import usagi.llm_backend as m
+
+    class DummyStreamResp:
+        def __enter__(self):  # noqa: ANN204
+            return self
+
+        def __exit__(self, *exc):  # noqa: ANN002
+            return False
+
+        def raise_for_status(self) -> None:
+            return None
+
+        def iter_lines(self):  # noqa: ANN201
+            yield b'{"response": "he", "done": false}'
+            yield b""
+            yield b'{"response": "llo", "done": false}'
+            yield b'{"response": "", "done": true}'
+
+    def fake_post(self, url, json, timeout, stream=False):  # noqa: ANN001
+        assert json["stream"] is True
+        assert stream is True
+        return DummyStreamResp()
+
+    monkeypatch.setattr(m.requests.Session, "post", fake_post)
+
+    llm = LLM(LLMConfig(backend="ollama", model="llama3.1", ollama_url="http://x"))
+    assert list(llm.generate_stream("hi")) == ["he", "llo"]
+
+
+def test_openai_stream_reports_usage() -> None:
+    from types import SimpleNamespace as NS
+
+    import usagi.llm_backend as m
+
+    events = [
+        NS(type="response.output_text.delta", delta="he"),
+        NS(type="response.output_text.delta", delta="llo"),
+        NS(type="response.completed", response=NS(usage=NS(total_tokens=42))),
+    ]
+    client = NS(responses=NS(create=lambda **kw: iter(events)))
+    used: list[int] = []
+
+    chunks = m.stream_openai_text(client, model="m", prompt="hi", on_usage=used.append)
+    assert list(chunks) == ["he", "llo"]
+    assert used == [42]
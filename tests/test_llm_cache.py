@@ -0,0 +1,94 @@
+"""llm_cache のテスト。"""
+
+import os
+import time
+from pathlib import Path
+
+from usagi.agents import UsagiAgent
+from usagi.llm_cache import LLMCache, cache_dir, configure_llm_cache, get_llm_cache
+from usagi.runtime import LLMCacheConfig
+
+
+class CountingBackend:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def generate(self, prompt: str, model: str) -> str:
+        self.calls += 1
+        return f"answer {self.calls}"
+
+
+def test_agent_run_uses_cache(tmp_path: Path) -> None:
+    cache = LLMCache(cache_dir(tmp_path), ttl_seconds=60, max_bytes=1024 * 1024)
+    backend = CountingBackend()
+    agent = UsagiAgent(name="boss", role="planner", system_prompt="sys")
+
+    m1 = agent.run(user_prompt="hi", model="codex", backend=backend, cache=cache)
+    m2 = agent.run(user_prompt="hi", model="codex", backend=backend, cache=cache)
+    m3 = agent.run(user_prompt="hi", model="other", backend=backend, cache=cache)
+
+    assert m1.content == m2.content == "answer 1"
+    assert m3.content == "answer 2"
+    assert backend.calls == 2
+    assert cache.stats() == {"hits": 1, "misses": 2}
+
+
+def test_cache_key_separates_providers_serving_the_same_model(tmp_path: Path) -> None:
+    from usagi.llm_backend import LLM, LLMConfig
+
+    class ProviderBackend(CountingBackend):
+        def __init__(self, url: str) -> None:
+            super().__init__()
+            self.llm = LLM(LLMConfig(backend="ollama", ollama_url=url))
+
+        def cache_identity(self) -> str:
+            return self.llm.cache_identity()
+
+    cache = LLMCache(cache_dir(tmp_path), ttl_seconds=60, max_bytes=1024 * 1024)
+    agent = UsagiAgent(name="boss", role="planner", system_prompt="sys")
+    a, b = ProviderBackend("http://a:11434"), ProviderBackend("http://b:11434/")
+
+    agent.run(user_prompt="hi", model="llama3.1", backend=a, cache=cache)
+    agent.run(user_prompt="hi", model="llama3.1", backend=b, cache=cache)
+    assert (a.calls, b.calls) == (1, 1)
+    x = LLM(LLMConfig(openai_base_url="http://x/v1")).cache_identity()
+    y = LLM(LLMConfig(openai_base_url="http://y/v1")).cache_identity()
+    assert x != y
+
+
+def test_cache_ttl_expires(tmp_path: Path) -> None:
+    cache = LLMCache(tmp_path, ttl_seconds=0.01, max_bytes=1024 * 1024)
+    k = cache.key("b", "m", "p")
+    cache.put(k, "x")
+    time.sleep(0.05)
+    assert cache.get(k) is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = LLMCache(tmp_path, ttl_seconds=60, max_bytes=400)
+    keys = [cache.key("b", "m", str(i)) for i in range(3)]
+    cache.put(keys[0], "a" * 100)
+    cache.put(keys[1], "b" * 100)
+
+    # keys[0] を最近使ったことにする（keys[1] より新しい）
+    old = time.time() - 100
+    os.utime(cache._entry(keys[1]), (old, old))  # noqa: SLF001
+    assert cache.get(keys[0]) is not None
+
+    cache.put(keys[2], "c" * 200)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+
+
+def test_configure_llm_cache_is_opt_in(tmp_path: Path) -> None:
+    assert configure_llm_cache(tmp_path, LLMCacheConfig()) is None
+    assert get_llm_cache() is None
+
+    c = configure_llm_cache(tmp_path, LLMCacheConfig(enabled=True))
+    try:
+        assert c is not None
+        assert get_llm_cache() is c
+        assert c.path == tmp_path / ".usagi" / "cache" / "llm"
+    finally:
+        configure_llm_cache(tmp_path, LLMCacheConfig())
@@ -0,0 +1,56 @@
+import os
+from pathlib import Path
+
+from usagi.log_tail import LogTail
+
+
+def _append(p: Path, text: str) -> None:
+    with p.open("a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_log_tail_reads_only_appended_lines(tmp_path: Path) -> None:
+    p = tmp_path / "events.log"
+    t = LogTail(p, max_lines=3)
+    assert t.poll() is False
+    assert t.tail(5) == []
+
+    _append(p, "a\nb\n")
+    assert t.poll() is True
+    assert t.tail(5) == ["a", "b"]
+    assert t.poll() is False
+
+    # 書きかけの行も表示し、続きが来たら1行にまとまる
+    _append(p, "c")
+    assert t.poll() is True
+    assert t.tail(5) == ["a", "b", "c"]
+    _append(p, "d\ne\n")
+    t.poll()
+    assert t.tail(5) == ["b", "cd", "e"]
+
+
+def test_log_tail_handles_truncate_and_rotation(tmp_path: Path) -> None:
+    p = tmp_path / "events.log"
+    t = LogTail(p)
+    _append(p, "old1\nold2\n")
+    t.poll()
+
+    p.write_text("", encoding="utf-8")
+    assert t.poll() is True
+    assert t.tail(5) == []
+
+    _append(p, "x\n")
+    t.poll()
+    os.replace(p, tmp_path / "events.log.1")
+    _append(p, "new\n")
+    assert t.poll() is True
+    assert t.tail(5) == ["x", "new"]
+
+
+def test_log_tail_only_reads_window_of_large_file(tmp_path: Path) -> None:
+    p = tmp_path / "events.log"
+    _append(p, "".join(f"line {i}\n" for i in range(10000)))
+    t = LogTail(p, max_lines=10, window_bytes=200)
+    t.poll()
+    assert t.tail(2) == ["line 9998", "line 9999"]
+    assert all(line.startswith("line ") for line in t.tail(10))
@@ -1,8 +1,20 @@
 """mailbox protocol tests."""
 
+import os
 from pathlib import Path
 
-from usagi.mailbox import archive_message, deliver_markdown, ensure_mailbox, list_inbox
+from usagi import mailbox
+from usagi.mailbox import (
+    ack_message,
+    archive_message,
+    archive_unhandled,
+    claim_messages,
+    deliver_markdown,
+    ensure_mailbox,
+    list_inbox,
+    list_messages,
+    read_message,
+)
 
 
 def test_ensure_mailbox_creates_dirs(tmp_path: Path) -> None:
@@ -33,3 +45,60 @@ def test_deliver_markdown_to_inbox_and_archive(tmp_path: Path) -> None:
     assert archived.exists()
     assert not p.exists()
     assert archived.parent.name == "archive"
+
+
+def test_list_messages_filters_by_kind_and_batches_archive(tmp_path: Path) -> None:
+    def send(title: str, kind: str) -> Path:
+        return deliver_markdown(
+            root=tmp_path, from_agent="boss", to_agent="mgr", title=title, body="x", kind=kind
+        )
+
+    a = send("a", "boss_plan")
+    b = send("b", "noise")
+
+    # 他プロセスが置いたファイル（インデックスに無い）も一度だけ読んで拾う
+    mb = ensure_mailbox(tmp_path, "mgr")
+    c = mb.inbox / "zz-foreign.md"
+    c.write_text("---\nkind: boss_plan\nfrom: boss\ntitle: c\n---\n\nbody\n", encoding="utf-8")
+
+    entries = list_messages(root=tmp_path, agent_id="mgr", kinds={"boss_plan"})
+    assert [e.path for e in entries] == [a, c]
+    assert entries[1].title == "c"
+    assert read_message(entries[1]).body == "body"
+
+    archived = archive_unhandled(root=tmp_path, agent_id="mgr", kinds={"boss_plan"})
+    assert [p.name for p in archived] == [b.name]
+    assert list_inbox(root=tmp_path, agent_id="mgr") == [a, c]
+
+    # 外から消されたものはインデックスからも消える
+    c.unlink()
+    assert list_inbox(root=tmp_path, agent_id="mgr") == [a]
+
+
+def test_claim_messages_scans_the_inbox_once_per_call(tmp_path: Path, monkeypatch) -> None:
+    for i in range(3):
+        deliver_markdown(
+            root=tmp_path, from_agent="boss", to_agent="mgr", title=f"t{i}", body="x", kind="job"
+        )
+    deliver_markdown(
+        root=tmp_path, from_agent="boss", to_agent="mgr", title="n", body="x", kind="noise"
+    )
+    inbox = ensure_mailbox(tmp_path, "mgr").inbox
+
+    scans: list[str] = []
+    real = os.scandir
+
+    def counting(path):  # noqa: ANN001, ANN202
+        scans.append(str(path))
+        return real(path)
+
+    monkeypatch.setattr(mailbox.os, "scandir", counting)
+
+    got = []
+    for msg in claim_messages(root=tmp_path, agent_id="mgr", kinds={"job"}):
+        got.append(msg.title)
+        ack_message(root=tmp_path, message=msg)
+
+    assert got == ["t0", "t1", "t2"]
+    assert scans.count(str(inbox)) == 1
+    assert list_inbox(root=tmp_path, agent_id="mgr") == []
@@ -0,0 +1,102 @@
+"""mailbox dispatcher のテスト（inotifyなしでロジックのみ）。"""
+
+import threading
+import time
+from pathlib import Path
+
+from usagi.mailbox_dispatch import AgentLanes, MailboxDispatcher, agent_for_inbox_path
+
+
+def test_agent_for_inbox_path(tmp_path: Path) -> None:
+    base = tmp_path / ".usagi" / "agents"
+    assert agent_for_inbox_path(tmp_path, base / "dev_mgr" / "inbox" / "a.md") == "dev_mgr"
+    assert agent_for_inbox_path(tmp_path, base / "dev_mgr" / "archive" / "a.md") is None
+    assert agent_for_inbox_path(tmp_path, base / "dev_mgr" / "inbox" / "a.txt") is None
+    assert agent_for_inbox_path(tmp_path, tmp_path / "inputs" / "a.md") is None
+
+
+def test_dispatcher_returns_only_marked_agents(tmp_path: Path) -> None:
+    d = MailboxDispatcher(tmp_path, rescan_seconds=60.0)
+
+    # 初回は fallback rescan
+    _pending, rescan = d.wait(timeout=0.0)
+    assert rescan is True
+
+    d.mark("dev_w1")
+    pending, rescan = d.wait(timeout=1.0)
+    assert pending == {"dev_w1"}
+    assert rescan is False
+
+    pending, rescan = d.wait(timeout=0.01)
+    assert pending == set()
+    assert rescan is False
+
+
+def test_agent_lanes_serialize_per_agent_and_run_others_concurrently() -> None:
+    lanes = AgentLanes(max_workers=4)
+    release = threading.Event()
+    started = threading.Event()
+    calls: list[str] = []
+    active: dict[str, int] = {"w1": 0}
+    overlap: list[bool] = []
+
+    def slow_worker() -> None:
+        active["w1"] += 1
+        overlap.append(active["w1"] > 1)
+        started.set()
+        release.wait(2.0)
+        calls.append("w1")
+        active["w1"] -= 1
+
+    boss_done = threading.Event()
+
+    def boss() -> None:
+        calls.append("boss")
+        boss_done.set()
+
+    assert lanes.submit("w1", slow_worker) is True
+    assert started.wait(1.0)
+    # 同じ agent は再実行予約だけ
+    assert lanes.submit("w1", slow_worker) is False
+    # 別 agent は worker 実行中でも進む
+    lanes.submit("boss", boss)
+    assert boss_done.wait(1.0)
+    assert "w1" not in calls
+
+    release.set()
+    deadline = time.monotonic() + 2.0
+    while lanes.busy() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    lanes.shutdown(wait=True)
+
+    assert calls.count("w1") == 2
+    assert not any(overlap)
+
+
+def test_agent_lanes_keep_workers_in_their_own_pool() -> None:
+    lanes = AgentLanes(max_workers=1, pools={"worker": 2})
+    release = threading.Event()
+    started: list[str] = []
+
+    def worker(wid: str):  # noqa: ANN202
+        def run() -> None:
+            started.append(wid)
+            release.wait(2.0)
+
+        return run
+
+    # worker の山で worker 枠は埋まる（3本目は空き待ち）
+    for wid in ("w1", "w2", "w3"):
+        lanes.submit(wid, worker(wid), pool="worker")
+    boss_done = threading.Event()
+    lanes.submit("boss", boss_done.set)
+    # boss は既定のプールで走るので worker を待たない
+    assert boss_done.wait(1.0)
+    assert sorted(started) == ["w1", "w2"]
+
+    release.set()
+    deadline = time.monotonic() + 2.0
+    while lanes.busy() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(started) == ["w1", "w2", "w3"]
+    lanes.shutdown(wait=True)
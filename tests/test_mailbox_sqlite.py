@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+from usagi.mailbox import (
+    MarkdownMailbox,
+    ack_message,
+    claim_messages,
+    configure_mailbox,
+    deliver_markdown,
+    ensure_mailbox,
+    get_mailbox_index,
+    nack_message,
+)
+from usagi.mailbox_sqlite import SqliteMailbox
+from usagi.runtime import MailboxConfig
+
+
+def test_sqlite_mailbox_claim_ack_and_export(tmp_path: Path) -> None:
+    configure_mailbox(tmp_path, MailboxConfig(backend="sqlite"))
+    for i in range(3):
+        deliver_markdown(
+            root=tmp_path, from_agent="boss", to_agent="mgr", title=f"t{i}", body="b", kind="plan"
+        )
+    deliver_markdown(root=tmp_path, from_agent="boss", to_agent="mgr", title="x", body="b")
+
+    got = []
+    for msg in claim_messages(root=tmp_path, agent_id="mgr", kinds={"plan"}):
+        got.append(msg.title)
+        ack_message(root=tmp_path, message=msg)
+    assert got == ["t0", "t1", "t2"]
+
+    box = configure_mailbox(tmp_path, MailboxConfig(backend="sqlite"))
+    assert isinstance(box, SqliteMailbox)
+    assert box.counts("mgr") == {"done": 4}
+    assert box.export_markdown(tmp_path / "export") == 4
+    files = sorted((tmp_path / "export" / "mgr" / "archive").glob("*.md"))
+    assert len(files) == 4
+    assert "kind: plan" in files[0].read_text(encoding="utf-8")
+    box.close()
+
+
+def test_sqlite_mailbox_concurrent_claims_are_exclusive(tmp_path: Path) -> None:
+    box = SqliteMailbox(tmp_path)
+    for i in range(50):
+        box.deliver(from_agent="a", to_agent="w", title=f"m{i}", body="", kind="job")
+
+    seen: list[str] = []
+    lock = threading.Lock()
+
+    def consume() -> None:
+        while (msg := box.claim("w")) is not None:
+            with lock:
+                seen.append(msg.id)
+            box.ack(msg)
+
+    threads = [threading.Thread(target=consume) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(seen) == 50
+    assert len(set(seen)) == 50
+    box.close()
+
+
+def test_sqlite_mailbox_visibility_timeout_and_dead_letter(tmp_path: Path) -> None:
+    box = SqliteMailbox(tmp_path, visibility_seconds=0.0, max_attempts=2)
+    box.deliver(from_agent="a", to_agent="w", title="flaky", body="", kind="job")
+
+    first = box.claim("w")
+    assert first is not None and first.attempts == 1
+    # ack されないまま期限切れ → 再配信
+    second = box.claim("w")
+    assert second is not None and second.attempts == 2
+    box.nack(second, error="boom")
+    assert box.claim("w") is None
+    assert box.counts("w") == {"dead": 1}
+    box.close()
+
+
+def test_sqlite_mailbox_imports_markdown_dropped_in_inbox(tmp_path: Path) -> None:
+    mb = ensure_mailbox(tmp_path, "w")
+    text = "---\nkind: job\ntitle: by hand\n---\n\nhi\n"
+    (mb.inbox / "hand.md").write_text(text, encoding="utf-8")
+    box = SqliteMailbox(tmp_path)
+    msg = box.claim("w", {"job"})
+    assert msg is not None
+    assert (msg.title, msg.body) == ("by hand", "hi")
+    assert not (mb.inbox / "hand.md").exists()
+
+    # 同じ名前・同じ内容（取り込み後に落ちて残った等）は二重に取り込まない
+    (mb.inbox / "hand.md").write_text(text, encoding="utf-8")
+    assert box.claim("w", {"job"}) is None
+    # 名前だけ同じ別の message は取り込む
+    (mb.inbox / "hand.md").write_text(text.replace("hi", "again"), encoding="utf-8")
+    other = box.claim("w", {"job"})
+    assert other is not None and other.body == "again"
+    assert other.name != msg.name
+    box.close()
+
+
+def test_markdown_mailbox_claim_is_exclusive_and_dead_letters(tmp_path: Path) -> None:
+    box = MarkdownMailbox(tmp_path, visibility_seconds=0.0, max_attempts=2)
+    box.deliver(from_agent="a", to_agent="w", title="one", body="x", kind="job")
+
+    msg = box.claim("w")
+    assert msg is not None
+    assert Path(msg.id).parent.name == "processing"
+    assert box.claim("w") is not None  # 期限切れで戻って再 claim（attempts=2）
+    mb = ensure_mailbox(tmp_path, "w")
+    # 2回とも ack されずに期限切れ → dead-letter
+    assert box.claim("w") is None
+    assert [p.name for p in mb.deadletter.glob("*.md")] == [msg.name]
+
+
+def test_markdown_mailbox_attempts_survive_restart(tmp_path: Path) -> None:
+    box = MarkdownMailbox(tmp_path, max_attempts=2)
+    box.deliver(from_agent="a", to_agent="w", title="one", body="x", kind="job")
+    msg = box.claim("w")
+    assert msg is not None and msg.attempts == 1
+    nack_message(root=tmp_path, message=msg, error="boom")  # 既定 backend も Markdown
+
+    # backoff の間は claim できない（期限は mtime に入っている）
+    mb = ensure_mailbox(tmp_path, "w")
+    back = mb.inbox / msg.name
+    assert back.stat().st_mtime > time.time() + 10
+    assert box.claim("w") is None
+    os.utime(back, (time.time() - 1, time.time() - 1))
+
+    # 再起動（新しいインスタンス / index）しても回数は引き継ぐ
+    get_mailbox_index(tmp_path, "w").discard(msg.name)
+    box = MarkdownMailbox(tmp_path, max_attempts=2)
+    again = box.claim("w")
+    assert again is not None and again.attempts == 2
+    box.nack(again, error="boom")
+    assert [p.name for p in mb.deadletter.glob("*.md")] == [msg.name]
+    assert list(mb.processing.iterdir()) == []
+
+
+def test_markdown_mailbox_moves_never_overwrite(tmp_path: Path) -> None:
+    box = MarkdownMailbox(tmp_path, retry_backoff_seconds=0.0)
+    # 同じ秒・同じ題名 → 名前が衝突する
+    p1 = box.deliver(from_agent="a", to_agent="w", title="same", body="one", kind="job")
+    p2 = box.deliver(from_agent="a", to_agent="w", title="same", body="two", kind="job")
+    assert p1 != p2
+
+    first = box.claim("w")
+    assert first is not None
+    box.nack(first, error="boom")
+    # nack で戻す間に同名の新しい message が届いても上書きしない
+    p3 = box.deliver(from_agent="a", to_agent="w", title="same", body="three", kind="job")
+    mb = ensure_mailbox(tmp_path, "w")
+    got = []
+    while (msg := box.claim("w")) is not None:
+        got.append((msg.body.split()[-1], msg.attempts))
+        box.ack(msg)
+    retried = first.body.split()[-1]
+    expected = {("one", 1), ("two", 1), ("three", 1)} - {(retried, 1)} | {(retried, 2)}
+    assert sorted(got) == sorted(expected)
+    assert p3.parent == mb.inbox
+    assert len(list(mb.archive.glob("*.md"))) == 3
+    assert list(mb.processing.iterdir()) == []
+
+
+def test_nacked_message_waits_for_backoff(tmp_path: Path) -> None:
+    for box in (
+        MarkdownMailbox(tmp_path / "md", retry_backoff_seconds=0.2),
+        SqliteMailbox(tmp_path / "db", retry_backoff_seconds=0.2),
+    ):
+        box.deliver(from_agent="a", to_agent="w", title="flaky", body="", kind="job")
+        msg = box.claim("w")
+        assert msg is not None
+        box.nack(msg, error="429")
+        # 同じ tick の中ではすぐに取り直さない
+        assert box.claim("w") is None
+        time.sleep(0.3)
+        again = box.claim("w")
+        assert again is not None and again.attempts == 2
+
+
+def test_sqlite_mailbox_ingest_keeps_unreadable_files(tmp_path: Path) -> None:
+    mb = ensure_mailbox(tmp_path, "w")
+    (mb.inbox / "bad.md").write_bytes(b"---\nkind: job\n---\n\n\xff\xfe\n")
+    box = SqliteMailbox(tmp_path)
+    assert box.deliver(from_agent="a", to_agent="w", title="t", body="", kind="job") is None
+
+    msg = box.claim("w", {"job"})
+    assert msg is not None and msg.title == "t"
+    assert [p.name for p in mb.deadletter.glob("*.md")] == ["bad.md"]
+    assert not list(mb.archive.glob("*.md"))
+    box.close()
@@ -0,0 +1,131 @@
+"""main への merge queue のテスト（gitは実行できる前提）。"""
+
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from usagi.git_ops import GitRepo
+from usagi.merge_queue import MergeQueue
+
+
+def _git(repo: GitRepo, args: list[str], stdin: str = "") -> str:
+    return subprocess.run(
+        ["git", *args], cwd=repo.path, input=stdin, text=True, capture_output=True, check=True
+    ).stdout.strip()
+
+
+def _repo(tmp_path: Path) -> GitRepo:
+    repo = GitRepo(tmp_path / "repo")
+    repo.path.mkdir()
+    repo.ensure_repo()
+    repo.ensure_initial_commit()
+    return repo
+
+
+def _branch(repo: GitRepo, branch: str, start: str, files: dict[str, str]) -> str:
+    """start の上に files を足した commit を branch として作る（作業ツリーには触れない）。"""
+
+    base = repo.resolve(f"{start}^{{commit}}")
+    assert base
+    entries = {e.split("\t", 1)[1]: e for e in _git(repo, ["ls-tree", base]).splitlines()}
+    for name, text in files.items():
+        blob = _git(repo, ["hash-object", "-w", "--stdin"], text)
+        entries[name] = f"100644 blob {blob}\t{name}"
+    tree = _git(repo, ["mktree"], "\n".join(entries.values()) + "\n")
+    commit = repo.commit_tree(tree, [base], branch)
+    assert repo.update_ref(f"refs/heads/{branch}", commit)
+    return commit
+
+
+def _submit_together(q: MergeQueue, branches: list[str]) -> dict:
+    """land を止めている間に全部積み、1バッチで処理させる。"""
+
+    out: dict = {}
+    with q._land_lock:
+        threads = [
+            threading.Thread(target=lambda b=b: out.__setitem__(b, q.submit(b))) for b in branches
+        ]
+        for t in threads:
+            t.start()
+        while q.metrics()["depth"] < len(branches):
+            time.sleep(0.01)
+    for t in threads:
+        t.join(timeout=30)
+    return out
+
+
+def test_stacked_branches_land_as_one_fast_forward(tmp_path: Path) -> None:
+    repo = _repo(tmp_path)
+    _branch(repo, "team-a", "main", {"a.txt": "a"})
+    tip = _branch(repo, "team-b", "team-a", {"b.txt": "b"})
+    q = MergeQueue(repo.path)
+
+    res = _submit_together(q, ["team-a", "team-b"])
+
+    assert [res[b].status for b in ("team-a", "team-b")] == ["fast-forward", "fast-forward"]
+    assert {r.batch for r in res.values()} == {2}
+    assert repo.resolve("main") == tip
+    assert "team-a" not in repo.branches() and "team-b" not in repo.branches()
+    # main を checkout している base repo の作業ツリーも追従する
+    assert (repo.path / "b.txt").read_text(encoding="utf-8") == "b"
+    assert _git(repo, ["status", "--porcelain"]) == ""
+    m = q.metrics()
+    assert (m["landed"], m["batches"], m["depth"]) == (2, 1, 0)
+    assert m["wait_max_seconds"] >= m["wait_avg_seconds"] > 0
+
+
+def test_diverged_branches_get_a_merge_commit(tmp_path: Path) -> None:
+    repo = _repo(tmp_path)
+    a = _branch(repo, "team-a", "main", {"a.txt": "a"})
+    c = _branch(repo, "team-c", "main", {"c.txt": "c"})
+
+    res = _submit_together(MergeQueue(repo.path), ["team-a", "team-c"])
+
+    assert (res["team-a"].status, res["team-c"].status) == ("fast-forward", "merged")
+    main = repo.resolve("main")
+    assert res["team-a"].commit == res["team-c"].commit == main
+    assert _git(repo, ["rev-list", "--parents", "-n1", "main"]).split()[1:] == [a, c]
+    assert {"a.txt", "c.txt"} <= set(_git(repo, ["ls-tree", "--name-only", "main"]).split())
+
+
+def test_conflict_is_rejected_without_touching_main(tmp_path: Path) -> None:
+    repo = _repo(tmp_path)
+    _branch(repo, "team-x", "main", {"f.txt": "x"})
+    y = _branch(repo, "team-y", "main", {"f.txt": "y"})
+    q = MergeQueue(repo.path)
+
+    assert q.submit("team-x").status == "fast-forward"
+    main = repo.resolve("main")
+    res = q.submit("team-y")
+
+    assert res.status == "conflict" and not res.ok
+    assert res.conflicts == ["f.txt"]
+    assert repo.resolve("main") == main
+    assert repo.branches()["team-y"] == y
+    assert (repo.path / "f.txt").read_text(encoding="utf-8") == "x"
+    assert _git(repo, ["status", "--porcelain"]) == ""
+    assert q.submit("nope").status == "missing"
+    assert q.metrics()["rejected"] == 2
+
+
+def test_concurrent_submits_all_land(tmp_path: Path) -> None:
+    repo = _repo(tmp_path)
+    names = [f"team-{i}" for i in range(6)]
+    for name in names:
+        _branch(repo, name, "main", {f"{name}.txt": name})
+    q = MergeQueue(repo.path)
+
+    results: dict = {}
+    threads = [
+        threading.Thread(target=lambda n=n: results.__setitem__(n, q.submit(n))) for n in names
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+
+    assert all(results[n].ok for n in names)
+    files = set(_git(repo, ["ls-tree", "--name-only", "main"]).split())
+    assert {f"{n}.txt" for n in names} <= files
+    assert not set(names) & set(repo.branches())
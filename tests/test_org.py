@@ -1,8 +1,17 @@
 """org (組織TOML) のテスト。"""
 
+import os
 from pathlib import Path
 
-from usagi.org import ROLE_LEAD, ROLE_MANAGER, ROLE_WORKER, default_org, load_org
+from usagi.org import (
+    ROLE_LEAD,
+    ROLE_MANAGER,
+    ROLE_WORKER,
+    AgentDef,
+    default_org,
+    load_org,
+    load_org_cached,
+)
 
 
 def test_default_org_has_hierarchy() -> None:
@@ -94,3 +103,43 @@ role = "coder"  # 互換でworker扱い
     assert mem is not None
     assert mem.role == ROLE_WORKER
     assert mem.reports_to == "mgr1"
+
+
+def test_org_index_lookups() -> None:
+    org = default_org()
+    assert org.by_name("開発課長うさぎ").id == "dev_lead"
+    assert [a.id for a in org.subordinates_of("boss")] == ["dev_mgr", "qa_mgr"]
+    assert [a.id for a in org.roots()] == ["boss"]
+    assert org.can_command("boss", "dev_mgr") is True
+    assert org.can_command("worker1", "dev_lead") is False
+    assert org.can_command("nobody", "boss") is False
+
+    # 同じ長さのままの入れ替えでも、reindex() すれば古いインデックスは使われない
+    w2 = AgentDef(id="w2", name="W2", role=ROLE_WORKER, reports_to="dev_lead")
+    org.agents[-1] = w2
+    org.reindex()
+    assert org.find("w2") is w2 and org.find("reviewer1") is None
+    assert org.can_command("dev_lead", "w2") is True
+
+    # agents を代入し直したら自動で作り直す
+    org.agents = [*org.agents, AgentDef(id="w3", name="W3", role=ROLE_WORKER)]
+    assert org.find("w3") is not None
+
+
+def test_load_org_cached_reparses_only_on_change(tmp_path: Path) -> None:
+    toml = tmp_path / "org.toml"
+    toml.write_text('[[agents]]\nid = "boss"\nname = "B"\nrole = "boss"\n', encoding="utf-8")
+
+    org1 = load_org_cached(toml)
+    assert load_org_cached(toml) is org1
+
+    toml.write_text(
+        '[[agents]]\nid = "boss"\nname = "B"\nrole = "boss"\n\n'
+        '[[agents]]\nid = "w1"\nname = "W"\nrole = "worker"\nreports_to = "boss"\n',
+        encoding="utf-8",
+    )
+    st = toml.stat()
+    os.utime(toml, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    org2 = load_org_cached(toml)
+    assert org2 is not org1
+    assert org2.find("w1") is not None
@@ -1,8 +1,9 @@
 """runtime モード設定のテスト。"""
 
+import os
 from pathlib import Path
 
-from usagi.runtime import load_runtime
+from usagi.runtime import RuntimeConfigProvider, load_runtime
 
 
 def test_load_default_runtime_missing_file(tmp_path: Path) -> None:
@@ -51,3 +52,28 @@ stop_commands = ["STOP_USAGI"]
     assert mode.gh_enabled is False
     assert mode.docker_required is True
     assert mode.boss_id == "boss"
+
+
+def test_runtime_provider_reloads_only_on_change(tmp_path: Path) -> None:
+    p = tmp_path / "usagi.runtime.toml"
+    p.write_text("[system]\nworker_pool_size = 2\n", encoding="utf-8")
+
+    prov = RuntimeConfigProvider(p)
+    changes: list[tuple[int, int]] = []
+    prov.subscribe(lambda old, new: changes.append((old.worker_pool_size, new.worker_pool_size)))
+
+    rt = prov.get()
+    assert rt.worker_pool_size == 2
+    assert prov.get() is rt
+    assert changes == []
+
+    p.write_text("[system]\nworker_pool_size = 4\n", encoding="utf-8")
+    st = p.stat()
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert prov.get().worker_pool_size == 4
+    assert changes == [(2, 4)]
+
+    # 壊れた TOML では直前の設定を使い続ける
+    p.write_text("[system\n", encoding="utf-8")
+    assert prov.get().worker_pool_size == 4
+    assert changes == [(2, 4)]
@@ -1,6 +1,6 @@
 """spec パーサーのテスト。"""
 
-from usagi.spec import parse_spec_markdown
+from usagi.spec import parse_spec_markdown, spec_digest
 
 
 def test_parse_basic_spec() -> None:
@@ -61,3 +61,16 @@ def test_parse_context_section() -> None:
     spec = parse_spec_markdown(md)
     assert spec.context == "これは背景です"
     assert spec.objective == "これは目的です"
+
+
+def test_parse_priority() -> None:
+    assert parse_spec_markdown("---\npriority: high\n---\n").priority == 2
+    assert parse_spec_markdown("---\npriority: 9\n---\n").priority == 3
+    assert parse_spec_markdown("---\npriority: ???\n---\n").priority == 1
+    assert parse_spec_markdown("").priority == 1
+
+
+def test_spec_digest_ignores_whitespace_noise() -> None:
+    a = spec_digest("## 目的\n\nテスト\n")
+    assert spec_digest("## 目的  \r\n\r\nテスト\r\n\r\n") == a
+    assert spec_digest("## 目的\n\nテスト2\n") != a
@@ -2,7 +2,7 @@
 
 from pathlib import Path
 
-from usagi.state import AgentStatus, load_status, save_status
+from usagi.state import AgentStatus, StatusRegistry, load_status, save_status
 
 
 def test_status_roundtrip(tmp_path: Path) -> None:
@@ -41,3 +41,33 @@ def test_load_status_corrupt_json_falls_back_and_logs(tmp_path: Path) -> None:
     events_path = usagi_dir / "events.log"
     assert events_path.exists()
     assert "JSON" in events_path.read_text(encoding="utf-8")
+
+
+def test_status_registry_batches_writes_and_notifies(tmp_path: Path) -> None:
+    p = tmp_path / "status.json"
+    reg = StatusRegistry(p, flush_seconds=60)
+    seen: list[str] = []
+    unsubscribe = reg.subscribe(lambda st: seen.append(st.agents["a"].state))
+
+    reg.update("a", "A", "working", "t")
+    reg.update("a", "A", "idle")
+    # タイマー前なのでまだ書かれていない
+    assert not p.exists()
+    assert seen == ["working", "idle"]
+    assert reg.get("a").state == "idle"
+
+    reg.flush()
+    assert load_status(p).agents["a"].state == "idle"
+
+    unsubscribe()
+    reg.update("a", "A", "working")
+    assert seen == ["working", "idle"]
+
+
+def test_status_registry_picks_up_external_writes(tmp_path: Path) -> None:
+    p = tmp_path / "status.json"
+    reg = StatusRegistry(p)
+    st = load_status(p)
+    st.set(AgentStatus(agent_id="b", name="B", state="working"))
+    save_status(p, st)
+    assert reg.snapshot().agents["b"].state == "working"
@@ -0,0 +1,78 @@
+import json
+import threading
+from pathlib import Path
+
+from usagi.state_store import StateStore
+
+
+def test_state_store_appends_journal_and_replays(tmp_path: Path) -> None:
+    p = tmp_path / "state.json"
+    s = StateStore(p)
+    s.set_mtime_ns(Path("a.md"), 1)
+    s.save()
+    s.set_mtime_ns(Path("a.md"), 2)
+    s.set_mtime_ns(Path("b.md"), 3)
+    s.save()
+
+    # snapshot はまだ書かれず journal だけ伸びる
+    assert not p.exists()
+    assert len(s.journal_path.read_text(encoding="utf-8").splitlines()) == 3
+
+    s2 = StateStore(p)
+    assert s2.last_mtime_ns(Path("a.md")) == 2
+    assert s2.last_mtime_ns(Path("b.md")) == 3
+
+
+def test_state_store_compacts(tmp_path: Path) -> None:
+    p = tmp_path / "state.json"
+    s = StateStore(p, compact_every=3)
+    for i in range(3):
+        s.set_mtime_ns(Path(f"{i}.md"), i + 10)
+        s.save()
+
+    assert json.loads(p.read_text(encoding="utf-8"))["2.md"] == {"mtime_ns": 12}
+    assert s.journal_path.read_text(encoding="utf-8") == ""
+    assert StateStore(p).last_mtime_ns(Path("0.md")) == 10
+
+
+def test_state_store_reads_legacy_format(tmp_path: Path) -> None:
+    p = tmp_path / "state.json"
+    p.write_text(json.dumps({"a.md": 5}), encoding="utf-8")
+    assert StateStore(p).last_mtime_ns(Path("a.md")) == 5
+
+
+def test_state_store_refresh_picks_up_other_writer(tmp_path: Path) -> None:
+    p = tmp_path / "state.json"
+    writer = StateStore(p, compact_every=2)
+    reader = StateStore(p)
+
+    writer.set_mtime_ns(Path("a.md"), 1)
+    writer.save()
+    assert reader.refresh() is True
+    assert reader.last_mtime_ns(Path("a.md")) == 1
+    assert reader.refresh() is False
+
+    # compaction 後も追従する
+    writer.set_mtime_ns(Path("b.md"), 2)
+    writer.save()
+    assert reader.refresh() is True
+    assert reader.last_mtime_ns(Path("b.md")) == 2
+
+
+def test_state_store_concurrent_writers_do_not_lose_updates(tmp_path: Path) -> None:
+    p = tmp_path / "state.json"
+    s = StateStore(p, compact_every=50)
+
+    def work(n: int) -> None:
+        for i in range(40):
+            s.set_mtime_ns(Path(f"{n}-{i}.md"), i + 1)
+            s.save()
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    s2 = StateStore(p)
+    assert all(s2.last_mtime_ns(Path(f"{n}-{i}.md")) == i + 1 for n in range(8) for i in range(40))
@@ -4,7 +4,7 @@ from pathlib import Path
 
 import pytest
 
-from usagi.tokens import load_tokens
+from usagi.tokens import TokenPool, load_tokens
 
 
 def test_load_tokens_from_env_single(monkeypatch) -> None:
@@ -54,3 +54,51 @@ def test_missing_tokens_raises(monkeypatch) -> None:
 
     with pytest.raises(RuntimeError):
         pool.next_key()
+
+
+def test_pool_prefers_least_loaded_key() -> None:
+    pool = TokenPool(_keys=["a", "b"])
+    l1 = pool.acquire()
+    l2 = pool.acquire()
+    assert {l1.key, l2.key} == {"a", "b"}
+
+    l2.report()
+    # 処理中が少ない方（l2 のキー）が選ばれる
+    assert pool.acquire().key == l2.key
+
+
+def test_pool_cools_down_rate_limited_and_revoked_keys() -> None:
+    pool = TokenPool(_keys=["a", "b", "c"], cooldown_seconds=60, auth_cooldown_seconds=600)
+
+    lease = pool.acquire()
+    limited = lease.key
+    lease.report(status_code=429)
+
+    lease = pool.acquire()
+    revoked = lease.key
+    lease.report(status_code=401)
+
+    for _ in range(5):
+        with pool.lease() as lease:
+            assert lease.key not in {limited, revoked}
+
+    # health にキー本体は出さない
+    assert all("key" not in h for h in pool.health())
+    assert sum(1 for h in pool.health() if h["cooldown_seconds"] > 0) == 2
+
+
+def test_pool_rpm_bucket_blocks_until_refill() -> None:
+    pool = TokenPool(_keys=["a"], rpm_limit=1)
+    pool.next_key()
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=0.05)
+
+
+def test_load_tokens_reads_limits(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+    monkeypatch.delenv("USAGI_API_KEYS", raising=False)
+    cfg = tmp_path / "org.toml"
+    cfg.write_text("[tokens]\nrpm_limit = 30\ntpm_limit = 1000\n", encoding="utf-8")
+    pool = load_tokens(cfg)
+    assert pool.rpm_limit == 30
+    assert pool.tpm_limit == 1000
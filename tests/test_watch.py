@@ -1,6 +1,8 @@
 """watch モジュールのテスト（inotifyなしでロジックのみ）。"""
 
+import os
 import queue
+import threading
 import time
 from pathlib import Path
 
@@ -31,6 +33,27 @@ def test_debounce_collapses(tmp_path: Path) -> None:
     assert q.qsize() == 1
 
 
+def test_debounce_uses_single_thread_for_many_paths(tmp_path: Path) -> None:
+    q: queue.Queue[WatchJob] = queue.Queue()
+    # 負荷が高くても enqueue し終える前に発火しないよう、締切は長めに取る
+    d = DebouncedEnqueuer(q, debounce_seconds=1.0)
+
+    def own_threads() -> int:
+        # 他のテストが残した watch（別の DebouncedEnqueuer）のスレッドは数えない
+        return sum(1 for t in threading.enumerate() if getattr(t, "_target", None) == d._run)
+
+    for i in range(500):
+        d.enqueue(tmp_path / f"{i}.md")
+        d.enqueue(tmp_path / f"{i}.md")
+    assert own_threads() == 1
+    assert d.pending() == 500
+
+    got = {q.get(timeout=5).path.name for _ in range(500)}
+    assert len(got) == 500
+    assert q.empty()
+    d.stop()
+
+
 def test_worker_ignores_non_md(tmp_path: Path) -> None:
     q: queue.Queue[WatchJob] = queue.Queue()
     st = StateStore(tmp_path / "state.json")
@@ -106,3 +129,93 @@ project: demo
     rep = outputs / "job.report.md"
     assert rep.exists()
     assert "うさぎさん株式会社レポート" in rep.read_text(encoding="utf-8")
+
+
+def test_worker_skips_inputs_with_same_content(tmp_path: Path) -> None:
+    from usagi.spec import spec_digest
+
+    q: queue.Queue[WatchJob] = queue.Queue()
+    st = StateStore(tmp_path / "state.json")
+    outputs = tmp_path / "out"
+    w = WatchWorker(
+        q,
+        inputs_dir=tmp_path,
+        outputs_dir=outputs,
+        work_root=tmp_path / "work",
+        state=st,
+        model="codex",
+        dry_run=True,
+        offline=True,
+        org_path=None,
+        runtime_path=None,
+        status_path=None,
+    )
+
+    body = "## 目的\n\nテスト\n"
+    done = tmp_path / "done.md"
+    st.update(done, mtime_ns=1, size=1, hash=spec_digest(body), job_id="1-done")
+
+    # 別パス・改行コードと行末空白だけ違う → 前回の job を再利用
+    copy = tmp_path / "copy.md"
+    copy.write_text("## 目的  \r\n\r\nテスト\r\n\r\n", encoding="utf-8")
+    w._process(WatchJob(path=copy))
+    e = st.entry(copy)
+    assert e is not None
+    assert e["job_id"] == "1-done"
+    assert e["reused_from"] == str(done)
+    assert "1-done" in (outputs / "report.md").read_text(encoding="utf-8")
+    assert not (tmp_path / "work" / "jobs").exists()
+
+    # touch だけ → 何もしない（記録の mtime だけ進む）
+    os.utime(copy, ns=(e["mtime_ns"] + 10**9, e["mtime_ns"] + 10**9))
+    w._process(WatchJob(path=copy))
+    assert st.entry(copy)["mtime_ns"] == e["mtime_ns"] + 10**9
+    assert not (tmp_path / "work" / "jobs").exists()
+
+
+def test_failed_run_forgets_the_previous_content_hash(tmp_path: Path, monkeypatch) -> None:
+    from usagi import watch
+    from usagi.spec import spec_digest
+
+    calls: list[str] = []
+
+    def _boom(**kw: object) -> None:
+        calls.append(str(kw["job_id"]))
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(watch, "boss_handle_spec", _boom)
+    monkeypatch.setattr(watch, "load_org_cached", lambda _p: None)
+
+    q: queue.Queue[WatchJob] = queue.Queue()
+    st = StateStore(tmp_path / "state.json")
+    w = WatchWorker(
+        q,
+        inputs_dir=tmp_path,
+        outputs_dir=tmp_path / "out",
+        work_root=tmp_path / "work",
+        state=st,
+        model="codex",
+        dry_run=True,
+        offline=True,
+        org_path=None,
+        runtime_path=None,
+        status_path=None,
+    )
+
+    first = "## 目的\n\nA\n"
+    spec = tmp_path / "job.md"
+    st.update(spec, mtime_ns=1, size=1, hash=spec_digest(first), job_id="1-job")
+
+    # 内容 B で失敗 → 前回成功時の hash/job_id は残らない
+    spec.write_text("## 目的\n\nB\n", encoding="utf-8")
+    w._process(WatchJob(path=spec))
+    e = st.entry(spec)
+    assert e is not None
+    assert (e["hash"], e["job_id"]) == ("", "")
+    assert st.find_hash(spec_digest(first)) is None
+
+    # A に戻したら処理済み扱いにせず、もう一度実行する
+    spec.write_text(first, encoding="utf-8")
+    os.utime(spec, ns=(e["mtime_ns"] + 10**9, e["mtime_ns"] + 10**9))
+    w._process(WatchJob(path=spec))
+    assert len(calls) == 2
@@ -0,0 +1,154 @@
+"""worktree プールのテスト（gitは実行できる前提）。"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from usagi.git_ops import GitRepo
+from usagi.worktree_pool import WorktreePool, _process_started
+
+
+def _pool(tmp_path: Path, **kw) -> WorktreePool:
+    return WorktreePool(tmp_path, **{"size": 2, "max_size": 2, **kw})
+
+
+def test_concurrent_leases_get_separate_checkouts(tmp_path: Path) -> None:
+    pool = _pool(tmp_path)
+    assert pool.prewarm() == 2
+
+    a = pool.acquire("team-x")
+    b = pool.acquire("team-x")
+    assert a.path != b.path
+    assert set(pool.leases()) == {a.slot, b.slot}
+    with pytest.raises(TimeoutError):
+        pool.acquire("team-x", timeout=0.05)
+
+    a.release()
+    c = pool.acquire("team-y", timeout=1)
+    assert c.slot == a.slot
+    b.release()
+    c.release()
+    assert pool.leases() == {}
+
+
+def test_lease_is_reset_and_commits_advance_branch(tmp_path: Path) -> None:
+    pool = _pool(tmp_path)
+    repo = GitRepo(tmp_path / ".usagi" / "repo")
+
+    with pool.acquire("team-x") as lease:
+        (lease.path / "a.txt").write_text("a", encoding="utf-8")
+        assert lease.commit("add a") is True
+    assert repo.run(["show", "team-x:a.txt"]) == "a"
+
+    # 前の job の未 commit の残骸は次の貸し出しで消える
+    with pool.acquire("team-x") as lease:
+        (lease.path / "junk.txt").write_text("x", encoding="utf-8")
+        (lease.path / "a.txt").write_text("dirty", encoding="utf-8")
+        (lease.path / "staged.txt").write_text("s", encoding="utf-8")
+        lease.repo.add_all()
+    with pool.acquire("team-x") as lease:
+        assert not (lease.path / "junk.txt").exists()
+        assert not (lease.path / "staged.txt").exists()
+        assert (lease.path / "a.txt").read_text(encoding="utf-8") == "a"
+
+
+def test_commit_merges_when_branch_moved_underneath(tmp_path: Path) -> None:
+    pool = _pool(tmp_path)
+    repo = GitRepo(tmp_path / ".usagi" / "repo")
+
+    a = pool.acquire("team-x")
+    b = pool.acquire("team-x")
+    (a.path / "a.txt").write_text("a", encoding="utf-8")
+    (b.path / "b.txt").write_text("b", encoding="utf-8")
+    assert a.commit("a") is True
+    # b は古い先から始めているが、a の commit を取り込んでから進める
+    assert b.commit("b") is True
+    a.release()
+    b.release()
+
+    files = repo.run(["ls-tree", "--name-only", "team-x"]).splitlines()
+    assert {"a.txt", "b.txt"} <= set(files)
+
+
+def test_reclaims_orphaned_and_expired_leases(tmp_path: Path) -> None:
+    pool = _pool(tmp_path, size=1, max_size=1)
+    lease = pool.acquire("team-x")
+    p = pool.dir / f"{lease.slot}.lease"
+
+    # 落ちたプロセスの貸し出し（pid が存在しない）
+    data = json.loads(p.read_text(encoding="utf-8"))
+    p.write_text(json.dumps({**data, "pid": 2**22 + 12345}), encoding="utf-8")
+    assert pool.reclaim() == 1
+    again = pool.acquire("team-x", timeout=1)
+
+    # 同じホストで pid が生きている貸し出しは期限切れでも回収しない
+    data = json.loads(p.read_text(encoding="utf-8"))
+    p.write_text(json.dumps({**data, "expires_at": 0}), encoding="utf-8")
+    assert pool.reclaim() == 0
+
+    # 別ホストの貸し出しは期限で回収する
+    p.write_text(json.dumps({**data, "host": "elsewhere", "expires_at": 0}), encoding="utf-8")
+    last = pool.acquire("team-x", timeout=1)
+    assert last.slot == again.slot
+    # 回収された側も手放す（heartbeat スレッドを残さない）
+    for held in (lease, again, last):
+        held.release()
+
+
+def test_reclaims_leases_left_by_a_previous_process_with_the_same_pid(tmp_path: Path) -> None:
+    # コンテナで再起動すると pid も host も前回と同じになる
+    left = _pool(tmp_path, size=1, max_size=1).acquire("team-x")
+    p = left.pool.dir / f"{left.slot}.lease"
+    data = json.loads(p.read_text(encoding="utf-8"))
+    assert data["pid"] == os.getpid()
+
+    restarted = _pool(tmp_path, size=1, max_size=1)
+    assert restarted.reclaim() == 1
+    lease = restarted.acquire("team-x", timeout=1)
+    assert lease.slot == left.slot
+    # 自分が出した token の lease は回収しない
+    assert restarted.reclaim() == 0
+    lease.release()
+    left.release()
+
+
+def test_reclaims_leases_whose_pid_was_reused(tmp_path: Path) -> None:
+    pool = _pool(tmp_path, size=1, max_size=1)
+    lease = pool.acquire("team-x")
+    p = pool.dir / f"{lease.slot}.lease"
+    data = json.loads(p.read_text(encoding="utf-8"))
+    if not data["started"]:
+        pytest.skip("process start time is not available on this platform")
+
+    # 生きている別プロセス（親）の pid だが、起動時刻が合わない → 別人
+    live = {**data, "pid": os.getppid()}
+    p.write_text(json.dumps({**live, "started": "other-boot:1"}), encoding="utf-8")
+    assert pool.reclaim() == 1
+
+    # 起動時刻も合っていれば、持ち主は生きているので回収しない
+    again = pool.acquire("team-x", timeout=1)
+    live = {**json.loads(p.read_text(encoding="utf-8")), "pid": os.getppid()}
+    p.write_text(json.dumps({**live, "started": _process_started(os.getppid())}), encoding="utf-8")
+    assert pool.reclaim() == 0
+    lease.release()
+    again.release()
+
+
+def test_heartbeat_renews_and_release_keeps_a_taken_over_lease(tmp_path: Path) -> None:
+    pool = _pool(tmp_path, size=1, max_size=1, lease_seconds=0.3)
+    lease = pool.acquire("team-x")
+    p = pool.dir / f"{lease.slot}.lease"
+    first = json.loads(p.read_text(encoding="utf-8"))["expires_at"]
+
+    time.sleep(0.5)
+    data = json.loads(p.read_text(encoding="utf-8"))
+    assert data["expires_at"] > first
+    assert data["token"] == lease.token
+
+    # 回収されて別の job が同じ slot を借りた（token が違う）
+    p.write_text(json.dumps({**data, "token": "someone-else"}), encoding="utf-8")
+    lease.release()
+    assert json.loads(p.read_text(encoding="utf-8"))["token"] == "someone-else"